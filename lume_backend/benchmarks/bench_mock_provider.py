@@ -0,0 +1,92 @@
+"""
+MockProvider catalog benchmark.
+
+Measures CatalogIndex build time and per-query latency against a linear
+scan (the pre-index MockProvider behaviour) for synthetic catalogs.
+
+Usage (from lume_backend/):
+    python -m benchmarks.bench_mock_provider
+    python -m benchmarks.bench_mock_provider --sizes 10000 100000 --repeat 20
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List, Optional, Tuple
+
+from providers.catalog_index import CatalogIndex, generate_catalog
+
+
+QUERIES: List[Tuple[str, Optional[int], Optional[int]]] = [
+    ("silent river", None, None),
+    ("midnight", None, None),
+    ("dark empire s03e04", 3, 4),
+    ("storm s02", 2, None),
+    ("(1999)", None, None),
+    ("no such title", None, None),
+]
+
+
+def _linear_scan(records, query_lower, season, episode) -> List[dict]:
+    """Linear scan equivalent to the original MockProvider.search filter."""
+    if season is not None and episode is not None:
+        tag = f"s{season:02d}e{episode:02d}"
+    elif season is not None:
+        tag = f"s{season:02d}"
+    else:
+        tag = ""
+    filtered = [
+        item for item in records
+        if query_lower in item["title"].lower() and tag in item["title"].lower()
+    ]
+    return sorted(filtered, key=lambda item: item["seeds"], reverse=True)
+
+
+def _time_per_call(func: Callable[[], object], repeat: int) -> float:
+    """Median wall time of ``func`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(sizes: List[int], repeat: int, linear_limit: int) -> None:
+    print(f"{'entries':>10} {'build s':>8} {'query':<22} {'index ms':>10} {'scan ms':>10} {'hits':>8}")
+    for size in sizes:
+        records = generate_catalog(size)
+
+        started = time.perf_counter()
+        index = CatalogIndex(records)
+        build_seconds = time.perf_counter() - started
+
+        for query_lower, season, episode in QUERIES:
+            index_ms = _time_per_call(lambda: index.search(query_lower, season, episode), repeat)
+            hits = len(index.search(query_lower, season, episode))
+            if size <= linear_limit:
+                scan_ms = _time_per_call(
+                    lambda: _linear_scan(records, query_lower, season, episode),
+                    max(1, repeat // 5),
+                )
+                scan = f"{scan_ms:10.3f}"
+            else:
+                scan = f"{'skipped':>10}"
+            print(f"{size:>10} {build_seconds:>8.2f} {query_lower:<22} {index_ms:>10.3f} {scan} {hits:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per query")
+    parser.add_argument(
+        "--linear-limit",
+        type=int,
+        default=1_000_000,
+        help="skip the linear-scan comparison above this catalog size",
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.linear_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Cold-start benchmark.
+
+Measures what a freshly started (e.g. scaled-from-zero) instance costs
+before it serves its first request:
+
+- import time of ``main``, ``routers.media`` and the provider stack
+  (``python -X importtime`` in a fresh interpreter), with a per-module
+  breakdown of ``providers.*``
+- time to first response: from spawning ``uvicorn main:app`` to the first
+  answered ``GET /resolve/...`` (any status counts as answered)
+
+Each figure is the median over ``--runs`` fresh processes and is compared
+against ``benchmarks/startup_baseline.json`` the same way
+``benchmarks.suite`` compares its cases: anything more than
+``--threshold`` slower is listed and the run exits with status 1. The
+baseline is machine-specific and not committed; the first run records it.
+
+Usage (from lume_backend/):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --save-baseline
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.suite import _compare
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+
+# Modules whose cumulative import time is tracked against the baseline.
+TRACKED_MODULES = ("main", "routers.media", "providers.registry")
+FIRST_REQUEST_PATH = "/resolve/The%20Boys?season=4&episode=1"
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """Map each module in ``-X importtime`` output to (self, cumulative) microseconds."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def import_profile(module: str = "main") -> Dict[str, Tuple[int, int]]:
+    """Import ``module`` in a fresh interpreter and return its import times."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def time_to_first_response(path: str = FIRST_REQUEST_PATH, timeout: float = 30.0) -> float:
+    """Seconds from spawning a uvicorn server to the first answered ``GET path``."""
+    port = _free_port()
+    env = {**os.environ, "LUME_PROVIDER": os.environ.get("LUME_PROVIDER", "mock")}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=timeout) as response:
+                    response.read()
+            except urllib.error.HTTPError:
+                pass  # an error status is still a served request
+            except (urllib.error.URLError, ConnectionError):
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {server.returncode} before responding")
+                time.sleep(0.01)
+                continue
+            return time.perf_counter() - started
+        raise TimeoutError(f"no response from {path} within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run(runs: int) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    """
+    Median results over ``runs`` cold starts, plus the ``providers.*``
+    breakdown (self time, ms) of the last import profile.
+    """
+    samples: Dict[str, List[float]] = {}
+    profile: Dict[str, Tuple[int, int]] = {}
+    for _ in range(max(1, runs)):
+        profile = import_profile()
+        for module in TRACKED_MODULES:
+            if module in profile:
+                samples.setdefault(f"import:{module}", []).append(profile[module][1] / 1000)
+        samples.setdefault("first_response", []).append(time_to_first_response() * 1000)
+
+    results = {name: {"median_ms": round(statistics.median(values), 2)} for name, values in samples.items()}
+    providers = {
+        module: round(self_us / 1000, 2)
+        for module, (self_us, _) in sorted(profile.items(), key=lambda item: -item[1][0])
+        if module.startswith("providers.")
+    }
+    return results, providers
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results, providers = run(args.runs)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    first_run = not os.path.exists(args.baseline)
+    if not first_run:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    print(f"{'measure':<30} {'median ms':>11} {'baseline ms':>12}")
+    for name, result in results.items():
+        reference = baseline.get(name, {}).get("median_ms", "-")
+        print(f"{name:<30} {result['median_ms']:>11} {reference:>12}")
+    print(f"\n{'providers module (self)':<30} {'ms':>11}")
+    for module, self_ms in providers.items():
+        print(f"{module:<30} {self_ms:>11}")
+
+    if args.save_baseline or first_run:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = _compare(results, baseline, args.threshold, metrics=("median_ms",))
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""
+Resolve hot-path microbenchmark suite.
+
+Measures per-call latency and peak allocation for the functions on the
+resolve path — ``_filter_live_results``, ``MediaLink`` construction,
+``MockProvider.search``, ``RandomMockProvider.search``, the P2P
+sort/filter/resolve pipeline against an in-memory index, default vs. fast
+response serialization — and for full in-process requests through the
+ASGI app. Everything runs offline.
+
+Results are compared against ``benchmarks/baseline.json``; a case whose
+median latency or peak allocation grows by more than ``--threshold``
+is flagged and the run exits with status 1. Baselines are
+machine-specific, so the file is not committed: the first run on a
+machine records it, and ``--save-baseline`` refreshes it.
+
+Usage (from lume_backend/):
+    python -m benchmarks.suite
+    python -m benchmarks.suite --filter mock --iterations 500
+    python -m benchmarks.suite --save-baseline
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+CASES: Dict[str, Callable[[], AsyncContextManager[Callable[[], Any]]]] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a case. The decorated async generator does setup, yields the
+    callable to time and cleans up after the case has run.
+    """
+    def register(factory: Callable[[], AsyncIterator[Callable[[], Any]]]):
+        CASES[name] = asynccontextmanager(factory)
+        return factory
+    return register
+
+
+def _link_payloads(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": f"Sample Show S01E{i + 1:02d} 1080p WEB-DL",
+            "url": f"https://mock-cdn.example.com/tv/sample/{i}.mkv",
+            "size": 1_500_000_000 + i,
+            "seeds": (25 - i) if i % 4 else 0,
+        }
+        for i in range(count)
+    ]
+
+
+class _FakeIndex:
+    """In-memory stand-in for PirateBayAPI with instant responses."""
+
+    results = [
+        SimpleNamespace(id=i, name=f"Sample Show S01E01 1080p mirror {i}", size=1_000_000 + i, seeds=(i * 37) % 500)
+        for i in range(100)
+    ]
+
+    @classmethod
+    def Search(cls, _query):
+        return cls.results
+
+    @staticmethod
+    def Download(item_id):
+        return f"https://mock-cdn.example.com/p2p/{item_id}"
+
+
+@benchmark("filter_live_results")
+async def _filter_live_results_case():
+    from models.schemas import MediaLink
+    from routers.media import _filter_live_results
+
+    links = [MediaLink(**payload) for payload in _link_payloads(25)]
+    yield lambda: _filter_live_results(links)
+
+
+@benchmark("medialink_construct_x25")
+async def _medialink_case():
+    from models.schemas import MediaLink
+
+    payloads = _link_payloads(25)
+    yield lambda: [MediaLink(**payload) for payload in payloads]
+
+
+@benchmark("mock_provider_search")
+async def _mock_provider_case():
+    from providers.mock_provider import MockProvider
+
+    provider = MockProvider()
+    yield lambda: provider.search("The Boys", season=4, episode=1, limit=1)
+
+
+@benchmark("mock_provider_search_100k")
+async def _mock_provider_large_case():
+    from providers.catalog_index import generate_catalog
+    from providers.mock_provider import MockProvider
+
+    provider = MockProvider(catalog=generate_catalog(100_000))
+    yield lambda: provider.search("silent river", limit=10)
+
+
+@benchmark("random_mock_provider_search")
+async def _random_mock_provider_case():
+    from providers.mock_provider import RandomMockProvider
+
+    provider = RandomMockProvider()
+    yield lambda: provider.search("inception", limit=10)
+
+
+@benchmark("p2p_search_fake_index")
+async def _p2p_case():
+    import providers.p2p_provider as p2p_module
+
+    original = p2p_module.PirateBayAPI
+    p2p_module.PirateBayAPI = _FakeIndex
+    provider = p2p_module.P2PProvider()
+    try:
+        yield lambda: provider.search("Sample Show", season=1, episode=1, limit=10)
+    finally:
+        p2p_module.PirateBayAPI = original
+        await provider.close()
+
+
+@asynccontextmanager
+async def _asgi_client(provider_factory):
+    import httpx
+
+    from main import create_application
+    from routers.media import get_provider
+
+    app = create_application()
+    provider = provider_factory()
+    app.dependency_overrides[get_provider] = lambda: provider
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        yield client
+
+
+class _StaticProvider:
+    """Provider returning the same pre-validated page of links every time."""
+
+    def __new__(cls, count: int):
+        from models.schemas import MediaLink
+        from providers.base import BaseProvider
+
+        links = [MediaLink(**payload) for payload in _link_payloads(count)]
+
+        class StaticProvider(BaseProvider):
+            async def search(self, query, season=None, episode=None, limit=None):
+                return list(links)
+
+            async def health_check(self) -> bool:
+                return True
+
+        return StaticProvider("StaticProvider")
+
+
+@asynccontextmanager
+async def _serialization_mode(enabled: bool):
+    import core.serialization
+
+    original = core.serialization.FAST_SERIALIZATION
+    core.serialization.FAST_SERIALIZATION = enabled
+    try:
+        yield
+    finally:
+        core.serialization.FAST_SERIALIZATION = original
+
+
+@benchmark("serialize_search_page_x25")
+async def _serialize_default_case():
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from models.schemas import MediaLink, SearchResult
+
+    page = SearchResult(
+        query="page",
+        results=[MediaLink(**payload) for payload in _link_payloads(25)],
+        total_results=25,
+        provider_name="bench",
+    )
+    field = create_response_field(name="response", type_=SearchResult)
+
+    async def render():
+        # What FastAPI does for ``response_model=SearchResult``.
+        content = await serialize_response(field=field, response_content=page, is_coroutine=True)
+        return JSONResponse(content)
+
+    yield render
+
+
+@benchmark("serialize_search_page_x25_fast")
+async def _serialize_fast_case():
+    from core.serialization import PydanticJSONResponse
+    from models.schemas import MediaLink, SearchResult
+
+    page = SearchResult(
+        query="page",
+        results=[MediaLink(**payload) for payload in _link_payloads(25)],
+        total_results=25,
+        provider_name="bench",
+    )
+    yield lambda: PydanticJSONResponse(page)
+
+
+def _search_page_case(enabled: bool):
+    async def case():
+        async with _serialization_mode(enabled), _asgi_client(lambda: _StaticProvider(25)) as client:
+            yield lambda: client.get("/resolve/search/page", params={"limit": 25})
+    return case
+
+
+benchmark("asgi_search_page_x25")(_search_page_case(False))
+benchmark("asgi_search_page_x25_fast")(_search_page_case(True))
+
+
+@benchmark("asgi_resolve")
+async def _asgi_resolve_case():
+    from providers.mock_provider import MockProvider
+
+    async with _asgi_client(MockProvider) as client:
+        yield lambda: client.get("/resolve/The Boys", params={"season": 4, "episode": 1})
+
+
+@benchmark("asgi_search_random_x10")
+async def _asgi_search_case():
+    from providers.mock_provider import RandomMockProvider
+
+    async with _asgi_client(RandomMockProvider) as client:
+        yield lambda: client.get("/resolve/search/inception", params={"limit": 10})
+
+
+async def _call(func: Callable[[], Any]) -> Any:
+    result = func()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _measure(func: Callable[[], Any], iterations: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        await _call(func)
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await _call(func)
+        samples.append(time.perf_counter() - started)
+
+    # Allocation pass is separate: tracing slows every allocation down.
+    alloc_samples = []
+    tracemalloc.start()
+    try:
+        for _ in range(max(10, iterations // 10)):
+            tracemalloc.reset_peak()
+            baseline_bytes, _ = tracemalloc.get_traced_memory()
+            await _call(func)
+            _, peak = tracemalloc.get_traced_memory()
+            alloc_samples.append(peak - baseline_bytes)
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "p95_us": round(samples[int(0.95 * (len(samples) - 1))] * 1e6, 2),
+        "peak_alloc_kib": round(statistics.median(alloc_samples) / 1024, 2),
+    }
+
+
+def _compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    metrics: Sequence[str] = ("median_us", "peak_alloc_kib"),
+) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric in metrics:
+            before, after = reference.get(metric), result[metric]
+            if before and after > before * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+async def run(names: List[str], iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        async with CASES[name]() as func:
+            results[name] = await _measure(func, iterations, warmup)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.filter in name]
+    results = asyncio.run(run(names, args.iterations, args.warmup))
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    first_run = not os.path.exists(args.baseline)
+    if not first_run:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    print(f"{'case':<30} {'median us':>11} {'p95 us':>11} {'peak KiB':>10} {'baseline us':>12}")
+    for name, result in results.items():
+        reference = baseline.get(name, {}).get("median_us", "-")
+        print(
+            f"{name:<30} {result['median_us']:>11} {result['p95_us']:>11} "
+            f"{result['peak_alloc_kib']:>10} {reference:>12}"
+        )
+
+    if args.save_baseline or first_run:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = _compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+HTTP Caching
+ETag and Cache-Control helpers for conditional GET responses.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+from models.schemas import MediaLink
+
+
+def etag_for(links: Iterable[MediaLink], *context: object) -> str:
+    """
+    Strong ETag for a result set.
+
+    Derived from the fields that make up the response (each link's title,
+    URL, size and seeds, plus any ``context`` such as the echoed query), so
+    it changes exactly when the response body would, and can be computed
+    without serializing the response.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in context:
+        digest.update(repr(value).encode())
+        digest.update(b"\x1f")
+    for link in links:
+        digest.update(f"{link.title}\x1f{link.url}\x1f{link.size}\x1f{link.seeds}\x1e".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, as RFC 9110 requires for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_control(max_age: int, stale_while_revalidate: int) -> str:
+    return f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
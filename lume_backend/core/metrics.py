@@ -0,0 +1,372 @@
+"""
+Metrics
+Minimal Prometheus-compatible counters, gauges and histograms, plus the
+HTTP middleware and route class that feed them.
+
+Metrics are updated from the event loop thread without locking; every
+observation is a dict lookup plus a bisect, cheap enough to leave on in
+production.
+"""
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import anyio.to_thread
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.tracing import current_trace, span
+
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, values: Sequence[object]) -> LabelValues:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        return tuple(str(value) for value in values)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: object, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value, read from a callback when metrics are rendered.
+
+    Without labels the callback returns a number; with ``labelnames`` it
+    returns a mapping of label values to numbers.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], Union[float, Mapping[LabelValues, float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._read = read
+
+    def _samples(self) -> List[str]:
+        try:
+            value = self._read()
+        except Exception:  # noqa: BLE001 - a broken gauge must not break /metrics
+            return []
+        if not self.labelnames:
+            return [f"{self.name} {_format_value(value)}"]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, self._key(key))} {_format_value(sample)}"
+            for key, sample in sorted(value.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram, optionally split by labels."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: object) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, *labels: object) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    @contextmanager
+    def time(self, *labels: object) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), self._counts[key]):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "lume_http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "lume_http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+))
+RESPONSE_SERIALIZATION_SECONDS = REGISTRY.register(Histogram(
+    "lume_response_serialization_seconds",
+    "Time from endpoint return to a rendered response (response model validation and JSON encoding).",
+    ("route",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+))
+PROVIDER_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "lume_provider_stage_duration_seconds",
+    "Provider pipeline stage latency (search, magnet_download, filter_sort).",
+    ("provider", "stage"),
+))
+PROVIDER_ERRORS = REGISTRY.register(Counter(
+    "lume_provider_errors_total",
+    "Provider failures surfaced to clients, by provider and error code.",
+    ("provider", "error"),
+))
+EXECUTOR_REJECTIONS = REGISTRY.register(Counter(
+    "lume_executor_rejections_total",
+    "Blocking provider calls rejected because the dedicated executor was saturated.",
+    ("executor",),
+))
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "lume_admission_rejections_total",
+    "Upstream-bound searches shed by admission control, by reason (rate_limited, queue_full, queue_timeout).",
+    ("reason",),
+))
+MAGNET_RESOLUTIONS = REGISTRY.register(Counter(
+    "lume_magnet_resolutions_total",
+    "P2P magnet links by how they were obtained: synthesized from the info-hash or downloaded.",
+    ("path",),
+))
+HEDGE_OUTCOMES = REGISTRY.register(Counter(
+    "lume_hedged_resolutions_total",
+    "Single-result P2P resolutions by which candidate won (primary, backup) or none.",
+    ("outcome",),
+))
+PREFETCH_REQUESTS = REGISTRY.register(Counter(
+    "lume_prefetch_requests_total",
+    "Next-episode prefetches by outcome (scheduled, dropped, skipped, completed, failed).",
+    ("outcome",),
+))
+PREFETCH_HITS = REGISTRY.register(Counter(
+    "lume_prefetch_hits_total",
+    "Foreground searches served from a cache entry a prefetch populated.",
+))
+
+
+def _thread_pool_statistics():
+    return anyio.to_thread.current_default_thread_limiter().statistics()
+
+
+REGISTRY.register(Gauge(
+    "lume_threadpool_busy_threads",
+    "Worker threads currently running blocking calls in the default AnyIO pool.",
+    lambda: _thread_pool_statistics().borrowed_tokens,
+))
+REGISTRY.register(Gauge(
+    "lume_threadpool_capacity",
+    "Maximum concurrent worker threads in the default AnyIO pool.",
+    lambda: _thread_pool_statistics().total_tokens,
+))
+REGISTRY.register(Gauge(
+    "lume_threadpool_queue_depth",
+    "Blocking calls waiting for a free worker thread in the default AnyIO pool.",
+    lambda: _thread_pool_statistics().tasks_waiting,
+))
+
+
+@contextmanager
+def time_stage(provider: str, stage: str) -> Iterator[None]:
+    """Time one provider pipeline stage, as a metric and a span of the current request."""
+    with PROVIDER_STAGE_SECONDS.time(provider, stage), span(stage, provider=provider):
+        yield
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and latency per route template.
+
+    The route template (e.g. ``/resolve/{query}``) is used instead of the raw
+    path so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            labels = (scope["method"], template, status_code)
+            HTTP_REQUESTS.inc(*labels)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, *labels)
+
+
+class _EndpointTiming:
+    __slots__ = ("returned_at",)
+
+    def __init__(self) -> None:
+        self.returned_at: Optional[float] = None
+
+
+_endpoint_timing: ContextVar[Optional[_EndpointTiming]] = ContextVar("endpoint_timing", default=None)
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that measures response serialization separately from the endpoint.
+
+    The endpoint is wrapped to note when it returns; the time from there to
+    the finished ``Response`` is FastAPI's response-model validation and
+    JSON encoding.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        super().__init__(path, endpoint, **kwargs)
+        original = self.dependant.call
+        if asyncio.iscoroutinefunction(original):
+            @functools.wraps(original)
+            async def timed_endpoint(*args, **kwargs):
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    timing = _endpoint_timing.get()
+                    if timing is not None:
+                        timing.returned_at = time.perf_counter()
+
+            self.dependant.call = timed_endpoint
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route_path = self.path
+
+        async def timed_handler(request):
+            timing = _EndpointTiming()
+            token = _endpoint_timing.set(timing)
+            try:
+                response = await handler(request)
+            finally:
+                _endpoint_timing.reset(token)
+            if timing.returned_at is not None:
+                finished = time.perf_counter()
+                RESPONSE_SERIALIZATION_SECONDS.observe(finished - timing.returned_at, route_path)
+                trace = current_trace.get()
+                if trace is not None:
+                    trace.record("serialization", timing.returned_at, finished)
+            return response
+
+        return timed_handler
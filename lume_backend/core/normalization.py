@@ -0,0 +1,115 @@
+"""
+Query Normalization
+Canonical form of search queries, shared by the router, the providers and
+every caching layer so that equivalent spellings share one key.
+"""
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+QUERY_NORMALIZATION_CACHE_SIZE = int(os.environ.get("QUERY_NORMALIZATION_CACHE_SIZE", "4096"))
+
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+_EPISODE_TAG = re.compile(r"^s(\d{1,2})(?:e(\d{1,3}))?$")
+_YEAR = re.compile(r"^(19|20)\d\d$")
+# A trailing "SxxEyy" / "Sxx" tag as typed, with the separators before it.
+_TRAILING_TAG = re.compile(r"[^0-9A-Za-z]+[sS]\d{1,2}(?:[eE]\d{1,3})?[^0-9A-Za-z]*$")
+
+
+class CanonicalQuery(NamedTuple):
+    """A query reduced to its title words, release year and episode."""
+
+    title: str
+    year: Optional[int] = None
+    season: Optional[int] = None
+    episode: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Title and year as one search string, e.g. ``"dune 2021"``."""
+        return f"{self.title} {self.year}" if self.year is not None else self.title
+
+    def key(self) -> Tuple[str, Optional[int], Optional[int]]:
+        """Hashable identity for caches and de-duplication."""
+        return (self.text, self.season, self.episode)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Fold ``text`` to lower-case ASCII words separated by single spaces.
+
+    Accents are stripped ("Amélie" -> "amelie"), compatibility characters
+    are unified (full-width letters, ligatures) and every run of punctuation
+    or whitespace becomes one space, so "The.Boys", "the  boys" and
+    "THE BOYS " all become "the boys".
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    ascii_text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", ascii_text).strip()
+
+
+@lru_cache(maxsize=QUERY_NORMALIZATION_CACHE_SIZE)
+def _parse(query: str) -> CanonicalQuery:
+    words = normalize_text(query).split()
+
+    season = episode = None
+    if words:
+        tag = _EPISODE_TAG.match(words[-1])
+        if tag is not None and len(words) > 1:
+            words.pop()
+            season = int(tag.group(1))
+            episode = int(tag.group(2)) if tag.group(2) is not None else None
+
+    year = None
+    # A trailing year is only a year if something is left as the title
+    # ("1917" stays a title; "Dune (2021)" becomes "dune" + 2021).
+    if len(words) > 1 and _YEAR.match(words[-1]):
+        year = int(words.pop())
+
+    return CanonicalQuery(" ".join(words), year, season, episode)
+
+
+def canonicalize(
+    query: str,
+    season: Optional[int] = None,
+    episode: Optional[int] = None,
+) -> CanonicalQuery:
+    """
+    Canonical form of a search.
+
+    A trailing "SxxEyy" or "Sxx" tag in ``query`` is parsed into the season
+    and episode; an explicit ``season`` or ``episode`` replaces only that
+    field, so ``canonicalize("show s02e05", season=3)`` is season 3,
+    episode 5. Parsing is memoized for the ``QUERY_NORMALIZATION_CACHE_SIZE``
+    most recent query strings.
+    """
+    parsed = _parse(query)
+    if season is None and episode is None:
+        return parsed
+    return parsed._replace(
+        season=parsed.season if season is None else season,
+        episode=parsed.episode if episode is None else episode,
+    )
+
+
+def search_text(query: str) -> str:
+    """
+    ``query`` as typed, for sending to an upstream index.
+
+    Keys use the folded ``canonicalize`` form, but indexes search better with
+    the caller's spelling ("S.H.I.E.L.D.", not "s h i e l d"). Whitespace is
+    collapsed, and a trailing episode tag that ``canonicalize`` parsed is
+    removed so it can be re-appended in the index's own format.
+    """
+    if _parse(query).season is not None:
+        query = _TRAILING_TAG.sub("", query)
+    return " ".join(query.split())
+
+
+def normalization_stats() -> Dict[str, Any]:
+    """Counters of the memoized query parser."""
+    info = _parse.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize, "max_entries": info.maxsize}
@@ -0,0 +1,44 @@
+"""
+Serialization
+Fast-path JSON responses for models the API has already validated.
+"""
+import os
+from typing import Any, Optional, Union
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+# Opt-in: return pre-validated models as JSON directly instead of letting
+# FastAPI dump, re-validate and re-encode them through ``response_model``.
+FAST_SERIALIZATION = os.environ.get("FAST_SERIALIZATION", "0") == "1"
+
+
+class PydanticJSONResponse(Response):
+    """
+    JSON response rendered by the model's compiled pydantic-core serializer.
+
+    The output is byte-for-byte what FastAPI's default path produces for the
+    same model (compact separators, UTF-8, no ASCII escaping), without the
+    intermediate ``dict``, the ``response_model`` validation pass or
+    ``json.dumps``.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
+
+
+def fast_response(model: BaseModel, enabled: Optional[bool] = None) -> Union[BaseModel, Response]:
+    """
+    Wrap ``model`` in a ``PydanticJSONResponse`` when fast serialization is on.
+
+    Only pass models built from validated data: returning a ``Response``
+    bypasses the route's ``response_model`` checks.
+    """
+    if FAST_SERIALIZATION if enabled is None else enabled:
+        return PydanticJSONResponse(model)
+    return model
@@ -0,0 +1,80 @@
+"""
+Server Launcher
+uvicorn settings for development (one auto-reloading process) and
+production (one worker per CPU on uvloop/httptools, no reload).
+"""
+import importlib.util
+import os
+import tempfile
+from typing import Any, Dict
+
+
+APP_ENV = os.environ.get("APP_ENV", "development")
+UVICORN_HOST = os.environ.get("UVICORN_HOST", "0.0.0.0")
+# PORT wins: hosting platforms such as Railway inject it per deployment.
+UVICORN_PORT = int(os.environ.get("PORT") or os.environ.get("UVICORN_PORT", "8000"))
+# 0 starts one worker per CPU available to the process.
+UVICORN_WORKERS = int(os.environ.get("UVICORN_WORKERS", "0"))
+UVICORN_BACKLOG = int(os.environ.get("UVICORN_BACKLOG", "2048"))
+UVICORN_KEEPALIVE_SECONDS = int(os.environ.get("UVICORN_KEEPALIVE_SECONDS", "5"))
+UVICORN_GRACEFUL_SHUTDOWN_SECONDS = int(os.environ.get("UVICORN_GRACEFUL_SHUTDOWN_SECONDS", "15"))
+UVICORN_LOG_LEVEL = os.environ.get("UVICORN_LOG_LEVEL", "info")
+
+# Shared by the workers when RESOLVE_PERSISTENT_CACHE_PATH is not set.
+DEFAULT_SHARED_STATE_PATH = os.path.join(tempfile.gettempdir(), "lume-shared-state.sqlite3")
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity masks and cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS and Windows
+        return os.cpu_count() or 1
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_config(env: str = APP_ENV, workers: int = UVICORN_WORKERS) -> Dict[str, Any]:
+    """
+    Keyword arguments for ``uvicorn.run`` in the given environment.
+
+    Anything but ``env="production"`` runs a single reloading process.
+    Production runs ``workers`` processes (one per available CPU when 0),
+    never reloads, uses uvloop and httptools when they are installed (they
+    ship with ``uvicorn[standard]``), and takes the listen backlog,
+    keep-alive timeout and graceful-shutdown timeout from the environment.
+    """
+    config: Dict[str, Any] = {"host": UVICORN_HOST, "port": UVICORN_PORT, "log_level": UVICORN_LOG_LEVEL}
+    if env != "production":
+        return {**config, "reload": True}
+    return {
+        **config,
+        "reload": False,
+        "workers": workers if workers > 0 else available_cpus(),
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": UVICORN_BACKLOG,
+        "timeout_keep_alive": UVICORN_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": UVICORN_GRACEFUL_SHUTDOWN_SECONDS,
+    }
+
+
+def run(app: str = "main:app") -> None:
+    """
+    Serve ``app`` with ``server_config()``.
+
+    With more than one worker and no ``RESOLVE_PERSISTENT_CACHE_PATH``, the
+    workers are pointed at ``DEFAULT_SHARED_STATE_PATH`` so they share cached
+    results, upstream leases and health probes rather than each going
+    upstream for the same key. Set the variable to an empty string to keep
+    every worker's cache private.
+    """
+    import uvicorn
+
+    config = server_config()
+    if config.get("workers", 1) > 1:
+        # Workers are spawned processes that read their settings on import.
+        os.environ.setdefault("RESOLVE_PERSISTENT_CACHE_PATH", DEFAULT_SHARED_STATE_PATH)
+    uvicorn.run(app, **config)
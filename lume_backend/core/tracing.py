@@ -0,0 +1,171 @@
+"""
+Request Tracing
+Per-request stage spans, reported in a ``Server-Timing`` response header
+and optionally logged as structured JSON lines keyed by a request ID.
+"""
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "1") != "0"
+# Log one JSON line per finished span and per request to the "lume.trace" logger.
+TRACE_LOG_ENABLED = os.environ.get("TRACE_LOG_ENABLED", "0") == "1"
+REQUEST_ID_HEADER = os.environ.get("REQUEST_ID_HEADER", "X-Request-ID")
+
+# Descriptions of the stages the resolve pipeline records.
+STAGE_DESCRIPTIONS = {
+    "cache": "cache lookup",
+    "queue": "admission queue",
+    "lease": "cross-worker lease",
+    "search": "upstream search",
+    "magnet_download": "magnet resolution",
+    "filter_sort": "filtering",
+    "serialization": "serialization",
+}
+
+# Client-supplied request IDs are echoed back only if they look like one.
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+logger = logging.getLogger("lume.trace")
+
+
+class Span(NamedTuple):
+    name: str
+    started: float
+    ended: float
+    provider: Optional[str]
+
+
+class RequestTrace:
+    """Spans recorded while handling one request (``perf_counter`` times)."""
+
+    __slots__ = ("request_id", "started", "spans")
+
+    def __init__(self, request_id: str) -> None:
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def record(self, name: str, started: float, ended: float, provider: Optional[str] = None) -> None:
+        self.spans.append(Span(name, started, ended, provider))
+        if TRACE_LOG_ENABLED:
+            logger.info(json.dumps({
+                "request_id": self.request_id,
+                "span": name,
+                "provider": provider,
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round((ended - started) * 1000, 3),
+            }))
+
+    def stages(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Wall time and span count per stage name, in first-seen order.
+
+        Concurrent spans of one stage (e.g. parallel magnet resolutions)
+        count once: the wall time runs from the first start to the last end.
+        """
+        extents: Dict[str, List[float]] = {}
+        for span in self.spans:
+            extent = extents.get(span.name)
+            if extent is None:
+                extents[span.name] = [span.started, span.ended, 1]
+            else:
+                extent[0] = min(extent[0], span.started)
+                extent[1] = max(extent[1], span.ended)
+                extent[2] += 1
+        return {name: (ended - started, int(count)) for name, (started, ended, count) in extents.items()}
+
+    def server_timing(self, ended: float) -> str:
+        """``Server-Timing`` header value: every stage plus ``total`` (milliseconds)."""
+        entries = []
+        for name, (seconds, count) in self.stages().items():
+            description = STAGE_DESCRIPTIONS.get(name, name)
+            if count > 1:
+                description = f"{description} x{count}"
+            entries.append(f'{name};dur={seconds * 1000:.1f};desc="{description}"')
+        entries.append(f"total;dur={(ended - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("lume_current_trace", default=None)
+
+
+@contextmanager
+def span(name: str, provider: Optional[str] = None) -> Iterator[None]:
+    """Record the ``with`` block as a stage of the current request, if any."""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.record(name, started, time.perf_counter(), provider)
+
+
+def request_id_from(headers: Dict[str, str]) -> str:
+    """The caller's request ID if it is well-formed, else a new random one."""
+    supplied = headers.get(REQUEST_ID_HEADER.lower(), "")
+    return supplied if _REQUEST_ID.match(supplied) else uuid.uuid4().hex
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that opens a ``RequestTrace`` for every HTTP request.
+
+    Spans recorded during the request (``span()`` and ``time_stage()``)
+    are summarised in a ``Server-Timing`` header on the response, next to
+    the request ID (taken from the ``REQUEST_ID_HEADER`` request header when
+    present). Streaming responses only report the stages finished before
+    their first byte.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        trace = RequestTrace(request_id_from(headers))
+        token = current_trace.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers[REQUEST_ID_HEADER] = trace.request_id
+                if SERVER_TIMING_ENABLED:
+                    response_headers["Server-Timing"] = trace.server_timing(time.perf_counter())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(token)
+            if TRACE_LOG_ENABLED:
+                logger.info(json.dumps({
+                    "request_id": trace.request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - trace.started) * 1000, 3),
+                    "stages_ms": {
+                        name: round(seconds * 1000, 3) for name, (seconds, _) in trace.stages().items()
+                    },
+                }))
@@ -2,13 +2,35 @@
 Lume Media Research API - Main Application
 """
 import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from core.metrics import REGISTRY, MetricsMiddleware
+from core.tracing import REQUEST_ID_HEADER, TracingMiddleware
+
+from providers.health import health_snapshot
+from providers.registry import ProviderRegistry
 from routers import media
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: build and warm the provider once at startup,
+    drain in-flight requests and close it at shutdown.
+    """
+    registry = ProviderRegistry.from_env()
+    await registry.start()
+    app.state.provider_registry = registry
+    try:
+        yield
+    finally:
+        await registry.stop()
+
+
 def create_application() -> FastAPI:
     """
     Application factory pattern.
@@ -26,6 +48,7 @@ def create_application() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # CORS middleware — origins are configurable via the CORS_ORIGINS env var
@@ -39,11 +62,24 @@ def create_application() -> FastAPI:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing", REQUEST_ID_HEADER],
     )
 
+    # Request counts and latency per route template, served at /metrics
+    app.add_middleware(MetricsMiddleware)
+
+    # Request ID and Server-Timing stage breakdown on every response; added
+    # last so it is outermost and its total covers the other middleware
+    app.add_middleware(TracingMiddleware)
+
     # Include routers
     app.include_router(media.router)
 
+    @app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        """Prometheus text-format metrics for this process."""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
     return app
 
 
@@ -62,24 +98,22 @@ async def root():
             "resolve": "/resolve/{query}",
             "search": "/resolve/search/{query}",
             "health": "/resolve/health/provider",
+            "metrics": "/metrics",
         },
     }
 
 
 @app.get("/health", tags=["health"])
-async def health_check():
-    """Simple health check endpoint."""
-    return {"status": "healthy"}
+async def health_check(request: Request):
+    """Liveness check, with the provider status from the latest background probe."""
+    registry = getattr(request.app.state, "provider_registry", None)
+    probe = health_snapshot(registry.provider) if registry is not None else None
+    if probe is None:
+        return {"status": "healthy"}
+    return {"status": "healthy", "provider": probe}
 
 
 if __name__ == "__main__":
-    import uvicorn
-
-    port = int(os.environ.get("PORT", "8000"))
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=True,
-        log_level="info",
-    )
+    from core.server import run
+
+    run("main:app")
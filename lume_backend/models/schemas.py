@@ -1,8 +1,13 @@
 """
 Pydantic models for Media Research API
 """
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional
+from pydantic import AnyUrl, BaseModel, Field, HttpUrl, UrlConstraints
+from typing import Annotated, Optional, Union
+
+
+BATCH_MAX_ITEMS = 50
+
+MagnetUrl = Annotated[AnyUrl, UrlConstraints(allowed_schemes=["magnet"])]
 
 
 class MediaLink(BaseModel):
@@ -11,7 +16,7 @@ class MediaLink(BaseModel):
     
     Attributes:
         title: The title of the media
-        url: Direct URL to the media resource
+        url: Direct URL to the media resource, or a magnet URI
         size: Size of the media in bytes (optional)
         seeds: Health indicator (higher = better availability)
     """
@@ -21,9 +26,9 @@ class MediaLink(BaseModel):
         max_length=500,
         description="Title of the media content"
     )
-    url: HttpUrl = Field(
+    url: Union[HttpUrl, MagnetUrl] = Field(
         ...,
-        description="Direct URL to the media resource"
+        description="Direct URL to the media resource, or a magnet URI"
     )
     size: Optional[int] = Field(
         None,
@@ -55,3 +60,65 @@ class SearchResult(BaseModel):
     results: list[MediaLink]
     total_results: int
     provider_name: str
+
+
+class SearchSummary(BaseModel):
+    """
+    Final frame of a streamed search, sent after the last result.
+
+    ``sent_results`` counts the result frames sent, at most ``limit``;
+    unlike ``SearchResult.total_results`` it is not the total match count,
+    which a stream does not know.
+    """
+    query: str
+    sent_results: int
+    provider_name: str
+
+
+class BatchResolveItem(BaseModel):
+    """
+    One title to resolve in a batch request.
+    """
+    query: str = Field(..., min_length=1, max_length=500)
+    season: Optional[int] = Field(None, description="Season number for TV shows")
+    episode: Optional[int] = Field(None, description="Episode number for TV shows")
+
+
+class BatchResolveRequest(BaseModel):
+    """
+    Titles to resolve in a single round trip.
+    """
+    items: list[BatchResolveItem] = Field(
+        ...,
+        min_length=1,
+        max_length=BATCH_MAX_ITEMS,
+        description=f"Titles to resolve (1-{BATCH_MAX_ITEMS})",
+    )
+
+
+class BatchItemError(BaseModel):
+    """
+    Per-item failure, using the same codes as the single-item endpoints.
+    """
+    status_code: int
+    error: str
+    message: str
+
+
+class BatchResolveResult(BaseModel):
+    """
+    Outcome for one batch item: either ``result`` or ``error`` is set.
+    """
+    query: str
+    season: Optional[int] = None
+    episode: Optional[int] = None
+    result: Optional[MediaLink] = None
+    error: Optional[BatchItemError] = None
+
+
+class BatchResolveResponse(BaseModel):
+    """
+    Batch outcomes, in the same order as the request items.
+    """
+    results: list[BatchResolveResult]
+    provider_name: str
@@ -0,0 +1,218 @@
+"""
+Admission Control
+Caps upstream-bound work and sheds load early, with a 503 and Retry-After,
+instead of letting every request queue behind a slow upstream.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from core.metrics import ADMISSION_REJECTIONS
+from core.tracing import span
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderConnectionError, ProviderWrapper
+
+
+ADMISSION_CONTROL_ENABLED = os.environ.get("ADMISSION_CONTROL_ENABLED", "1") != "0"
+ADMISSION_MAX_CONCURRENT = int(os.environ.get("ADMISSION_MAX_CONCURRENT", "64"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "128"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.environ.get("ADMISSION_MAX_WAIT_SECONDS", "5"))
+# Header carrying the client address when running behind a proxy, e.g.
+# "X-Forwarded-For" (the first address is used). Empty uses the peer address.
+# The first X-Forwarded-For hop is whatever the client sent, so it is only
+# trustworthy if the proxy overwrites the header rather than appending to it.
+ADMISSION_CLIENT_HEADER = os.environ.get("ADMISSION_CLIENT_HEADER", "")
+# Per-client token bucket for upstream-bound requests (0 disables). Off by
+# default unless a client header is configured: behind a proxy every client
+# would otherwise share the proxy's address, and so one bucket.
+ADMISSION_CLIENT_RATE_PER_SECOND = float(
+    os.environ.get("ADMISSION_CLIENT_RATE_PER_SECOND", "20" if ADMISSION_CLIENT_HEADER else "0")
+)
+ADMISSION_CLIENT_BURST = int(os.environ.get("ADMISSION_CLIENT_BURST", "40"))
+
+# Token buckets kept for the most recently seen clients.
+_MAX_TRACKED_CLIENTS = 10000
+
+# Client the current request is made on behalf of; set by the router.
+current_client: ContextVar[Optional[str]] = ContextVar("lume_current_client", default=None)
+
+
+class AdmissionRejectedError(ProviderConnectionError):
+    """Raised without calling upstream when a request is shed."""
+
+    error = "OVERLOADED"
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitedError(AdmissionRejectedError):
+    """The client exceeded its upstream request rate."""
+
+    error = "RATE_LIMITED"
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, up to ``burst``."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """Take one token; return 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionControlledProvider(ProviderWrapper):
+    """
+    Provider decorator that admits a bounded amount of upstream work.
+
+    - At most ``max_concurrent`` searches run at once; up to ``max_queue``
+      more wait, each for at most ``max_wait`` seconds.
+    - Each client (``current_client``) gets a token bucket of ``rate``
+      searches per second with bursts of ``burst``.
+    - Anything beyond that fails immediately with ``AdmissionRejectedError``
+      (503 with ``Retry-After``).
+
+    It sits below ``CachedProvider``, so only cache misses are counted and
+    cache hits are served regardless of upstream pressure.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_wait: float = ADMISSION_MAX_WAIT_SECONDS,
+        rate: float = ADMISSION_CLIENT_RATE_PER_SECOND,
+        burst: int = ADMISSION_CLIENT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(provider)
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+
+    def _reject(self, reason: str, error: AdmissionRejectedError) -> AdmissionRejectedError:
+        self.rejected[reason] += 1
+        ADMISSION_REJECTIONS.inc(reason)
+        return error
+
+    def _check_rate(self) -> None:
+        client = current_client.get()
+        if client is None or self.rate <= 0:
+            return
+        now = self._clock()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+            while len(self._buckets) > _MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        wait = bucket.take(now)
+        if wait > 0:
+            raise self._reject("rate_limited", RateLimitedError(
+                f"Too many requests from {client}", retry_after=max(1, math.ceil(wait)),
+            ))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold one upstream slot, or raise ``AdmissionRejectedError``."""
+        self._check_rate()
+        if self._slots.locked():
+            if self.queued >= self.max_queue:
+                raise self._reject("queue_full", AdmissionRejectedError(
+                    f"{self.name} is overloaded", retry_after=max(1, math.ceil(self.max_wait)),
+                ))
+            self.queued += 1
+            try:
+                with span("queue"):
+                    await asyncio.wait_for(self._slots.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout", AdmissionRejectedError(
+                    f"{self.name} is overloaded", retry_after=max(1, math.ceil(self.max_wait)),
+                )) from None
+            finally:
+                self.queued -= 1
+        else:
+            await self._slots.acquire()
+
+        self.active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        async with self.admit():
+            return await self.provider.search(query, season=season, episode=episode, limit=limit)
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        async with self.admit():
+            async for link in self.provider.search_iter(query, season=season, episode=episode, limit=limit):
+                yield link
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        async with self.admit():
+            return await self.provider.search_season(query, season, episodes, limit=limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.provider.stats(),
+            "admission": {
+                "active": self.active,
+                "queued": self.queued,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "tracked_clients": len(self._buckets),
+            },
+        }
@@ -0,0 +1,167 @@
+"""
+Async P2P Provider
+P2P index client on a pooled async HTTP connection, instead of the
+thread-wrapped synchronous PirateBayAPI client.
+"""
+import importlib.util
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from providers.base import ProviderConnectionError, ProviderTimeoutError
+from providers.executor import BlockingExecutor
+from providers.magnet import build_magnet, info_hash_of
+from providers.p2p_provider import PROVIDER_TIMEOUT_SECONDS, P2PProvider
+
+
+# JSON API of the index (the one PirateBayAPI scrapes): /q.php?q=<query>
+# lists results and /t.php?id=<id> describes one of them.
+P2P_INDEX_URL = os.environ.get("P2P_INDEX_URL", "https://apibay.org")
+# Connections to the index host (all requests go to that one host), how many
+# idle ones are kept alive, and for how long.
+P2P_HTTP_MAX_CONNECTIONS = int(os.environ.get("P2P_HTTP_MAX_CONNECTIONS", "20"))
+P2P_HTTP_MAX_KEEPALIVE = int(os.environ.get("P2P_HTTP_MAX_KEEPALIVE", "10"))
+P2P_HTTP_KEEPALIVE_SECONDS = float(os.environ.get("P2P_HTTP_KEEPALIVE_SECONDS", "30"))
+# Responses larger than this are abandoned mid-download.
+P2P_HTTP_MAX_RESPONSE_BYTES = int(os.environ.get("P2P_HTTP_MAX_RESPONSE_BYTES", str(2 * 1024 * 1024)))
+# HTTP/2 needs the optional "h2" package (pip install "httpx[http2]").
+P2P_HTTP2 = os.environ.get("P2P_HTTP2", "0") == "1"
+
+# id the index returns for its "No results returned" placeholder row.
+_NO_RESULTS_ID = "0"
+
+
+class IndexResult(NamedTuple):
+    """One row of an index search."""
+
+    id: str
+    name: str
+    size: int
+    seeds: int
+    info_hash: str
+
+
+class AsyncP2PProvider(P2PProvider):
+    """
+    ``P2PProvider`` that talks to the index's JSON API directly.
+
+    Searches, ranking, hedging and deadlines work exactly as in
+    ``P2PProvider``. Only the two index calls differ: they go through one
+    shared ``httpx.AsyncClient``, so requests reuse kept-alive connections
+    (HTTP/2 when enabled and available), at most ``max_connections`` are
+    open to the index, and concurrency is bounded by sockets rather than
+    threads. Magnets are built from the results' info-hashes; a result
+    without one is looked up with a second request. Bodies larger than
+    ``max_response_bytes`` are rejected with ``ProviderConnectionError``.
+    """
+
+    def __init__(
+        self,
+        base_url: str = P2P_INDEX_URL,
+        max_connections: int = P2P_HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = P2P_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = P2P_HTTP_KEEPALIVE_SECONDS,
+        max_response_bytes: int = P2P_HTTP_MAX_RESPONSE_BYTES,
+        http2: bool = P2P_HTTP2,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.name = "AsyncP2PProvider"
+        self.max_response_bytes = max_response_bytes
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(0, max_keepalive),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=self.limits,
+            http2=self.http2,
+            timeout=httpx.Timeout(PROVIDER_TIMEOUT_SECONDS, connect=5.0),
+            headers={"Accept": "application/json"},
+            transport=transport,
+        )
+        self.requests = 0
+        self.oversized = 0
+
+    def _make_executor(self) -> Optional[BlockingExecutor]:
+        # Index calls are awaited on the event loop; no threads to pool.
+        return None
+
+    async def _get_json(self, path: str, params: Dict[str, str]) -> Any:
+        """GET ``path`` and decode its JSON body, enforcing the size limit."""
+        self.requests += 1
+        try:
+            async with self._client.stream("GET", path, params=params) as response:
+                if response.status_code != 200:
+                    raise ProviderConnectionError(f"P2P index returned HTTP {response.status_code}")
+                declared = response.headers.get("Content-Length")
+                if declared is not None and declared.isdigit() and int(declared) > self.max_response_bytes:
+                    self.oversized += 1
+                    raise ProviderConnectionError(
+                        f"P2P index response of {declared} bytes exceeds {self.max_response_bytes}"
+                    )
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > self.max_response_bytes:
+                        self.oversized += 1
+                        raise ProviderConnectionError(
+                            f"P2P index response exceeds {self.max_response_bytes} bytes"
+                        )
+        except httpx.TimeoutException as exc:
+            raise ProviderTimeoutError("P2P index request timed out") from exc
+        except httpx.HTTPError as exc:
+            raise ProviderConnectionError(f"P2P index request failed: {exc}") from exc
+
+        try:
+            return json.loads(body)
+        except ValueError as exc:
+            raise ProviderConnectionError("P2P index returned invalid JSON") from exc
+
+    async def _index_search(self, formatted_query: str) -> List[Any]:
+        rows = await self._get_json("/q.php", {"q": formatted_query})
+        if not isinstance(rows, list):
+            raise ProviderConnectionError("Unexpected P2P index search response")
+        return [_index_result(row) for row in rows if str(row.get("id", _NO_RESULTS_ID)) != _NO_RESULTS_ID]
+
+    async def _index_download(self, item: Any) -> str:
+        details = await self._get_json("/t.php", {"id": str(item.id)})
+        info_hash = info_hash_of(_index_result(details)) if isinstance(details, dict) else None
+        if info_hash is None:
+            raise ProviderConnectionError(f"P2P index has no info-hash for result {item.id}")
+        return build_magnet(info_hash, str(details.get("name") or item.name))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+        await super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "http": {
+                "http2": self.http2,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive": self.limits.max_keepalive_connections,
+                "requests": self.requests,
+                "oversized": self.oversized,
+            },
+        }
+
+
+def _index_result(row: Dict[str, Any]) -> IndexResult:
+    def number(field: str) -> int:
+        value = str(row.get(field) or "0")
+        return int(value) if value.isdigit() else 0
+
+    return IndexResult(
+        id=str(row.get("id", "")),
+        name=str(row.get("name") or ""),
+        size=number("size"),
+        seeds=number("seeders"),
+        info_hash=str(row.get("info_hash") or ""),
+    )
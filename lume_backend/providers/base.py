@@ -3,8 +3,26 @@ Abstract Provider Interface
 Defines the contract for all media providers.
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 from models.schemas import MediaLink
+from providers.season_pack import SEASON_PACK_SEARCH_LIMIT, partition_by_episode
+
+
+class RankedLinks(List[MediaLink]):
+    """
+    Search results, best first, that may be the head of a longer ranking.
+
+    ``total`` is how many live (seeded) matches the provider found when it
+    built links for only the first ``limit`` of them; ``None`` means the
+    list is the whole ranking. Copies made with ``copy()`` keep it.
+    """
+
+    def __init__(self, links: Iterable[MediaLink] = (), total: Optional[int] = None):
+        super().__init__(links)
+        self.total = total
+
+    def copy(self) -> "RankedLinks":
+        return RankedLinks(self, self.total)
 
 
 class BaseProvider(ABC):
@@ -43,6 +61,62 @@ class BaseProvider(ABC):
         """
         pass
     
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        """
+        Search for media, yielding each MediaLink as soon as it is available.
+
+        The default implementation adapts ``search()`` and yields its results
+        in order once the whole list is ready. Providers that resolve results
+        incrementally should override this to yield as they go; results are
+        then yielded in completion order rather than rank order.
+
+        Raises:
+            ProviderError: If the search operation fails
+        """
+        for link in await self.search(query, season=season, episode=episode, limit=limit):
+            yield link
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        """
+        Resolve several episodes of one season with a single season search.
+
+        Issues one ``search()`` for "Title Sxx" and splits the results by the
+        SxxEyy tags in their titles. Episodes no result is tagged with are
+        missing from the returned mapping; callers fall back to a
+        per-episode ``search()`` for those.
+
+        Args:
+            query: TV show name
+            season: Season number
+            episodes: Episode numbers wanted
+            limit: Maximum number of results kept per episode
+
+        Returns:
+            Mapping of episode number to its results, best first
+
+        Raises:
+            ProviderError: If the season search fails
+        """
+        links = await self.search(query, season=season, limit=SEASON_PACK_SEARCH_LIMIT)
+        by_episode = partition_by_episode(links, season)
+        return {
+            episode: by_episode[episode][:limit] if limit else by_episode[episode]
+            for episode in episodes
+            if episode in by_episode
+        }
+
     @abstractmethod
     async def health_check(self) -> bool:
         """
@@ -53,6 +127,29 @@ class BaseProvider(ABC):
         """
         pass
     
+    async def startup(self) -> None:
+        """
+        Warm up long-lived state (indexes, pools, caches) before serving.
+
+        Called once when the application starts. The default does nothing.
+        """
+
+    async def close(self) -> None:
+        """
+        Release long-lived resources when the application shuts down.
+
+        The default does nothing.
+        """
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report runtime counters for this provider.
+
+        Returns:
+            Mapping of counter groups; empty for providers without state
+        """
+        return {}
+
     def _format_tv_query(self, query: str, season: Optional[int], episode: Optional[int]) -> str:
         """
         Format query with SxxExx notation for TV episodes.
@@ -72,6 +169,59 @@ class BaseProvider(ABC):
         return query
 
 
+class ProviderWrapper(BaseProvider):
+    """
+    Base class for providers that decorate another provider.
+
+    Every call is delegated to the wrapped provider, and the wrapper reports
+    under the wrapped provider's name so API responses are unchanged.
+    """
+
+    def __init__(self, provider: BaseProvider):
+        super().__init__(name=provider.name)
+        self.provider = provider
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        return await self.provider.search(query, season=season, episode=episode, limit=limit)
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        async for link in self.provider.search_iter(query, season=season, episode=episode, limit=limit):
+            yield link
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        return await self.provider.search_season(query, season, episodes, limit=limit)
+
+    async def health_check(self) -> bool:
+        return await self.provider.health_check()
+
+    async def startup(self) -> None:
+        await self.provider.startup()
+
+    async def close(self) -> None:
+        await self.provider.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.provider.stats()
+
+
 class ProviderError(Exception):
     """Base exception for provider-related errors."""
     pass
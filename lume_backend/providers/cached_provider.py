@@ -0,0 +1,474 @@
+"""
+Caching Provider
+Wraps any provider with a bounded TTL/LRU result cache and single-flight
+coalescing of concurrent identical searches.
+"""
+import asyncio
+import functools
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.normalization import canonicalize, normalization_stats
+from core.tracing import span
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderNotFoundError, ProviderWrapper
+from providers.persistent_cache import PERSISTENT_CACHE_WARM_ENTRIES, PersistedEntry, PersistentCache
+from providers.worker_state import WORKER_LEASE_POLL_SECONDS, WORKER_LEASE_SECONDS, WorkerState
+
+
+CACHE_MAX_ENTRIES = int(os.environ.get("RESOLVE_CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SECONDS = float(os.environ.get("RESOLVE_CACHE_TTL_SECONDS", "300"))
+CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get("RESOLVE_CACHE_NEGATIVE_TTL_SECONDS", "60"))
+
+CacheKey = Tuple[str, Optional[int], Optional[int], Optional[int]]
+
+
+class _CacheEntry:
+    """A cached search outcome: either a list of links or a not-found error."""
+
+    __slots__ = ("links", "error", "expires_at")
+
+    def __init__(
+        self,
+        expires_at: float,
+        links: Optional[List[MediaLink]] = None,
+        error: Optional[ProviderNotFoundError] = None,
+    ):
+        self.links = links
+        self.error = error
+        self.expires_at = expires_at
+
+    def result(self) -> List[MediaLink]:
+        if self.error is not None:
+            raise ProviderNotFoundError(str(self.error))
+        return self.links.copy()
+
+
+class _StreamFlight:
+    """Links produced so far by a shared upstream stream, for live followers."""
+
+    def __init__(self) -> None:
+        self.links: List[MediaLink] = []
+        self._appended: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def append(self, link: MediaLink) -> None:
+        self.links.append(link)
+        appended, self._appended = self._appended, asyncio.get_running_loop().create_future()
+        appended.set_result(None)
+
+    async def follow(self, task: asyncio.Future) -> AsyncIterator[MediaLink]:
+        """Yield every link in arrival order, then re-raise the stream's error, if any."""
+        index = 0
+        while True:
+            while index < len(self.links):
+                yield self.links[index]
+                index += 1
+            if task.done():
+                break
+            # asyncio.wait never cancels what it waits on, so a follower that
+            # goes away leaves the shared stream running for the others.
+            await asyncio.wait([self._appended, task], return_when=asyncio.FIRST_COMPLETED)
+        task.result()
+
+
+class CachedProvider(ProviderWrapper):
+    """
+    Provider decorator that caches search results in memory.
+
+    - Entries are keyed on (canonical query, season, episode, limit), so
+      spellings that ``core.normalization`` treats as equal share an entry,
+      and evicted in least-recently-used order once ``max_entries`` is reached.
+    - Successful results live for ``ttl`` seconds; ``ProviderNotFoundError``
+      and empty results are cached for ``negative_ttl`` seconds.
+    - Concurrent misses for the same key share a single upstream call,
+      whether they arrive through ``search()`` or ``search_iter()``.
+      Other provider errors are never cached.
+    - With a ``PersistentCache``, misses check it before going upstream,
+      new outcomes are written to it in the background, and ``startup()``
+      loads its ``warm_entries`` most recently used entries into memory.
+    - With a ``WorkerState`` as well, a miss first claims the key's lease
+      across worker processes. A worker that finds the lease taken polls
+      the persistent cache every ``lease_poll`` seconds for the holder's
+      result, and only goes upstream itself if the lease is freed without
+      one or ``lease_seconds`` pass.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+        negative_ttl: float = CACHE_NEGATIVE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        persistent: Optional[PersistentCache] = None,
+        warm_entries: int = PERSISTENT_CACHE_WARM_ENTRIES,
+        coordinator: Optional[WorkerState] = None,
+        lease_seconds: float = WORKER_LEASE_SECONDS,
+        lease_poll: float = WORKER_LEASE_POLL_SECONDS,
+    ):
+        super().__init__(provider)
+        self.persistent = persistent
+        self.warm_entries = warm_entries
+        self.coordinator = coordinator
+        self.lease_seconds = lease_seconds
+        self.lease_poll = lease_poll
+        self._persist_tasks: Set[asyncio.Future] = set()
+        # One writer thread keeps persistent writes and lease releases in
+        # order, so peers see a result before the lease on it disappears.
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self._streams: Dict[CacheKey, _StreamFlight] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.persistent_hits = 0
+        self.warmed = 0
+        self.peer_hits = 0
+        self.peer_timeouts = 0
+
+    def cache_key(
+        self,
+        query: str,
+        season: Optional[int],
+        episode: Optional[int],
+        limit: Optional[int],
+    ) -> CacheKey:
+        canonical = canonicalize(query, season, episode)
+        return (canonical.text, canonical.season, canonical.episode, limit)
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        """Serve from cache, join an identical in-flight search, or go upstream."""
+        key = self.cache_key(query, season, episode, limit)
+
+        with span("cache"):
+            entry = self._lookup(key)
+        if entry is not None:
+            return self._serve(entry)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(key, query, season, episode, limit))
+            task.add_done_callback(_consume_exception)
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+
+        # Shield the shared upstream call so one cancelled client does not
+        # cancel the search for everybody waiting on the same key.
+        links = await asyncio.shield(task)
+        return links.copy()
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        """
+        Stream results from cache, an identical in-flight search, or upstream.
+
+        A miss starts one shared upstream stream that every identical caller
+        follows live (and that plain ``search()`` callers can join); its
+        results are cached, re-ranked by seeds, once the stream completes.
+        """
+        key = self.cache_key(query, season, episode, limit)
+
+        with span("cache"):
+            entry = self._lookup(key)
+        if entry is not None:
+            for link in self._serve(entry):
+                yield link
+            return
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            flight = _StreamFlight()
+            task = asyncio.ensure_future(self._fetch_stream(key, flight, query, season, episode, limit))
+            task.add_done_callback(_consume_exception)
+            self._in_flight[key] = task
+            self._streams[key] = flight
+        else:
+            self.coalesced += 1
+            flight = self._streams.get(key)
+
+        if flight is None:
+            # Joined a plain search(): its results only exist once it finishes.
+            for link in await asyncio.shield(task):
+                yield link
+            return
+
+        async for link in flight.follow(task):
+            yield link
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        """
+        Serve cached episodes directly; otherwise run one season search on
+        the wrapped provider and store every episode it answers under its own
+        episode key, so later single-episode lookups are hits too.
+        """
+        episodes = list(episodes)
+        answers: Dict[int, List[MediaLink]] = {}
+        for episode in episodes:
+            entry = self._lookup(self.cache_key(query, season, episode, limit))
+            if entry is not None and entry.error is None and entry.links:
+                answers[episode] = list(entry.links)
+        self.hits += len(answers)
+        missing = [episode for episode in episodes if episode not in answers]
+        if not missing:
+            return answers
+
+        fetched = await super().search_season(query, season, missing, limit=limit)
+        for episode, links in fetched.items():
+            self._remember(self.cache_key(query, season, episode, limit), list(links))
+        return {**answers, **fetched}
+
+    def _serve(self, entry: _CacheEntry) -> List[MediaLink]:
+        if entry.error is not None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return entry.result()
+
+    async def _fetch(
+        self,
+        key: CacheKey,
+        query: str,
+        season: Optional[int],
+        episode: Optional[int],
+        limit: Optional[int],
+    ) -> List[MediaLink]:
+        entry = None
+        leased = False
+        try:
+            entry = await self._load_persisted(key)
+            if entry is None:
+                leased, entry = await self._coordinate(key)
+            if entry is not None:
+                return entry.result()
+            links = await self.provider.search(query, season=season, episode=episode, limit=limit)
+            self._remember(key, links.copy())
+            return links
+        except ProviderNotFoundError as exc:
+            if entry is None:
+                self._remember_not_found(key, exc)
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+            if leased:
+                self._write_behind(self.coordinator.release, key)
+
+    async def _fetch_stream(
+        self,
+        key: CacheKey,
+        flight: "_StreamFlight",
+        query: str,
+        season: Optional[int],
+        episode: Optional[int],
+        limit: Optional[int],
+    ) -> List[MediaLink]:
+        entry = None
+        leased = False
+        try:
+            entry = await self._load_persisted(key)
+            if entry is None:
+                leased, entry = await self._coordinate(key)
+            if entry is not None:
+                for link in entry.result():
+                    flight.append(link)
+                return entry.result()
+            async for link in self.provider.search_iter(query, season=season, episode=episode, limit=limit):
+                flight.append(link)
+            links = sorted(flight.links, key=lambda link: link.seeds, reverse=True)
+            self._remember(key, links)
+            return links
+        except ProviderNotFoundError as exc:
+            if entry is None:
+                self._remember_not_found(key, exc)
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+            self._streams.pop(key, None)
+            if leased:
+                self._write_behind(self.coordinator.release, key)
+
+    async def _coordinate(self, key: CacheKey) -> Tuple[bool, Optional[_CacheEntry]]:
+        """
+        Decide whether this worker goes upstream for ``key``.
+
+        Returns ``(True, None)`` once the lease is ours, ``(False, entry)``
+        when another worker's result showed up while waiting, and
+        ``(False, None)`` when the wait ran out (or there is no coordinator).
+        A result a peer stored between our cache miss and the claim is
+        returned as ``(True, entry)``: the lease is ours to release, but
+        there is no need to go upstream.
+        """
+        if self.coordinator is None or self.persistent is None:
+            return False, None
+        deadline = time.monotonic() + self.lease_seconds
+        with span("lease"):
+            while True:
+                if await asyncio.to_thread(self.coordinator.claim, key, self.lease_seconds):
+                    entry = await self._load_persisted(key)
+                    if entry is not None:
+                        self.peer_hits += 1
+                    return True, entry
+                if time.monotonic() >= deadline:
+                    self.peer_timeouts += 1
+                    return False, None
+                await asyncio.sleep(self.lease_poll)
+                entry = await self._load_persisted(key)
+                if entry is not None:
+                    self.peer_hits += 1
+                    return False, entry
+
+    def _remember(self, key: CacheKey, links: List[MediaLink]) -> None:
+        ttl = self.ttl if links else self.negative_ttl
+        self._store(key, _CacheEntry(self._clock() + ttl, links=links))
+        self._persist(key, ttl, links=links)
+
+    def _remember_not_found(self, key: CacheKey, exc: ProviderNotFoundError) -> None:
+        self._store(key, _CacheEntry(self._clock() + self.negative_ttl, error=exc))
+        self._persist(key, self.negative_ttl, not_found=str(exc))
+
+    def _persist(self, key: CacheKey, ttl: float, **outcome: Any) -> None:
+        """Write an outcome to the persistent tier without delaying the response."""
+        if self.persistent is not None:
+            self._write_behind(self.persistent.put, key, ttl, **outcome)
+
+    def _write_behind(self, write: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lume-cache-writer")
+        task = asyncio.get_running_loop().run_in_executor(self._writer, functools.partial(write, *args, **kwargs))
+        self._persist_tasks.add(task)
+        task.add_done_callback(self._persist_tasks.discard)
+        task.add_done_callback(_consume_exception)
+
+    async def _load_persisted(self, key: CacheKey) -> Optional[_CacheEntry]:
+        """Promote an unexpired persistent entry into memory, if there is one."""
+        if self.persistent is None:
+            return None
+        with span("cache"):
+            persisted = await asyncio.to_thread(self.persistent.get, key)
+        if persisted is None:
+            return None
+        self.persistent_hits += 1
+        entry = self._entry_from(persisted)
+        self._store(key, entry)
+        return entry
+
+    def _entry_from(self, persisted: PersistedEntry) -> _CacheEntry:
+        # Persisted expiry is wall-clock; the in-memory tier uses its own clock.
+        expires_at = self._clock() + max(0.0, persisted.expires_at - time.time())
+        if persisted.not_found is not None:
+            return _CacheEntry(expires_at, error=ProviderNotFoundError(persisted.not_found))
+        return _CacheEntry(expires_at, links=persisted.links)
+
+    async def startup(self) -> None:
+        await self.provider.startup()
+        if self.persistent is None or self.warm_entries <= 0:
+            return
+        recent = await asyncio.to_thread(self.persistent.recent, self.warm_entries)
+        # Oldest first, so the most recently used entries end up freshest in the LRU.
+        for persisted in reversed(recent):
+            self._store(persisted.key, self._entry_from(persisted))
+        self.warmed = len(recent)
+
+    async def close(self) -> None:
+        if self._persist_tasks:
+            await asyncio.gather(*self._persist_tasks, return_exceptions=True)
+        if self._writer is not None:
+            self._writer.shutdown()
+            self._writer = None
+        if self.persistent is not None:
+            self.persistent.close()
+        await self.provider.close()
+        # Closed last: the health monitor below publishes probes through it.
+        if self.coordinator is not None:
+            self.coordinator.close()
+
+    def contains(self, key: CacheKey) -> bool:
+        """Whether ``key`` is cached or being fetched, without touching stats or recency."""
+        entry = self._entries.get(key)
+        return key in self._in_flight or (entry is not None and entry.expires_at > self._clock())
+
+    def _lookup(self, key: CacheKey) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: CacheKey, entry: _CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry (in-flight searches are unaffected)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        served_without_upstream = self.hits + self.negative_hits + self.coalesced
+        return {
+            **self.provider.stats(),
+            "cache": {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_ratio": round(served_without_upstream / lookups, 4) if lookups else 0.0,
+            },
+            "query_normalization": normalization_stats(),
+            **({"persistent_cache": {
+                **self.persistent.stats(),
+                "promoted": self.persistent_hits,
+                "warmed": self.warmed,
+            }} if self.persistent is not None else {}),
+            **({"worker_coordination": {
+                **self.coordinator.stats(),
+                "peer_hits": self.peer_hits,
+                "peer_timeouts": self.peer_timeouts,
+            }} if self.coordinator is not None else {}),
+        }
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    """Mark a shared task's exception as retrieved if every waiter went away."""
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,194 @@
+"""
+Catalog Index
+Precomputed search index over a media catalog, used by MockProvider so that
+large load-test catalogs can be searched without scanning every record.
+"""
+import json
+import random
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.normalization import normalize_text
+
+CatalogRecord = Dict[str, Any]
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+_EPISODE_PATTERN = re.compile(r"(?=s(\d\d)e(\d\d))")
+_GRAM_SIZE = 3
+
+
+def load_catalog(path: str) -> List[CatalogRecord]:
+    """
+    Load catalog records from a JSON array or a JSON-lines file.
+
+    Each record needs ``title``, ``url``, ``seeds`` and optionally ``size``.
+    """
+    with open(path, encoding="utf-8") as handle:
+        content = handle.read()
+
+    stripped = content.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+_TITLE_WORDS = (
+    "silent", "crimson", "broken", "hidden", "last", "dark", "golden", "lost",
+    "frozen", "wild", "iron", "midnight", "electric", "hollow", "savage", "quiet",
+    "river", "empire", "signal", "garden", "harbor", "frontier", "machine", "kingdom",
+    "orbit", "shadow", "storm", "echo", "legacy", "circuit", "horizon", "station",
+)
+_QUALITIES = ("720p WEB-DL", "1080p WEB-DL", "1080p BluRay", "2160p HDR", "1080p NF WEB-DL")
+
+
+def generate_catalog(size: int, seed: int = 0) -> List[CatalogRecord]:
+    """
+    Generate a deterministic synthetic catalog of ``size`` records.
+
+    Roughly half of the records are TV episodes titled "Show SxxEyy ...",
+    the rest are movies titled "Title (Year) ...".
+    """
+    rng = random.Random(seed)
+    records = []
+    for index in range(size):
+        name = " ".join(rng.choice(_TITLE_WORDS) for _ in range(rng.randint(1, 3))).title()
+        quality = rng.choice(_QUALITIES)
+        if index % 2:
+            title = f"{name} S{rng.randint(1, 12):02d}E{rng.randint(1, 24):02d} {quality}"
+            url = f"https://mock-cdn.example.com/tv/{index}.mkv"
+        else:
+            title = f"{name} ({rng.randint(1970, 2025)}) {quality}"
+            url = f"https://mock-cdn.example.com/movies/{index}.mkv"
+        records.append({
+            "title": title,
+            "url": url,
+            "size": rng.randint(500_000_000, 25_000_000_000),
+            "seeds": rng.randint(0, 5000),
+        })
+    return records
+
+
+class CatalogIndex:
+    """
+    Token index over a catalog for substring title search.
+
+    Records are stored in seed order (highest first), so record ids double
+    as rank and candidate ids only need sorting, not re-ranking. At build
+    time each title is folded once with ``normalize_text`` (the same folding
+    queries get from ``canonicalize``), split into alphanumeric tokens and
+    scanned for SxxEyy episode tags. The token vocabulary is indexed by
+    character trigrams.
+
+    A query substring match implies every alphanumeric token of the query
+    is contained in some token of the title, so the records posted under
+    the vocabulary tokens containing the query's most selective token form
+    a complete candidate set. Candidates are then verified with a plain
+    substring test, which keeps results identical to a linear scan.
+    """
+
+    def __init__(self, records: Iterable[CatalogRecord]):
+        self.records: List[CatalogRecord] = sorted(
+            records, key=lambda record: record["seeds"], reverse=True
+        )
+        self.titles: List[str] = [normalize_text(record["title"]) for record in self.records]
+
+        self._postings: Dict[str, List[int]] = {}
+        self._episodes: Dict[Tuple[int, int], List[int]] = {}
+        for record_id, title in enumerate(self.titles):
+            for token in set(_TOKEN_PATTERN.findall(title)):
+                self._postings.setdefault(token, []).append(record_id)
+            for season, episode in set(_EPISODE_PATTERN.findall(title)):
+                self._episodes.setdefault((int(season), int(episode)), []).append(record_id)
+
+        self._grams: Dict[str, Set[str]] = {}
+        for token in self._postings:
+            for gram in _grams(token):
+                self._grams.setdefault(gram, set()).add(token)
+
+        self._tokens_containing = lru_cache(maxsize=4096)(self._find_tokens_containing)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def search(
+        self,
+        query_lower: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Return ids (in rank order) of records whose normalized title
+        contains ``query_lower`` and, when given, the SxxEyy / Sxx tag.
+        An empty query matches nothing.
+        """
+        if not query_lower.strip():
+            return []
+        candidates = self._candidates(query_lower, season, episode)
+        if candidates is None:
+            candidates = range(len(self.titles))
+
+        season_tag = episode_tag = None
+        if season is not None and episode is not None:
+            episode_tag = f"s{season:02d}e{episode:02d}"
+        elif season is not None:
+            season_tag = f"s{season:02d}"
+
+        titles = self.titles
+        return [
+            record_id
+            for record_id in candidates
+            if query_lower in titles[record_id]
+            and (episode_tag is None or episode_tag in titles[record_id])
+            and (season_tag is None or season_tag in titles[record_id])
+        ]
+
+    def _candidates(
+        self,
+        query_lower: str,
+        season: Optional[int],
+        episode: Optional[int],
+    ) -> Optional[Iterable[int]]:
+        """Smallest complete candidate set, or ``None`` to fall back to a scan."""
+        best: Optional[List[int]] = None
+        best_tokens: Optional[Tuple[str, ...]] = None
+        best_size = len(self.titles) + 1
+
+        if season is not None and episode is not None and season < 100 and episode < 100:
+            best = self._episodes.get((season, episode), [])
+            best_size = len(best)
+
+        for token in set(_TOKEN_PATTERN.findall(query_lower)):
+            matching = self._tokens_containing(token)
+            size = sum(len(self._postings[vocab_token]) for vocab_token in matching)
+            if size < best_size:
+                best, best_tokens, best_size = None, matching, size
+
+        if best_tokens is None:
+            return best
+        if len(best_tokens) == 1:
+            return self._postings[best_tokens[0]]
+        return sorted({
+            record_id
+            for vocab_token in best_tokens
+            for record_id in self._postings[vocab_token]
+        })
+
+    def _find_tokens_containing(self, token: str) -> Tuple[str, ...]:
+        """Vocabulary tokens that contain ``token`` as a substring."""
+        if len(token) < _GRAM_SIZE:
+            pool: Iterable[str] = self._postings
+        else:
+            # Any vocabulary token containing ``token`` contains all of its
+            # trigrams, so the rarest trigram bounds the tokens to check.
+            pool = min(
+                (self._grams.get(gram, ()) for gram in _grams(token)),
+                key=len,
+            )
+        return tuple(vocab_token for vocab_token in pool if token in vocab_token)
+
+
+def _grams(token: str) -> Set[str]:
+    if len(token) < _GRAM_SIZE:
+        return set()
+    return {token[i:i + _GRAM_SIZE] for i in range(len(token) - _GRAM_SIZE + 1)}
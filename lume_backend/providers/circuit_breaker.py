@@ -0,0 +1,268 @@
+"""
+Circuit Breaker
+Adaptive timeouts and fail-fast protection for provider calls.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from models.schemas import MediaLink
+from providers.base import (
+    BaseProvider,
+    ProviderConnectionError,
+    ProviderNotFoundError,
+    ProviderTimeoutError,
+    ProviderWrapper,
+)
+
+
+BREAKER_WINDOW_SIZE = int(os.environ.get("BREAKER_WINDOW_SIZE", "100"))
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", "10"))
+BREAKER_FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.environ.get("BREAKER_HALF_OPEN_PROBES", "3"))
+
+# Adaptive timeout: observed p99 latency times the multiplier, clamped to
+# [min, max].  Until enough calls are observed the max timeout applies.  The
+# default max sits above P2P_SEARCH_DEADLINE_SECONDS so a healthy P2P search
+# hits its own deadline (and returns partial results) first.
+ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.environ.get("ADAPTIVE_TIMEOUT_MULTIPLIER", "2.0"))
+ADAPTIVE_TIMEOUT_MIN_SECONDS = float(os.environ.get("ADAPTIVE_TIMEOUT_MIN_SECONDS", "2"))
+ADAPTIVE_TIMEOUT_MAX_SECONDS = float(os.environ.get("ADAPTIVE_TIMEOUT_MAX_SECONDS", "25"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_Result = TypeVar("_Result")
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker with latency-derived timeouts.
+
+    - **closed**: calls pass through. Once the window holds ``min_calls``
+      outcomes and the failure rate reaches ``failure_rate``, the breaker opens.
+    - **open**: calls are rejected immediately with ``ProviderConnectionError``
+      until ``open_seconds`` have passed.
+    - **half_open**: up to ``probes`` concurrent calls are let through.
+      ``probes`` successes close the breaker; any failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = BREAKER_WINDOW_SIZE,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        probes: int = BREAKER_HALF_OPEN_PROBES,
+        timeout_multiplier: float = ADAPTIVE_TIMEOUT_MULTIPLIER,
+        min_timeout: float = ADAPTIVE_TIMEOUT_MIN_SECONDS,
+        max_timeout: float = ADAPTIVE_TIMEOUT_MAX_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.probes = max(1, probes)
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._clock = clock
+
+        # (latency seconds, succeeded) per completed call, newest last.
+        self._window: Deque[Tuple[float, bool]] = deque(maxlen=max(1, window_size))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._timeout: Optional[float] = None
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def timeout(self) -> float:
+        """Timeout for the next call, derived from observed p99 latency."""
+        if self._timeout is None:
+            latencies = [latency for latency, ok in self._window if ok]
+            if len(latencies) < self.min_calls:
+                self._timeout = self.max_timeout
+            else:
+                derived = _percentile(latencies, 0.99) * self.timeout_multiplier
+                self._timeout = min(self.max_timeout, max(self.min_timeout, derived))
+        return self._timeout
+
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            ProviderConnectionError: If the breaker is open or out of probes
+        """
+        state = self.state
+        if state == OPEN:
+            self.rejected += 1
+            raise ProviderConnectionError(f"{self.name} circuit is open; failing fast")
+        if state == HALF_OPEN:
+            if self._probes_in_flight >= self.probes:
+                self.rejected += 1
+                raise ProviderConnectionError(f"{self.name} circuit is half-open; probe limit reached")
+            self._probes_in_flight += 1
+
+    def record_success(self, latency: float) -> None:
+        self._record(latency, ok=True)
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.probes:
+                self._state = CLOSED
+                self._window.clear()
+                self._timeout = None
+
+    def record_failure(self, latency: float) -> None:
+        self._record(latency, ok=False)
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        if self._state == CLOSED and len(self._window) >= self.min_calls:
+            failures = sum(1 for _, ok in self._window if not ok)
+            if failures / len(self._window) >= self.failure_rate:
+                self._open()
+
+    def record_abandoned(self) -> None:
+        """Release a half-open probe slot for a call that never completed."""
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, latency: float, ok: bool) -> None:
+        self._window.append((latency, ok))
+        self._timeout = None
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.times_opened += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and rolling statistics for health reporting."""
+        latencies = [latency for latency, ok in self._window if ok]
+        failures = sum(1 for _, ok in self._window if not ok)
+        return {
+            "state": self.state,
+            "calls": len(self._window),
+            "failure_rate": round(failures / len(self._window), 4) if self._window else 0.0,
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+            "timeout_seconds": round(self.timeout(), 3),
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+class CircuitBreakerProvider(ProviderWrapper):
+    """
+    Provider decorator that runs every search through a ``CircuitBreaker``.
+
+    Searches are bounded by the breaker's adaptive timeout and raise
+    ``ProviderTimeoutError`` when it elapses. ``ProviderNotFoundError`` counts
+    as a healthy upstream response; timeouts, connection errors and
+    unexpected exceptions count as failures.
+    """
+
+    def __init__(self, provider: BaseProvider, breaker: Optional[CircuitBreaker] = None):
+        super().__init__(provider)
+        self.breaker = breaker or CircuitBreaker(provider.name)
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        return await self._call(
+            lambda: self.provider.search(query, season=season, episode=episode, limit=limit)
+        )
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        return await self._call(
+            lambda: self.provider.search_season(query, season, episodes, limit=limit)
+        )
+
+    async def _call(self, operation: Callable[[], Awaitable[_Result]]) -> _Result:
+        """Run ``operation`` under the adaptive timeout and record its outcome."""
+        self.breaker.before_call()
+        timeout = self.breaker.timeout()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(operation(), timeout=timeout)
+        except ProviderNotFoundError:
+            self.breaker.record_success(time.perf_counter() - started)
+            raise
+        except asyncio.TimeoutError as exc:
+            self.breaker.record_failure(time.perf_counter() - started)
+            raise ProviderTimeoutError(
+                f"{self.name} search exceeded adaptive timeout of {timeout:.1f}s"
+            ) from exc
+        except BaseException as exc:
+            if not isinstance(exc, asyncio.CancelledError):
+                self.breaker.record_failure(time.perf_counter() - started)
+            else:
+                self.breaker.record_abandoned()
+            raise
+
+        self.breaker.record_success(time.perf_counter() - started)
+        return result
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        """Stream through the breaker; the outcome is recorded when the stream ends."""
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            async for link in self.provider.search_iter(query, season=season, episode=episode, limit=limit):
+                yield link
+        except ProviderNotFoundError:
+            self.breaker.record_success(time.perf_counter() - started)
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            self.breaker.record_abandoned()
+            raise
+        except BaseException:
+            self.breaker.record_failure(time.perf_counter() - started)
+            raise
+        self.breaker.record_success(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.provider.stats(), "circuit_breaker": self.breaker.snapshot()}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
@@ -0,0 +1,273 @@
+"""
+Composite Provider
+Fans a search out to several providers concurrently and merges the results.
+"""
+import asyncio
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+from models.schemas import MediaLink
+from providers.base import (
+    BaseProvider,
+    ProviderConnectionError,
+    ProviderNotFoundError,
+    ProviderTimeoutError,
+)
+
+
+COMPOSITE_DEADLINE_SECONDS = float(os.environ.get("COMPOSITE_DEADLINE_SECONDS", "20"))
+COMPOSITE_MIN_SEEDS = int(os.environ.get("COMPOSITE_MIN_SEEDS", "10"))
+# Delay before a slow child gets a second, hedged request.  0 disables hedging.
+COMPOSITE_HEDGE_DELAY_SECONDS = float(os.environ.get("COMPOSITE_HEDGE_DELAY_SECONDS", "0"))
+
+_INFO_HASH_PATTERN = re.compile(r"urn:btih:([0-9a-z]+)", re.IGNORECASE)
+
+
+def dedupe_key(link: MediaLink) -> str:
+    """
+    Identity of a media link for deduplication.
+
+    Magnet links (or any URL carrying ``urn:btih``) are identified by their
+    info-hash; everything else by a normalized URL (lower-cased scheme and
+    host, no fragment, no trailing slash).
+    """
+    url = str(link.url)
+    match = _INFO_HASH_PATTERN.search(url)
+    if match:
+        return f"btih:{match.group(1).lower()}"
+
+    parts = urlsplit(url)
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        parts.query,
+        "",
+    ))
+
+
+def merge_results(result_sets: Sequence[List[MediaLink]]) -> List[MediaLink]:
+    """Merge result lists, keep the best-seeded copy of duplicates, rank by seeds."""
+    best: Dict[str, MediaLink] = {}
+    for results in result_sets:
+        for link in results:
+            key = dedupe_key(link)
+            current = best.get(key)
+            if current is None or link.seeds > current.seeds:
+                best[key] = link
+    return sorted(best.values(), key=lambda link: link.seeds, reverse=True)
+
+
+class CompositeProvider(BaseProvider):
+    """
+    Provider that queries several child providers in parallel.
+
+    Results are merged, deduplicated and re-ranked by seeds. The search
+    returns early once ``limit`` results with at least ``min_seeds`` seeds
+    are in, or when ``deadline`` elapses. A child that fails (timeout,
+    connection error, no results) only removes its own contribution; the
+    search fails only if every child fails.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[BaseProvider],
+        deadline: float = COMPOSITE_DEADLINE_SECONDS,
+        min_seeds: int = COMPOSITE_MIN_SEEDS,
+        hedge_delay: Optional[float] = COMPOSITE_HEDGE_DELAY_SECONDS or None,
+        name: str = "CompositeProvider",
+    ):
+        if not providers:
+            raise ValueError("CompositeProvider needs at least one child provider")
+        super().__init__(name=name)
+        self.providers = list(providers)
+        self.deadline = deadline
+        self.min_seeds = min_seeds
+        self.hedge_delay = hedge_delay
+
+        self.searches = 0
+        self.early_returns = 0
+        self.deadline_hits = 0
+        self.hedged_requests = 0
+        self.child_failures: Dict[str, int] = {child.name: 0 for child in self.providers}
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        """Search every child concurrently and return the merged ranking."""
+        self.searches += 1
+        target = max(1, limit or 10)
+
+        tasks = {
+            asyncio.ensure_future(self._search_child(child, query, season, episode, limit)): child
+            for child in self.providers
+        }
+        result_sets: List[List[MediaLink]] = []
+        errors: List[Exception] = []
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.deadline_hits += 1
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        result_sets.append(task.result())
+                        continue
+                    errors.append(exc)
+                    if not isinstance(exc, ProviderNotFoundError):
+                        self.child_failures[tasks[task].name] += 1
+
+                if pending and self._has_enough(result_sets, target):
+                    self.early_returns += 1
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        merged = merge_results(result_sets)
+        if merged:
+            return merged[:limit] if limit else merged
+        if result_sets:
+            return []
+        raise self._combined_error(errors, timed_out=bool(pending), query=query)
+
+    async def _search_child(
+        self,
+        child: BaseProvider,
+        query: str,
+        season: Optional[int],
+        episode: Optional[int],
+        limit: Optional[int],
+    ) -> List[MediaLink]:
+        """Search one child, sending a hedged duplicate request if it is slow."""
+        attempts = [asyncio.ensure_future(child.search(query, season=season, episode=episode, limit=limit))]
+        try:
+            if self.hedge_delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=self.hedge_delay)
+                if not done:
+                    self.hedged_requests += 1
+                    attempts.append(asyncio.ensure_future(
+                        child.search(query, season=season, episode=episode, limit=limit)
+                    ))
+
+            pending = set(attempts)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    last_error = attempt.exception()
+            raise last_error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        """
+        Run every child's own season search concurrently and merge the
+        results episode by episode. Children still running at ``deadline``
+        are dropped; the search fails only if no child answered.
+        """
+        episodes = list(episodes)
+        tasks = {
+            asyncio.ensure_future(child.search_season(query, season, episodes, limit=limit)): child
+            for child in self.providers
+        }
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if pending:
+            self.deadline_hits += 1
+
+        answers: List[Dict[int, List[MediaLink]]] = []
+        errors: List[Exception] = []
+        for task in done:
+            exc = task.exception()
+            if exc is None:
+                answers.append(task.result())
+                continue
+            errors.append(exc)
+            if not isinstance(exc, ProviderNotFoundError):
+                self.child_failures[tasks[task].name] += 1
+        if not answers:
+            raise self._combined_error(errors, timed_out=bool(pending), query=query)
+
+        merged: Dict[int, List[MediaLink]] = {}
+        for episode in episodes:
+            links = merge_results([answer[episode] for answer in answers if episode in answer])
+            if links:
+                merged[episode] = links[:limit] if limit else links
+        return merged
+
+    def _has_enough(self, result_sets: List[List[MediaLink]], target: int) -> bool:
+        quality = {
+            dedupe_key(link)
+            for results in result_sets
+            for link in results
+            if link.seeds >= self.min_seeds
+        }
+        return len(quality) >= target
+
+    def _combined_error(self, errors: List[Exception], timed_out: bool, query: str) -> Exception:
+        """Pick the error to surface when no child produced results."""
+        if timed_out or any(isinstance(exc, ProviderTimeoutError) for exc in errors):
+            return ProviderTimeoutError(f"All providers timed out for: {query}")
+        if errors and all(isinstance(exc, ProviderNotFoundError) for exc in errors):
+            return ProviderNotFoundError(f"No results found for: {query}")
+        return ProviderConnectionError(f"All providers failed for: {query}")
+
+    async def health_check(self) -> bool:
+        """Healthy while at least one child provider is healthy."""
+        checks = await asyncio.gather(
+            *(child.health_check() for child in self.providers),
+            return_exceptions=True,
+        )
+        return any(check is True for check in checks)
+
+    async def startup(self) -> None:
+        await asyncio.gather(*(child.startup() for child in self.providers))
+
+    async def close(self) -> None:
+        await asyncio.gather(
+            *(child.close() for child in self.providers),
+            return_exceptions=True,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "composite": {
+                "searches": self.searches,
+                "early_returns": self.early_returns,
+                "deadline_hits": self.deadline_hits,
+                "hedged_requests": self.hedged_requests,
+                "child_failures": dict(self.child_failures),
+            },
+            "providers": {child.name: child.stats() for child in self.providers},
+        }
@@ -0,0 +1,162 @@
+"""
+Provider Executor
+Dedicated, bounded thread pool for blocking provider I/O.
+"""
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Set, Tuple, TypeVar
+
+from core.metrics import EXECUTOR_REJECTIONS, REGISTRY, Gauge
+from providers.base import ProviderConnectionError
+
+
+T = TypeVar("T")
+
+# Live executors, read by the gauges below when /metrics is rendered.
+_EXECUTORS: "weakref.WeakSet[BlockingExecutor]" = weakref.WeakSet()
+
+
+class BlockingExecutor:
+    """
+    Separately sized thread pool with admission control for blocking calls.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a thread; anything beyond that is rejected immediately with
+    ``ProviderConnectionError`` instead of queueing without bound.
+
+    A caller that gives up (timeout or cancellation) cannot stop a call that
+    is already running in a thread. Such calls are counted as *abandoned*
+    and keep occupying their slot until the thread actually returns, so a
+    slow upstream shows up as saturation rather than as hidden zombie work.
+    Calls cancelled while still queued are dropped without running.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._abandoned: Set[Future] = set()
+
+        self.completed = 0
+        self.rejected = 0
+        self.abandoned_total = 0
+        _EXECUTORS.add(self)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run ``func(*args)`` in the pool and await its result.
+
+        Raises:
+            ProviderConnectionError: If the pool and its queue are full
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                saturated = True
+            else:
+                self._pending += 1
+                saturated = False
+        if saturated:
+            EXECUTOR_REJECTIONS.inc(self.name)
+            raise ProviderConnectionError(
+                f"{self.name} executor saturated ({self.capacity} calls running or queued)"
+            )
+
+        try:
+            future = self._pool.submit(self._invoke, func, args)
+        except RuntimeError as exc:  # pool already shut down
+            with self._lock:
+                self._pending -= 1
+            raise ProviderConnectionError(f"{self.name} executor is closed") from exc
+        future.add_done_callback(self._on_done)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # wrap_future has already tried to cancel the thread future; that
+            # only succeeds while the call is still queued.
+            with self._lock:
+                if not future.done():
+                    self._abandoned.add(future)
+                    self.abandoned_total += 1
+            raise
+
+    def _invoke(self, func: Callable[..., T], args: tuple) -> T:
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._abandoned.discard(future)
+            if not future.cancelled():
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop queued calls; running calls finish in the background."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        _EXECUTORS.discard(self)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "abandoned_running": len(self._abandoned),
+                "abandoned_total": self.abandoned_total,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+def _executor_gauge(field: str) -> Callable[[], Dict[Tuple[str], float]]:
+    def read() -> Dict[Tuple[str], float]:
+        totals: Dict[Tuple[str], float] = {}
+        for executor in list(_EXECUTORS):
+            key = (executor.name,)
+            totals[key] = totals.get(key, 0) + executor.stats()[field]
+        return totals
+    return read
+
+
+REGISTRY.register(Gauge(
+    "lume_executor_running_calls",
+    "Blocking provider calls currently running in a dedicated executor.",
+    _executor_gauge("running"),
+    ("executor",),
+))
+REGISTRY.register(Gauge(
+    "lume_executor_queued_calls",
+    "Blocking provider calls waiting for a thread in a dedicated executor.",
+    _executor_gauge("queued"),
+    ("executor",),
+))
+REGISTRY.register(Gauge(
+    "lume_executor_abandoned_calls",
+    "Calls whose caller gave up but whose thread is still running.",
+    _executor_gauge("abandoned_running"),
+    ("executor",),
+))
+REGISTRY.register(Gauge(
+    "lume_executor_capacity",
+    "Worker threads plus admission queue slots of a dedicated executor.",
+    lambda: {(executor.name,): executor.capacity for executor in list(_EXECUTORS)},
+    ("executor",),
+))
@@ -0,0 +1,254 @@
+"""
+Provider Health Monitor
+Probes provider health in the background, caches the latest result and
+fails searches fast while the provider is known to be down.
+"""
+import asyncio
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from core.metrics import time_stage
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderConnectionError, ProviderWrapper
+from providers.worker_state import WorkerState
+
+
+HEALTH_GATE_ENABLED = os.environ.get("HEALTH_GATE_ENABLED", "1") != "0"
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.environ.get("HEALTH_PROBE_INTERVAL_SECONDS", "15"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.environ.get("HEALTH_PROBE_TIMEOUT_SECONDS", "10"))
+HEALTH_FAILURE_THRESHOLD = int(os.environ.get("HEALTH_FAILURE_THRESHOLD", "2"))
+
+UNKNOWN = "unknown"
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+
+
+class ProviderDownError(ProviderConnectionError):
+    """Raised without calling upstream because health probes report it down."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class HealthMonitor:
+    """
+    Runs ``provider.health_check()`` on a fixed interval.
+
+    Health endpoints read the cached ``snapshot()`` instead of probing the
+    upstream per request. The provider is reported unhealthy — and
+    ``ready`` turns false — after ``failure_threshold`` consecutive failed
+    or timed-out probes; a single successful probe makes it healthy again.
+    Until the first probe finishes the status is ``unknown`` and the
+    provider counts as ready.
+
+    With a ``WorkerState`` shared by several worker processes, a probe
+    another worker ran within the last ``interval`` is adopted instead of
+    probing again, and each probe this worker runs is published to them.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        interval: float = HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout: float = HEALTH_PROBE_TIMEOUT_SECONDS,
+        failure_threshold: int = HEALTH_FAILURE_THRESHOLD,
+        shared: Optional[WorkerState] = None,
+    ):
+        self.provider = provider
+        self.shared = shared
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = max(1, failure_threshold)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        self.status = UNKNOWN
+        self.checked_at: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.probes = 0
+        self.adopted = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.status != UNHEALTHY
+
+    def start(self) -> None:
+        """Start the background probe loop (the first probe runs immediately)."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run(self._stopping))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        # The flag ends the loop even if the cancel below is swallowed by a
+        # probe's wait_for finishing in the same loop iteration.
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, stopping: asyncio.Event) -> None:
+        while not stopping.is_set():
+            if not await self._adopt_peer_probe():
+                await self.probe()
+                await self._publish_probe()
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def probe(self) -> bool:
+        """Run one health check now and record its outcome."""
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            with time_stage(self.provider.name, "health_check"):
+                healthy = await asyncio.wait_for(self.provider.health_check(), timeout=self.timeout)
+            if not healthy:
+                error = "health check reported unhealthy"
+        except asyncio.TimeoutError:
+            error = f"health check timed out after {self.timeout:.1f}s"
+        except Exception as exc:  # noqa: BLE001 - any probe failure is a health signal
+            error = f"{type(exc).__name__}: {exc}"
+
+        self.probes += 1
+        self.latency = time.perf_counter() - started
+        self.checked_at = time.time()
+        self.last_error = error
+        if error is None:
+            self.consecutive_failures = 0
+            self.status = HEALTHY
+        else:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.status = UNHEALTHY
+        return error is None
+
+    async def _adopt_peer_probe(self) -> bool:
+        if self.shared is None:
+            return False
+        outcome = await asyncio.to_thread(self.shared.latest_probe, self.provider.name, self.interval)
+        if outcome is None:
+            return False
+        self.status = outcome["status"]
+        self.checked_at = outcome["checked_at"]
+        self.latency = outcome["latency"]
+        self.consecutive_failures = outcome["consecutive_failures"]
+        self.last_error = outcome["last_error"]
+        self.adopted += 1
+        return True
+
+    async def _publish_probe(self) -> None:
+        if self.shared is None:
+            return
+        await asyncio.to_thread(self.shared.publish_probe, self.provider.name, {
+            "status": self.status,
+            "checked_at": self.checked_at,
+            "latency": self.latency,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        })
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest probe outcome for health endpoints."""
+        return {
+            "status": self.status,
+            "checked_at": (
+                datetime.fromtimestamp(self.checked_at, tz=timezone.utc).isoformat()
+                if self.checked_at is not None
+                else None
+            ),
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "interval_seconds": self.interval,
+        }
+
+
+class HealthGatedProvider(ProviderWrapper):
+    """
+    Provider decorator that probes health in the background and rejects
+    searches with ``ProviderDownError`` while the provider is known down.
+
+    It sits below ``CachedProvider`` so cached results are still served
+    during an outage; only calls that would reach the upstream are refused.
+    The monitor runs between ``startup()`` and ``close()``.
+    """
+
+    def __init__(self, provider: BaseProvider, monitor: Optional[HealthMonitor] = None):
+        super().__init__(provider)
+        self.monitor = monitor or HealthMonitor(provider)
+
+    def _check_ready(self) -> None:
+        if not self.monitor.ready:
+            raise ProviderDownError(
+                f"{self.name} is down: {self.monitor.last_error}",
+                retry_after=math.ceil(self.monitor.interval),
+            )
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        self._check_ready()
+        return await self.provider.search(query, season=season, episode=episode, limit=limit)
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        self._check_ready()
+        async for link in self.provider.search_iter(query, season=season, episode=episode, limit=limit):
+            yield link
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        self._check_ready()
+        return await self.provider.search_season(query, season, episodes, limit=limit)
+
+    async def startup(self) -> None:
+        await self.provider.startup()
+        self.monitor.start()
+
+    async def close(self) -> None:
+        await self.monitor.stop()
+        await self.provider.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.provider.stats(), "health": self.monitor.snapshot()}
+
+
+def health_snapshot(provider: BaseProvider) -> Optional[Dict[str, Any]]:
+    """
+    Latest probe of the first ``HealthGatedProvider`` in ``provider``'s
+    wrapper chain, or ``None`` if there is none.
+
+    Unlike ``provider.stats()`` this touches no other layer, so it does no
+    disk I/O and is cheap enough for every liveness check.
+    """
+    while provider is not None:
+        if isinstance(provider, HealthGatedProvider):
+            return provider.monitor.snapshot()
+        provider = getattr(provider, "provider", None)
+    return None
@@ -0,0 +1,49 @@
+"""
+Magnet URIs
+Builds magnet links locally from an index result's info-hash and name.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+from urllib.parse import quote, quote_plus
+
+
+_DEFAULT_TRACKERS = (
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://open.stealth.si:80/announce",
+    "udp://tracker.torrent.eu.org:451/announce",
+    "udp://exodus.desync.com:6969/announce",
+    "udp://tracker.openbittorrent.com:6969/announce",
+)
+
+# Trackers appended to synthesized magnets, comma-separated.
+MAGNET_TRACKERS: Tuple[str, ...] = tuple(
+    tracker.strip()
+    for tracker in os.environ.get("P2P_MAGNET_TRACKERS", ",".join(_DEFAULT_TRACKERS)).split(",")
+    if tracker.strip()
+)
+
+# Hex (40 chars) or base32 (32 chars) BitTorrent v1 info-hash.
+_INFO_HASH = re.compile(r"^(?:[0-9a-fA-F]{40}|[A-Za-z2-7]{32})$")
+_INFO_HASH_FIELDS = ("info_hash", "infohash", "hash")
+
+
+def info_hash_of(item: Any) -> Optional[str]:
+    """The info-hash an index result carries, if it has a usable one."""
+    for field in _INFO_HASH_FIELDS:
+        value = getattr(item, field, None)
+        if isinstance(value, str) and _INFO_HASH.match(value) and value.strip("0"):
+            return value.lower() if len(value) == 40 else value.upper()
+    return None
+
+
+@lru_cache(maxsize=8)
+def _tracker_params(trackers: Tuple[str, ...]) -> str:
+    return "".join(f"&tr={quote(tracker, safe='')}" for tracker in trackers)
+
+
+def build_magnet(info_hash: str, name: str, trackers: Optional[Tuple[str, ...]] = None) -> str:
+    """``magnet:?xt=urn:btih:<hash>&dn=<name>&tr=...``, with ``MAGNET_TRACKERS`` by default."""
+    tracker_params = _tracker_params(MAGNET_TRACKERS if trackers is None else trackers)
+    return f"magnet:?xt=urn:btih:{info_hash}&dn={quote_plus(name)}{tracker_params}"
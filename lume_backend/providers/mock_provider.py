@@ -2,21 +2,41 @@
 Mock Provider Implementation
 For testing and development purposes.
 """
+import logging
+import os
 import random
-from typing import List, Optional
-from providers.base import BaseProvider, ProviderNotFoundError
+from typing import List, Optional, Sequence
+from core.metrics import time_stage
+from core.normalization import canonicalize
+from providers.base import BaseProvider, ProviderNotFoundError, RankedLinks
+from providers.catalog_index import CatalogIndex, CatalogRecord, generate_catalog, load_catalog
 from models.schemas import MediaLink
 
 
+logger = logging.getLogger(__name__)
+
+# Optional large catalog for load testing: a JSON / JSON-lines file, or a
+# number of synthetic records to generate.  The built-in sample data is used
+# when neither is set.
+MOCK_CATALOG_PATH = os.environ.get("MOCK_CATALOG_PATH")
+MOCK_CATALOG_SIZE = int(os.environ.get("MOCK_CATALOG_SIZE", "0"))
+
+
 class MockProvider(BaseProvider):
     """
     Mock provider that returns hardcoded sample data.
     Useful for testing the API without external dependencies.
+
+    A larger catalog can be supplied (or loaded via ``MOCK_CATALOG_PATH`` /
+    ``MOCK_CATALOG_SIZE``) for load testing; searches go through a
+    precomputed ``CatalogIndex`` instead of scanning every record.
     """
     
-    def __init__(self):
+    def __init__(self, catalog: Optional[Sequence[CatalogRecord]] = None):
         super().__init__(name="MockProvider")
-        self._mock_database = [
+        if catalog is None:
+            catalog = self._load_configured_catalog()
+        self._mock_database = list(catalog) if catalog is not None else [
             # Movies
             {
                 "title": "Inception (2010) 1080p BluRay",
@@ -76,6 +96,17 @@ class MockProvider(BaseProvider):
                 "seeds": 2500
             },
         ]
+        self._index = CatalogIndex(self._mock_database)
+        # MediaLinks are validated once per record and reused afterwards.
+        self._links: List[Optional[MediaLink]] = [None] * len(self._index)
+
+    @staticmethod
+    def _load_configured_catalog() -> Optional[List[CatalogRecord]]:
+        if MOCK_CATALOG_PATH:
+            return load_catalog(MOCK_CATALOG_PATH)
+        if MOCK_CATALOG_SIZE > 0:
+            return generate_catalog(MOCK_CATALOG_SIZE)
+        return None
     
     async def search(
         self, 
@@ -88,55 +119,45 @@ class MockProvider(BaseProvider):
         Search mock database for matching titles.
         
         For TV shows with season/episode, formats query as "Title SxxExx"
-        and filters results to match that specific episode.
+        and filters results to match that specific episode. Results are
+        sorted by seeds (highest first). Links are built for the top
+        ``limit`` matches only; the returned ``RankedLinks.total`` still
+        counts every live match so callers can report the full match count.
         """
         # Format query with SxxExx if season and episode provided
         formatted_query = self._format_tv_query(query, season, episode)
-        query_lower = formatted_query.lower().strip()
+        canonical = canonicalize(query, season, episode)
         
-        print(f"🔍 Searching for: {formatted_query}")
+        logger.debug("Searching for: %s", formatted_query)
         
-        # Special case for testing empty results
-        if query_lower == "empty":
+        # Special case for testing empty results; a query with no words left
+        # after normalization (e.g. "!!!") cannot match anything either
+        if canonical.title in ("empty", ""):
             raise ProviderNotFoundError(f"No results found for: {query}")
         
-        # Return all mock data or filter by query
-        if query_lower == "all":
-            filtered = self._mock_database
+        # Return all mock data or filter by query (index ids are in seed order)
+        if canonical.title == "all":
+            matches = range(len(self._index))
         else:
-            # For TV episodes with SxxExx format, be more specific
-            if season is not None and episode is not None:
-                # Strict matching for TV episodes - must contain SxxExx
-                filtered = [
-                    item for item in self._mock_database
-                    if query_lower in item["title"].lower() 
-                    and f"s{season:02d}e{episode:02d}" in item["title"].lower()
-                ]
-            elif season is not None:
-                # Match season only
-                filtered = [
-                    item for item in self._mock_database
-                    if query_lower in item["title"].lower()
-                    and f"s{season:02d}" in item["title"].lower()
-                ]
-            else:
-                # Regular movie/show search
-                filtered = [
-                    item for item in self._mock_database
-                    if query_lower in item["title"].lower()
-                ]
+            with time_stage(self.name, "search"):
+                matches = self._index.search(canonical.title, season=canonical.season, episode=canonical.episode)
+                if canonical.year is not None:
+                    year = str(canonical.year)
+                    matches = [record_id for record_id in matches if year in self._index.titles[record_id]]
         
-        if not filtered:
+        if not matches:
             raise ProviderNotFoundError(f"No results found for: {formatted_query}")
         
-        # Sort by seeds (highest first)
-        sorted_results = sorted(
-            filtered,
-            key=lambda x: x["seeds"],
-            reverse=True
-        )
-        
-        return [MediaLink(**item) for item in sorted_results]
+        records = self._index.records
+        total = sum(1 for record_id in matches if records[record_id]["seeds"] > 0)
+        returned = matches if limit is None else matches[:limit]
+        return RankedLinks((self._link(record_id) for record_id in returned), total=total)
+
+    def _link(self, record_id: int) -> MediaLink:
+        link = self._links[record_id]
+        if link is None:
+            link = self._links[record_id] = MediaLink(**self._index.records[record_id])
+        return link
     
     async def health_check(self) -> bool:
         """Mock provider is always healthy."""
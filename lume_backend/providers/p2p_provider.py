@@ -1,26 +1,78 @@
 """P2P provider implementation backed by PirateBayAPI."""
 import asyncio
-from typing import List, Optional
-
-from fastapi.concurrency import run_in_threadpool
-
-try:
-    from PirateBayAPI import PirateBayAPI
-except ImportError:  # pragma: no cover - optional dependency in local/dev environments
-    PirateBayAPI = None
+import os
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
+from core.metrics import HEDGE_OUTCOMES, MAGNET_RESOLUTIONS, time_stage
+from core.normalization import canonicalize, search_text
 from models.schemas import MediaLink
-from providers.base import BaseProvider, ProviderConnectionError, ProviderTimeoutError
+from providers.base import BaseProvider, ProviderConnectionError, ProviderError, ProviderTimeoutError
+from providers.executor import BlockingExecutor
+from providers.magnet import build_magnet, info_hash_of
+from providers.season_pack import partition_by_episode
 
 
 PROVIDER_TIMEOUT_SECONDS = 15
 
+# Magnet resolution fan-out.  Each search resolves up to ``limit`` magnets in
+# parallel (bounded by the concurrency limit) and the whole search — index
+# query plus magnet resolution — must finish within the search deadline.
+MAGNET_CONCURRENCY = int(os.environ.get("P2P_MAGNET_CONCURRENCY", "8"))
+SEARCH_DEADLINE_SECONDS = float(os.environ.get("P2P_SEARCH_DEADLINE_SECONDS", "20"))
+
+# Blocking PirateBayAPI calls run on their own thread pool rather than the
+# shared AnyIO pool; calls beyond workers + queue are rejected immediately.
+EXECUTOR_WORKERS = int(os.environ.get("P2P_EXECUTOR_WORKERS", "16"))
+EXECUTOR_QUEUE = int(os.environ.get("P2P_EXECUTOR_QUEUE", "32"))
+
+# Single-result searches race magnet resolution across the top candidates:
+# the next-best candidate starts whenever the running ones have neither
+# succeeded within the hedge delay nor all failed (1 disables hedging).
+HEDGE_CANDIDATES = int(os.environ.get("P2P_HEDGE_CANDIDATES", "3"))
+HEDGE_DELAY_SECONDS = float(os.environ.get("P2P_HEDGE_DELAY_SECONDS", "1.5"))
+
+# The PirateBayAPI client class, imported on first use rather than at
+# startup (it pulls in its HTTP and HTML parsing stack). ``None`` once the
+# import has failed; tests replace it with a fake index.
+_NOT_LOADED: Any = object()
+PirateBayAPI: Any = _NOT_LOADED
+
+
+def _index_client() -> Any:
+    """The PirateBayAPI client class, or ``None`` if it is not installed."""
+    global PirateBayAPI
+    if PirateBayAPI is _NOT_LOADED:
+        try:
+            from PirateBayAPI import PirateBayAPI as client
+        except ImportError:  # optional dependency in local/dev environments
+            client = None
+        PirateBayAPI = client
+    return PirateBayAPI
+
 
 class P2PProvider(BaseProvider):
     """Provider that resolves media links from P2P index results."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_concurrency: int = MAGNET_CONCURRENCY,
+        search_deadline: float = SEARCH_DEADLINE_SECONDS,
+        executor: Optional[BlockingExecutor] = None,
+        hedge_candidates: int = HEDGE_CANDIDATES,
+        hedge_delay: float = HEDGE_DELAY_SECONDS,
+    ) -> None:
         super().__init__(name="P2PProvider")
+        self.max_concurrency = max(1, max_concurrency)
+        self.search_deadline = search_deadline
+        self.executor = executor or self._make_executor()
+        self.hedge_candidates = max(1, hedge_candidates)
+        self.hedge_delay = hedge_delay
+        self.hedge_outcomes: Dict[str, int] = {"primary": 0, "backup": 0, "none": 0}
+        self.magnet_paths: Dict[str, int] = {"synthesized": 0, "downloaded": 0}
+
+    def _make_executor(self) -> Optional[BlockingExecutor]:
+        """Thread pool for the blocking index client; ``None`` if the index calls never block."""
+        return BlockingExecutor("p2p", EXECUTOR_WORKERS, EXECUTOR_QUEUE)
 
     async def search(
         self,
@@ -29,66 +81,310 @@ class P2PProvider(BaseProvider):
         episode: Optional[int] = None,
         limit: Optional[int] = None,
     ) -> List[MediaLink]:
-        """Search PirateBayAPI and return ranked ``MediaLink`` objects."""
-        formatted_query = self._format_tv_query(query, season, episode)
-        effective_limit = max(1, limit or 10)
+        """
+        Search PirateBayAPI and return ranked ``MediaLink`` objects.
 
-        if PirateBayAPI is None:
-            raise ProviderConnectionError("PirateBayAPI dependency is not installed")
+        Magnets for the top ``limit`` live results are resolved concurrently.
+        Results that are not resolved before the search deadline are dropped;
+        the remaining links keep their seed order. Single-result searches
+        are hedged across the top candidates (see ``_resolve_hedged``).
+        """
+        if limit == 1 and self.hedge_candidates > 1:
+            candidates, formatted_query, deadline = await self._query_index(query, season, episode)
+            return await self._resolve_hedged(candidates[:self.hedge_candidates], formatted_query, deadline)
+
+        tasks, deadline = await self._start_resolution(query, season, episode, limit)
+        if not tasks:
+            return []
+
+        resolved = await self._wait_resolved(tasks, deadline)
+        # Tasks were created in seed order, so walking them in order keeps the
+        # ranking regardless of which magnets resolved first.
+        return [resolved[task] for task in tasks if task in resolved]
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        """
+        Resolve several episodes of one season from a single index query.
 
+        Index results are split by their SxxEyy tags before any magnet is
+        resolved, so only the top ``limit`` live candidates of each wanted
+        episode are resolved (a multi-episode release once), rather than
+        every result of the season-wide search.
+        """
+        live_results, formatted_query, deadline = await self._query_index(query, season, None)
+        by_episode = partition_by_episode(
+            live_results, season, title_of=lambda item: str(getattr(item, "name", "") or "")
+        )
+        per_episode = max(1, limit or 10)
+        candidates = {
+            episode: by_episode[episode][:per_episode] for episode in episodes if episode in by_episode
+        }
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[int, "asyncio.Task[Optional[MediaLink]]"] = {}
+        for items in candidates.values():
+            for item in items:
+                if id(item) not in tasks:
+                    tasks[id(item)] = asyncio.create_task(self._resolve_link(item, formatted_query, semaphore))
+        if not tasks:
+            return {}
+
+        resolved = await self._wait_resolved(list(tasks.values()), deadline)
+        answers = {
+            episode: [resolved[tasks[id(item)]] for item in items if tasks[id(item)] in resolved]
+            for episode, items in candidates.items()
+        }
+        return {episode: links for episode, links in answers.items() if links}
+
+    async def _wait_resolved(
+        self,
+        tasks: List["asyncio.Task[Optional[MediaLink]]"],
+        deadline: float,
+    ) -> Dict["asyncio.Task[Optional[MediaLink]]", MediaLink]:
+        """Wait for resolution tasks until ``deadline``; the links that resolved, by task."""
         try:
-            results = await asyncio.wait_for(
-                run_in_threadpool(PirateBayAPI.Search, formatted_query),
-                timeout=PROVIDER_TIMEOUT_SECONDS,
-            )
+            remaining = max(0.0, deadline - asyncio.get_running_loop().time())
+            done, _ = await asyncio.wait(tasks, timeout=remaining)
+        finally:
+            # Also runs when the caller cancels us (e.g. an outer timeout),
+            # so no magnet resolution outlives the search.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        return {task: task.result() for task in done if task.result() is not None}
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        """
+        Search PirateBayAPI and yield each ``MediaLink`` as its magnet resolves.
+
+        Links arrive in completion order; stragglers past the search deadline
+        are dropped just like in ``search()``.
+        """
+        tasks, deadline = await self._start_resolution(query, season, episode, limit)
+        try:
+            remaining = max(0.0, deadline - asyncio.get_running_loop().time())
+            for next_done in asyncio.as_completed(tasks, timeout=remaining):
+                link = await next_done
+                if link is not None:
+                    yield link
+        except asyncio.TimeoutError:
+            return
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _start_resolution(
+        self,
+        query: str,
+        season: Optional[int],
+        episode: Optional[int],
+        limit: Optional[int],
+    ) -> Tuple[List["asyncio.Task[Optional[MediaLink]]"], float]:
+        """
+        Query the index and schedule magnet resolution for the top live results.
+
+        Returns:
+            Resolution tasks in seed order and the loop-time search deadline
+        """
+        live_results, formatted_query, deadline = await self._query_index(query, season, episode)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.create_task(self._resolve_link(item, formatted_query, semaphore))
+            for item in live_results[:max(1, limit or 10)]
+        ]
+        return tasks, deadline
+
+    async def _query_index(
+        self,
+        query: str,
+        season: Optional[int],
+        episode: Optional[int],
+    ) -> Tuple[List[Any], str, float]:
+        """
+        Query the index for live results.
+
+        Returns:
+            Live index results in seed order, the formatted query and the
+            loop-time search deadline
+        """
+        canonical = canonicalize(query, season, episode)
+        formatted_query = self._format_tv_query(search_text(query), canonical.season, canonical.episode)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.search_deadline
+
+        try:
+            with time_stage(self.name, "search"):
+                results = await asyncio.wait_for(
+                    self._index_search(formatted_query),
+                    timeout=min(PROVIDER_TIMEOUT_SECONDS, self.search_deadline),
+                )
         except asyncio.TimeoutError as exc:
             raise ProviderTimeoutError("P2P provider search timed out") from exc
+        except ProviderError:
+            raise
         except Exception as exc:  # noqa: BLE001
             raise ProviderConnectionError("Failed to query P2P provider") from exc
 
         if not results:
-            return []
+            return [], formatted_query, deadline
 
-        sorted_results = sorted(
-            results,
-            key=lambda item: int(getattr(item, "seeds", 0) or 0),
-            reverse=True,
-        )
+        with time_stage(self.name, "filter_sort"):
+            sorted_results = sorted(
+                results,
+                key=lambda item: int(getattr(item, "seeds", 0) or 0),
+                reverse=True,
+            )
+
+            live_results = [item for item in sorted_results if int(getattr(item, "seeds", 0) or 0) > 0]
+
+        return live_results, formatted_query, deadline
+
+    async def _index_search(self, formatted_query: str) -> List[Any]:
+        """Raw index results for ``formatted_query``, from ``PirateBayAPI.Search``."""
+        client = _index_client()
+        if client is None:
+            raise ProviderConnectionError("PirateBayAPI dependency is not installed")
+        return await self.executor.run(client.Search, formatted_query)
+
+    async def _index_download(self, item: Any) -> str:
+        """The magnet URI of an index result, from ``PirateBayAPI.Download``."""
+        return await self.executor.run(_index_client().Download, item.id)
+
+    async def _resolve_hedged(
+        self,
+        candidates: List[Any],
+        formatted_query: str,
+        deadline: float,
+    ) -> List[MediaLink]:
+        """
+        Race magnet resolution across ``candidates`` and keep the first success.
+
+        The top candidate starts first. Each time ``hedge_delay`` passes
+        without a success, or every running resolution has failed, the
+        next-best candidate starts too. The first magnet to resolve wins
+        (if several finish together, the best-seeded one), and the rest are
+        cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: List["asyncio.Task[Optional[MediaLink]]"] = []
 
-        live_results = [item for item in sorted_results if int(getattr(item, "seeds", 0) or 0) > 0]
+        def start_next() -> None:
+            item = candidates[len(tasks)]
+            tasks.append(asyncio.create_task(self._resolve_link(item, formatted_query, semaphore)))
 
-        media_links: List[MediaLink] = []
-        for item in live_results[:effective_limit]:
+        try:
+            if candidates:
+                start_next()
+            while tasks:
+                remaining = deadline - loop.time()
+                running = [task for task in tasks if not task.done()]
+                more = len(tasks) < len(candidates)
+                if remaining <= 0 or not (running or more):
+                    break
+                if running:
+                    await asyncio.wait(
+                        running,
+                        timeout=min(self.hedge_delay, remaining) if more else remaining,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                # Tasks are in seed order, so the first finished success is the best one.
+                for rank, task in enumerate(tasks):
+                    if task.done() and task.result() is not None:
+                        self.hedge_outcomes["primary" if rank == 0 else "backup"] += 1
+                        HEDGE_OUTCOMES.inc("primary" if rank == 0 else "backup")
+                        return [task.result()]
+                if more:
+                    start_next()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        self.hedge_outcomes["none"] += 1
+        HEDGE_OUTCOMES.inc("none")
+        return []
+
+    async def _resolve_link(
+        self,
+        item: Any,
+        formatted_query: str,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[MediaLink]:
+        """
+        Resolve a single index result to a ``MediaLink``, or ``None`` on failure.
+
+        When the result carries an info-hash and a name the magnet URI is
+        built locally; otherwise it is fetched with ``_index_download()``.
+        """
+        title = str(getattr(item, "name", None) or formatted_query)
+        info_hash = info_hash_of(item)
+        if info_hash is not None and getattr(item, "name", None):
             try:
-                magnet_url = await asyncio.wait_for(
-                    run_in_threadpool(PirateBayAPI.Download, item.id),
-                    timeout=PROVIDER_TIMEOUT_SECONDS,
-                )
-                media_links.append(
-                    MediaLink(
-                        title=str(getattr(item, "name", formatted_query)),
-                        url=magnet_url,
-                        size=int(getattr(item, "size", 0) or 0),
-                        seeds=int(getattr(item, "seeds", 0) or 0),
+                link = self._link(item, title, build_magnet(info_hash, title))
+            except Exception:
+                link = None
+            if link is not None:
+                self._count_magnet("synthesized")
+                return link
+
+        async with semaphore:
+            try:
+                with time_stage(self.name, "magnet_download"):
+                    magnet_url = await asyncio.wait_for(
+                        self._index_download(item),
+                        timeout=PROVIDER_TIMEOUT_SECONDS,
                     )
-                )
+                self._count_magnet("downloaded")
+                return self._link(item, title, magnet_url)
             except asyncio.TimeoutError:
-                continue
+                return None
             except Exception:
-                continue
+                return None
 
-        return media_links
+    @staticmethod
+    def _link(item: Any, title: str, url: str) -> MediaLink:
+        return MediaLink(
+            title=title,
+            url=url,
+            size=int(getattr(item, "size", 0) or 0),
+            seeds=int(getattr(item, "seeds", 0) or 0),
+        )
+
+    def _count_magnet(self, path: str) -> None:
+        self.magnet_paths[path] += 1
+        MAGNET_RESOLUTIONS.inc(path)
 
     async def health_check(self) -> bool:
         """Basic provider health-check by issuing a lightweight search."""
-        if PirateBayAPI is None:
-            return False
-
         try:
-            await asyncio.wait_for(
-                run_in_threadpool(PirateBayAPI.Search, "test"),
-                timeout=PROVIDER_TIMEOUT_SECONDS,
-            )
+            await asyncio.wait_for(self._index_search("test"), timeout=PROVIDER_TIMEOUT_SECONDS)
             return True
         except Exception:
             return False
+
+    async def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "hedging": dict(self.hedge_outcomes),
+            "magnets": dict(self.magnet_paths),
+        }
+        if self.executor is not None:
+            stats["executor"] = self.executor.stats()
+        return stats
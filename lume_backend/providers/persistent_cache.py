@@ -0,0 +1,198 @@
+"""
+Persistent Cache
+SQLite-backed resolution cache that survives restarts and is shared by
+every worker process on the host.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models.schemas import MediaLink
+from providers.base import RankedLinks
+
+
+PERSISTENT_CACHE_PATH = os.environ.get("RESOLVE_PERSISTENT_CACHE_PATH", "")
+PERSISTENT_CACHE_MAX_ENTRIES = int(os.environ.get("RESOLVE_PERSISTENT_CACHE_MAX_ENTRIES", "50000"))
+PERSISTENT_CACHE_WARM_ENTRIES = int(os.environ.get("RESOLVE_PERSISTENT_CACHE_WARM_ENTRIES", "1024"))
+
+# Eviction runs once every this many writes rather than on each one.
+_EVICT_EVERY = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resolutions (
+    key TEXT PRIMARY KEY,
+    links TEXT,
+    not_found TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resolutions_accessed ON resolutions (accessed_at);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Open ``path`` for use from several threads and worker processes.
+
+    WAL mode lets readers proceed while another process writes, and the
+    busy timeout makes writers wait for each other instead of failing.
+    """
+    connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class PersistedEntry:
+    """A search outcome read back from disk."""
+
+    __slots__ = ("key", "links", "not_found", "expires_at")
+
+    def __init__(
+        self,
+        key: Tuple[Any, ...],
+        links: Optional[List[MediaLink]],
+        not_found: Optional[str],
+        expires_at: float,
+    ):
+        self.key = key
+        self.links = links
+        self.not_found = not_found
+        self.expires_at = expires_at
+
+
+class PersistentCache:
+    """
+    Bounded, TTL'd store of resolved ``MediaLink`` lists in one SQLite file.
+
+    The database runs in WAL mode with a busy timeout, so several uvicorn
+    workers can read and write the same file concurrently. Expired rows are
+    dropped, and once there are more than ``max_entries`` rows the least
+    recently accessed ones are evicted. Times are wall-clock
+    (``time.time``), so entries stay meaningful across restarts.
+
+    All methods block on SQLite; async callers should run them in a thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = PERSISTENT_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _encode_key(key: Sequence[Any]) -> str:
+        return json.dumps(list(key))
+
+    def get(self, key: Sequence[Any]) -> Optional[PersistedEntry]:
+        """Return the unexpired entry for ``key``, or ``None``."""
+        now = self._clock()
+        encoded = self._encode_key(key)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT links, not_found, expires_at FROM resolutions WHERE key = ? AND expires_at > ?",
+                (encoded, now),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE resolutions SET accessed_at = ? WHERE key = ?", (now, encoded))
+            self.hits += 1
+        return self._decode(tuple(key), *row)
+
+    def put(
+        self,
+        key: Sequence[Any],
+        ttl: float,
+        links: Optional[List[MediaLink]] = None,
+        not_found: Optional[str] = None,
+    ) -> None:
+        """Store a result list, or a not-found message, for ``ttl`` seconds."""
+        now = self._clock()
+        payload = None
+        if links is not None:
+            dumped = [link.model_dump(mode="json") for link in links]
+            total = getattr(links, "total", None)
+            payload = json.dumps(dumped if total is None else {"links": dumped, "total": total})
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO resolutions (key, links, not_found, stored_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._encode_key(key), payload, not_found, now, now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+
+    def recent(self, limit: int) -> List[PersistedEntry]:
+        """The ``limit`` most recently accessed unexpired entries, newest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, links, not_found, expires_at FROM resolutions "
+                "WHERE expires_at > ? ORDER BY accessed_at DESC LIMIT ?",
+                (self._clock(), max(0, limit)),
+            ).fetchall()
+        return [self._decode(tuple(json.loads(key)), *rest) for key, *rest in rows]
+
+    def evict(self) -> None:
+        """Drop expired rows and trim the table to ``max_entries``."""
+        with self._lock:
+            self._evict(self._clock())
+
+    def _evict(self, now: float) -> None:
+        expired = self._connection.execute("DELETE FROM resolutions WHERE expires_at <= ?", (now,)).rowcount
+        overflow = self._connection.execute(
+            "DELETE FROM resolutions WHERE key IN ("
+            "SELECT key FROM resolutions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += max(0, expired) + max(0, overflow)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM resolutions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _decode(
+        key: Tuple[Any, ...],
+        links: Optional[str],
+        not_found: Optional[str],
+        expires_at: float,
+    ) -> PersistedEntry:
+        decoded: Optional[List[MediaLink]] = None
+        if links is not None:
+            payload = json.loads(links)
+            if isinstance(payload, dict):
+                decoded = RankedLinks((MediaLink(**link) for link in payload["links"]), payload["total"])
+            else:
+                decoded = [MediaLink(**link) for link in payload]
+        return PersistedEntry(key, decoded, not_found, expires_at)
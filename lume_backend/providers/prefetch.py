@@ -0,0 +1,223 @@
+"""
+Episode Prefetch
+Resolves the next episodes of a show into the result cache in the
+background, while the API is otherwise idle.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from core.metrics import PREFETCH_HITS, PREFETCH_REQUESTS
+from models.schemas import MediaLink
+from providers.base import ProviderWrapper
+from providers.cached_provider import CacheKey, CachedProvider
+
+
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "0") == "1"
+PREFETCH_EPISODES = int(os.environ.get("PREFETCH_EPISODES", "2"))
+PREFETCH_MAX_PENDING = int(os.environ.get("PREFETCH_MAX_PENDING", "32"))
+PREFETCH_RATE_PER_SECOND = float(os.environ.get("PREFETCH_RATE_PER_SECOND", "2"))
+
+# Prefetched keys remembered for hit accounting; older ones are forgotten.
+_TRACKED_KEYS = 4096
+
+
+class PrefetchingProvider(ProviderWrapper):
+    """
+    Provider decorator that warms the cache with upcoming episodes.
+
+    After a search for season ``S`` episode ``E`` returns results, searches
+    for episodes ``E+1`` to ``E+episodes`` of the same season (with the same
+    limit) are queued. A single background worker drains the queue:
+
+    - it only starts a prefetch while no foreground search is running, and
+      at most ``rate`` prefetches per second
+    - at most ``max_pending`` prefetches wait in the queue; further ones are
+      dropped rather than queued
+    - keys that are already cached or in flight are skipped
+
+    A foreground search served by an entry a prefetch put in the cache
+    counts as a prefetch hit. The worker runs between ``startup()`` and
+    ``close()``.
+    """
+
+    def __init__(
+        self,
+        provider: CachedProvider,
+        episodes: int = PREFETCH_EPISODES,
+        max_pending: int = PREFETCH_MAX_PENDING,
+        rate: float = PREFETCH_RATE_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(provider)
+        self.episodes = max(0, episodes)
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._queue: "asyncio.Queue[CacheKey]" = asyncio.Queue(maxsize=max(1, max_pending))
+        self._queued: Set[CacheKey] = set()
+        self._prefetched: "OrderedDict[CacheKey, None]" = OrderedDict()
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._next_start = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        self.scheduled = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.hits = 0
+
+    async def search(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MediaLink]:
+        key = self.provider.cache_key(query, season, episode, limit)
+        if key in self._prefetched:
+            del self._prefetched[key]
+            if self.provider.contains(key):
+                self.hits += 1
+                PREFETCH_HITS.inc()
+
+        self._begin()
+        try:
+            links = await self.provider.search(query, season=season, episode=episode, limit=limit)
+        finally:
+            self._end()
+
+        if links and season is not None and episode is not None:
+            self._schedule(query, season, episode, limit)
+        return links
+
+    async def search_iter(
+        self,
+        query: str,
+        season: Optional[int] = None,
+        episode: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[MediaLink]:
+        self._begin()
+        try:
+            async for link in self.provider.search_iter(query, season=season, episode=episode, limit=limit):
+                yield link
+        finally:
+            self._end()
+
+    async def search_season(
+        self,
+        query: str,
+        season: int,
+        episodes: Iterable[int],
+        limit: Optional[int] = None,
+    ) -> Dict[int, List[MediaLink]]:
+        # Delegated so the cache below stores each episode it answers.
+        self._begin()
+        try:
+            return await self.provider.search_season(query, season, episodes, limit=limit)
+        finally:
+            self._end()
+
+    def _begin(self) -> None:
+        self._active += 1
+        self._idle.clear()
+
+    def _end(self) -> None:
+        self._active -= 1
+        if self._active == 0:
+            self._idle.set()
+
+    def _schedule(self, query: str, season: int, episode: int, limit: Optional[int]) -> None:
+        for offset in range(1, self.episodes + 1):
+            key = self.provider.cache_key(query, season, episode + offset, limit)
+            if key in self._queued or self.provider.contains(key):
+                continue
+            try:
+                self._queue.put_nowait(key)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                PREFETCH_REQUESTS.inc("dropped")
+                continue
+            self._queued.add(key)
+            self.scheduled += 1
+            PREFETCH_REQUESTS.inc("scheduled")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run(self._stopping))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, stopping: asyncio.Event) -> None:
+        while not stopping.is_set():
+            key = await self._queue.get()
+            try:
+                await self._pace()
+                await self._idle.wait()
+                if not stopping.is_set():
+                    await self._prefetch(key)
+            finally:
+                self._queued.discard(key)
+
+    async def _pace(self) -> None:
+        delay = self._next_start - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_start = self._clock() + self.interval
+
+    async def _prefetch(self, key: CacheKey) -> None:
+        if self.provider.contains(key):
+            self.skipped += 1
+            PREFETCH_REQUESTS.inc("skipped")
+            return
+        query, season, episode, limit = key
+        try:
+            await self.provider.search(query, season=season, episode=episode, limit=limit)
+        except Exception:  # noqa: BLE001 - a failed prefetch only costs a cold foreground lookup
+            self.failed += 1
+            PREFETCH_REQUESTS.inc("failed")
+            return
+        self.completed += 1
+        PREFETCH_REQUESTS.inc("completed")
+        self._prefetched[key] = None
+        while len(self._prefetched) > _TRACKED_KEYS:
+            self._prefetched.popitem(last=False)
+
+    async def startup(self) -> None:
+        await self.provider.startup()
+        self.start()
+
+    async def close(self) -> None:
+        await self.stop()
+        await self.provider.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.provider.stats(),
+            "prefetch": {
+                "pending": self._queue.qsize(),
+                "scheduled": self.scheduled,
+                "dropped": self.dropped,
+                "skipped": self.skipped,
+                "completed": self.completed,
+                "failed": self.failed,
+                "hits": self.hits,
+                "hit_ratio": round(self.hits / self.completed, 4) if self.completed else 0.0,
+            },
+        }
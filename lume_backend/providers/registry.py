@@ -0,0 +1,175 @@
+"""
+Provider Registry
+Builds the configured provider once per application and owns its lifecycle.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict
+
+from providers.admission import ADMISSION_CONTROL_ENABLED, AdmissionControlledProvider
+from providers.base import BaseProvider, ProviderConnectionError
+from providers.cached_provider import CachedProvider
+from providers.circuit_breaker import CircuitBreakerProvider
+from providers.composite_provider import CompositeProvider
+from providers.health import HEALTH_GATE_ENABLED, HealthGatedProvider, HealthMonitor
+from providers.mock_provider import MockProvider, RandomMockProvider
+from providers.persistent_cache import PERSISTENT_CACHE_PATH, PersistentCache
+from providers.prefetch import PREFETCH_ENABLED, PrefetchingProvider
+from providers.worker_state import WORKER_COORDINATION_ENABLED, WorkerState
+
+
+PROVIDER_BACKEND = os.environ.get("LUME_PROVIDER", "mock")
+RESOLVE_CACHE_ENABLED = os.environ.get("RESOLVE_CACHE_ENABLED", "1") != "0"
+CIRCUIT_BREAKER_ENABLED = os.environ.get("CIRCUIT_BREAKER_ENABLED", "1") != "0"
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get("SHUTDOWN_DRAIN_SECONDS", "10"))
+
+def _p2p_provider() -> BaseProvider:
+    # Imported only when selected, so mock deployments start without it.
+    from providers.p2p_provider import P2PProvider
+
+    return P2PProvider()
+
+
+def _async_p2p_provider() -> BaseProvider:
+    from providers.async_p2p_provider import AsyncP2PProvider
+
+    return AsyncP2PProvider()
+
+
+PROVIDER_FACTORIES: Dict[str, Callable[[], BaseProvider]] = {
+    "mock": MockProvider,
+    "random": RandomMockProvider,
+    "p2p": _p2p_provider,
+    "p2p-async": _async_p2p_provider,
+}
+
+
+def build_provider(
+    backend: str = PROVIDER_BACKEND,
+    cache: bool = RESOLVE_CACHE_ENABLED,
+    circuit_breaker: bool = CIRCUIT_BREAKER_ENABLED,
+    health_gate: bool = HEALTH_GATE_ENABLED,
+    persistent_cache_path: str = PERSISTENT_CACHE_PATH,
+    prefetch: bool = PREFETCH_ENABLED,
+    admission: bool = ADMISSION_CONTROL_ENABLED,
+    coordination: bool = WORKER_COORDINATION_ENABLED,
+) -> BaseProvider:
+    """
+    Build the provider stack for a configured backend name.
+
+    Args:
+        backend: Key in ``PROVIDER_FACTORIES`` (e.g. "mock", "p2p"), or a
+            comma-separated list of keys to fan out through a ``CompositeProvider``
+        cache: Wrap the provider in ``CachedProvider``
+        circuit_breaker: Wrap each backend in its own ``CircuitBreakerProvider``
+        health_gate: Probe health in the background and fail fast while the
+            provider is down (below the cache, so hits are still served)
+        persistent_cache_path: SQLite file backing the cache across restarts
+            and workers; empty keeps the cache in memory only
+        prefetch: Resolve upcoming TV episodes into the cache in the
+            background (needs ``cache``)
+        admission: Cap and shed upstream-bound searches (below the cache, so
+            hits are never shed)
+        coordination: Share upstream leases and health probes with the other
+            worker processes through ``persistent_cache_path`` (needs ``cache``)
+
+    Raises:
+        ValueError: If a backend name is unknown
+    """
+    names = [name.strip().lower() for name in backend.split(",") if name.strip()]
+    if not names:
+        raise ValueError("No provider backend configured")
+
+    children = []
+    for name in names:
+        factory = PROVIDER_FACTORIES.get(name)
+        if factory is None:
+            raise ValueError(
+                f"Unknown provider backend '{name}'. "
+                f"Expected one of: {', '.join(sorted(PROVIDER_FACTORIES))}"
+            )
+        child = factory()
+        if circuit_breaker:
+            child = CircuitBreakerProvider(child)
+        children.append(child)
+
+    shared = WorkerState(persistent_cache_path) if cache and persistent_cache_path and coordination else None
+
+    provider = children[0] if len(children) == 1 else CompositeProvider(children)
+    if health_gate:
+        provider = HealthGatedProvider(provider, monitor=HealthMonitor(provider, shared=shared))
+    if admission:
+        provider = AdmissionControlledProvider(provider)
+    if cache:
+        persistent = PersistentCache(persistent_cache_path) if persistent_cache_path else None
+        provider = CachedProvider(provider, persistent=persistent, coordinator=shared)
+        if prefetch:
+            provider = PrefetchingProvider(provider)
+    return provider
+
+
+class ProviderRegistry:
+    """
+    Holds the application's provider for the lifetime of the process.
+
+    The provider is built once, warmed up by ``start()`` and released by
+    ``stop()``. Requests borrow it through ``lease()`` so shutdown can wait
+    for in-flight requests to finish before the provider is closed.
+    """
+
+    def __init__(self, provider: BaseProvider, drain_timeout: float = SHUTDOWN_DRAIN_SECONDS):
+        self.provider = provider
+        self.drain_timeout = drain_timeout
+        self._in_flight = 0
+        self._accepting = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @classmethod
+    def from_env(cls) -> "ProviderRegistry":
+        """Build a registry for the provider selected by ``LUME_PROVIDER``."""
+        return cls(build_provider())
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    async def start(self) -> None:
+        """Warm up the provider and start accepting requests."""
+        await self.provider.startup()
+        self._accepting = True
+
+    async def stop(self) -> None:
+        """Stop accepting requests, drain in-flight ones, then close the provider."""
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        await self.provider.close()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BaseProvider]:
+        """
+        Borrow the provider for the duration of a request.
+
+        Raises:
+            ProviderConnectionError: If the registry is not accepting requests
+        """
+        if not self._accepting:
+            raise ProviderConnectionError("Provider is not accepting requests")
+
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            yield self.provider
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
+
@@ -0,0 +1,56 @@
+"""
+Season Packs
+Splits the results of one season-wide search into per-episode result lists.
+"""
+import os
+import re
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+from models.schemas import MediaLink
+
+
+# Results requested from the single season-wide search.
+SEASON_PACK_SEARCH_LIMIT = int(os.environ.get("SEASON_PACK_SEARCH_LIMIT", "50"))
+
+# "S04E01", "s4e1", "S04.E01", plus multi-episode releases like "S04E01E02"
+# or "S04E01-E03".
+_EPISODE_TAG = re.compile(
+    r"(?<![a-z0-9])s(\d{1,2})[ ._]?e(\d{1,3})(?:(-?)e(\d{1,3}))?(?!\d)",
+    re.IGNORECASE,
+)
+
+
+def episode_tags(title: str) -> Set[Tuple[int, int]]:
+    """All (season, episode) pairs a release title claims to contain."""
+    tags = set()
+    for season, first, dash, last in _EPISODE_TAG.findall(title):
+        first_episode = int(first)
+        last_episode = int(last) if last else first_episode
+        if dash and last_episode > first_episode:
+            episodes = range(first_episode, last_episode + 1)
+        else:
+            episodes = {first_episode, last_episode}
+        tags.update((int(season), episode) for episode in episodes)
+    return tags
+
+
+def partition_by_episode(
+    links: Iterable[Any],
+    season: int,
+    title_of: Callable[[Any], str] = attrgetter("title"),
+) -> Dict[int, List[Any]]:
+    """
+    Group season search results by the episodes of ``season`` they contain.
+
+    Results keep their input order within each episode. Results without an
+    episode tag for ``season`` (whole-season packs, other seasons) are left
+    out, since they can't answer a single-episode lookup. ``title_of`` reads
+    the release name; the default suits ``MediaLink`` objects.
+    """
+    episodes: Dict[int, List[Any]] = {}
+    for link in links:
+        for tag_season, episode in sorted(episode_tags(title_of(link))):
+            if tag_season == season:
+                episodes.setdefault(episode, []).append(link)
+    return episodes
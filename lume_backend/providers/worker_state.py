@@ -0,0 +1,119 @@
+"""
+Worker Coordination
+State shared by the uvicorn worker processes on one host, so that they
+split upstream work instead of each repeating it.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from providers.persistent_cache import connect
+
+
+WORKER_COORDINATION_ENABLED = os.environ.get("WORKER_COORDINATION_ENABLED", "1") != "0"
+# How long a worker may hold the upstream lease for one key, and how long
+# the others wait for its result before searching themselves.
+WORKER_LEASE_SECONDS = float(os.environ.get("WORKER_LEASE_SECONDS", "15"))
+WORKER_LEASE_POLL_SECONDS = float(os.environ.get("WORKER_LEASE_POLL_SECONDS", "0.1"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS probes (
+    provider TEXT PRIMARY KEY,
+    checked_at REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+"""
+
+
+class WorkerState:
+    """
+    Cross-process leases and health probe results in one SQLite file.
+
+    - ``claim()``/``release()`` form a single-flight lock per search key:
+      only the worker holding the lease goes upstream, the others wait for
+      its result to appear in the ``PersistentCache``. Leases expire after
+      their ``ttl`` so a crashed worker cannot block a key.
+    - ``publish_probe()``/``latest_probe()`` share the latest health check
+      of each provider, so one worker's probe serves them all.
+
+    It can share the persistent cache's file. All methods block on SQLite;
+    async callers should run them in a thread.
+    """
+
+    def __init__(self, path: str, owner: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+
+        self.claimed = 0
+        self.contended = 0
+
+    @staticmethod
+    def _encode_key(key: Sequence[Any]) -> str:
+        return json.dumps(list(key))
+
+    def claim(self, key: Sequence[Any], ttl: float = WORKER_LEASE_SECONDS) -> bool:
+        """Take the lease on ``key`` unless another worker holds an unexpired one."""
+        now = self._clock()
+        with self._lock:
+            taken = self._connection.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+                (self._encode_key(key), self.owner, now + ttl, now),
+            ).rowcount == 1
+        if taken:
+            self.claimed += 1
+        else:
+            self.contended += 1
+        return taken
+
+    def release(self, key: Sequence[Any]) -> None:
+        """Give up the lease on ``key`` if this worker holds it."""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (self._encode_key(key), self.owner),
+            )
+
+    def publish_probe(self, provider: str, outcome: Dict[str, Any]) -> None:
+        """Record the outcome of a health check that just ran."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO probes (provider, checked_at, outcome) VALUES (?, ?, ?)",
+                (provider, self._clock(), json.dumps(outcome)),
+            )
+
+    def latest_probe(self, provider: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """The outcome of any worker's probe of ``provider`` in the last ``max_age`` seconds."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT outcome FROM probes WHERE provider = ? AND checked_at > ?",
+                (provider, self._clock() - max_age),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            leases = self._connection.execute(
+                "SELECT COUNT(*) FROM leases WHERE expires_at > ?", (self._clock(),),
+            ).fetchone()[0]
+        return {
+            "active_leases": leases,
+            "claimed": self.claimed,
+            "contended": self.contended,
+        }
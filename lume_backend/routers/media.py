@@ -1,43 +1,104 @@
 """
 FastAPI Router for Media Resolution
 """
-from typing import Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-
-from models.schemas import MediaLink, SearchResult
+import asyncio
+import json
+import os
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+from core.http_cache import cache_control, etag_for, etag_matches
+from core.normalization import canonicalize
+from core.metrics import PROVIDER_ERRORS, InstrumentedRoute, time_stage
+from core.serialization import fast_response
+from models.schemas import (
+    BatchItemError,
+    BatchResolveItem,
+    BatchResolveRequest,
+    BatchResolveResponse,
+    BatchResolveResult,
+    MediaLink,
+    SearchResult,
+    SearchSummary,
+)
+from providers.admission import ADMISSION_CLIENT_HEADER, current_client
 from providers.base import (
     BaseProvider,
     ProviderConnectionError,
     ProviderNotFoundError,
     ProviderTimeoutError,
 )
-from providers.mock_provider import MockProvider
+from providers.health import health_snapshot
+from providers.registry import ProviderRegistry
+
+
+# Batch resolution: items resolved in parallel and the overall time budget.
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+BATCH_DEADLINE_SECONDS = float(os.environ.get("BATCH_DEADLINE_SECONDS", "25"))
+# Batches asking for at least this many episodes of one season resolve them
+# with a single season search first (0 disables).
+BATCH_SEASON_PACK_MIN_EPISODES = int(os.environ.get("BATCH_SEASON_PACK_MIN_EPISODES", "3"))
+
+# Cache-Control for successful GET responses: max-age and
+# stale-while-revalidate in seconds, per endpoint.
+RESOLVE_CACHE_CONTROL = cache_control(
+    int(os.environ.get("RESOLVE_HTTP_MAX_AGE_SECONDS", "300")),
+    int(os.environ.get("RESOLVE_HTTP_STALE_WHILE_REVALIDATE_SECONDS", "600")),
+)
+SEARCH_CACHE_CONTROL = cache_control(
+    int(os.environ.get("SEARCH_HTTP_MAX_AGE_SECONDS", "60")),
+    int(os.environ.get("SEARCH_HTTP_STALE_WHILE_REVALIDATE_SECONDS", "300")),
+)
 
 
 # Create router
 router = APIRouter(
     prefix="/resolve",
     tags=["media-resolution"],
+    route_class=InstrumentedRoute,
     responses={
         404: {"description": "No results found"},
         422: {"description": "Invalid TV season/episode parameters"},
-        503: {"description": "Provider unavailable"},
+        503: {"description": "Provider unavailable or overloaded"},
         504: {"description": "Provider timeout"},
     },
 )
 
 
-def get_provider() -> BaseProvider:
+async def get_provider(request: Request) -> AsyncIterator[BaseProvider]:
     """
     Dependency injection for the media provider.
 
-    Easily swap providers by changing this function:
-    - MockProvider (for testing)
-    - TMDBProvider (for metadata)
-    - CustomProvider (your implementation)
+    The provider is built once per application by the ``ProviderRegistry``
+    created in ``create_application()``; select it with the ``LUME_PROVIDER``
+    environment variable. Each request holds a lease on the provider so
+    shutdown can drain in-flight requests before closing it, and is
+    attributed to its client for admission control.
     """
-    return MockProvider()
+    registry: ProviderRegistry = request.app.state.provider_registry
+    # Each request runs in its own task, so this doesn't leak across requests.
+    current_client.set(client_identity(request))
+    if not registry.accepting:
+        raise _map_provider_exception(
+            ProviderConnectionError("Provider is shutting down")
+        )
+
+    async with registry.lease() as provider:
+        yield provider
+
+
+def client_identity(request: Request) -> str:
+    """The client a request counts against for per-client rate limiting."""
+    if ADMISSION_CLIENT_HEADER:
+        forwarded = request.headers.get(ADMISSION_CLIENT_HEADER, "").split(",")[0].strip()
+        if forwarded:
+            return forwarded
+    return request.client.host if request.client else "unknown"
 
 
 def _map_provider_exception(exc: Exception) -> HTTPException:
@@ -51,12 +112,14 @@ def _map_provider_exception(exc: Exception) -> HTTPException:
             },
         )
     if isinstance(exc, ProviderConnectionError):
+        retry_after = getattr(exc, "retry_after", None)
         return HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail={
-                "error": "PROVIDER_UNAVAILABLE",
+                "error": getattr(exc, "error", "PROVIDER_UNAVAILABLE"),
                 "message": str(exc),
             },
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
         )
     if isinstance(exc, ProviderTimeoutError):
         return HTTPException(
@@ -77,10 +140,55 @@ def _map_provider_exception(exc: Exception) -> HTTPException:
 
 
 
+def _provider_error(
+    exc: Exception,
+    provider: BaseProvider,
+    query: str,
+    season: Optional[int],
+    episode: Optional[int],
+) -> HTTPException:
+    """Map a provider failure to an HTTP error with request context, and count it."""
+    mapped_exception = _map_provider_exception(exc)
+    PROVIDER_ERRORS.inc(provider.name, mapped_exception.detail["error"])
+    mapped_exception.detail["query"] = query
+    mapped_exception.detail["season"] = season
+    mapped_exception.detail["episode"] = episode
+    if mapped_exception.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+        mapped_exception.detail["provider"] = provider.name
+    return mapped_exception
+
+
+def _conditional_response(
+    request: Request,
+    response: Response,
+    model: BaseModel,
+    etag: str,
+    cache_policy: str,
+):
+    """
+    Attach ETag / Cache-Control to a successful response, or answer a
+    matching ``If-None-Match`` with an empty 304 without serializing.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_policy}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    rendered = fast_response(model)
+    target = rendered if isinstance(rendered, Response) else response
+    target.headers.update(headers)
+    return rendered
+
+
 def _filter_live_results(results: list[MediaLink]) -> list[MediaLink]:
     """Remove dead results (zero or negative seeds)."""
     return [result for result in results if result.seeds > 0]
 
+
+def _live_total(results: list[MediaLink], live_results: list[MediaLink]) -> int:
+    """Live matches the provider found, including any it built no links for."""
+    total = getattr(results, "total", None)
+    return total if total is not None else len(live_results)
+
 def _format_tv_query(query: str, season: Optional[int], episode: Optional[int]) -> str:
     """Format a media query for TV searches and validate season/episode bounds."""
     if season is not None and season <= 0:
@@ -108,6 +216,8 @@ def _format_tv_query(query: str, season: Optional[int], episode: Optional[int])
     description="Search for media and return the highest-quality result. For TV episodes, use season and episode parameters.",
 )
 async def resolve_media(
+    request: Request,
+    response: Response,
     query: str,
     season: Optional[int] = Query(None, description="Season number for TV shows (e.g., 4)"),
     episode: Optional[int] = Query(None, description="Episode number for TV shows (e.g., 1)"),
@@ -126,27 +236,37 @@ async def resolve_media(
 
     Use query='all' to get all mock results.
     Use query='empty' to test 404 handling.
+
+    Responses carry an `ETag`; repeat the request with `If-None-Match` to get
+    an empty 304 while the result is unchanged.
     """
     formatted_query = _format_tv_query(query, season, episode)
     try:
-        results = await provider.search(query, season=season, episode=episode, limit=1)
-        live_results = _filter_live_results(results)
-
-        if not live_results:
-            raise ProviderNotFoundError(f"No live results found for: {formatted_query}")
-
-        # Return top live result (already sorted by provider)
-        return live_results[0]
+        link = await _resolve_top(provider, query, season, episode, formatted_query)
+        return _conditional_response(request, response, link, etag_for([link]), RESOLVE_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as exc:
-        mapped_exception = _map_provider_exception(exc)
-        mapped_exception.detail["query"] = query
-        mapped_exception.detail["season"] = season
-        mapped_exception.detail["episode"] = episode
-        if mapped_exception.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
-            mapped_exception.detail["provider"] = provider.name
-        raise mapped_exception
+        raise _provider_error(exc, provider, query, season, episode)
+
+
+async def _resolve_top(
+    provider: BaseProvider,
+    query: str,
+    season: Optional[int],
+    episode: Optional[int],
+    formatted_query: str,
+) -> MediaLink:
+    """Return the top live result for a query, or raise ``ProviderNotFoundError``."""
+    results = await provider.search(query, season=season, episode=episode, limit=1)
+    with time_stage(provider.name, "filter_sort"):
+        live_results = _filter_live_results(results)
+
+    if not live_results:
+        raise ProviderNotFoundError(f"No live results found for: {formatted_query}")
+
+    # Return top live result (already sorted by provider)
+    return live_results[0]
 
 
 @router.get(
@@ -156,6 +276,8 @@ async def resolve_media(
     description="Search for media and return all matching results. Supports TV episode filtering.",
 )
 async def search_media(
+    request: Request,
+    response: Response,
     query: str,
     season: Optional[int] = Query(None, description="Season number for TV shows"),
     episode: Optional[int] = Query(None, description="Episode number for TV shows"),
@@ -171,49 +293,283 @@ async def search_media(
     - **limit**: Maximum number of results (default: 10)
 
     When season and episode are provided, filters results to match the specific episode.
+    Responses carry an `ETag` and answer a matching `If-None-Match` with 304.
     """
     _format_tv_query(query, season, episode)
     try:
         results = await provider.search(query, season=season, episode=episode, limit=limit)
-        live_results = _filter_live_results(results)
+        with time_stage(provider.name, "filter_sort"):
+            live_results = _filter_live_results(results)
 
         # Apply strict limit on live results
         limited_results = live_results[:limit]
+        total_results = _live_total(results, live_results)
 
-        return SearchResult(
+        etag = etag_for(limited_results, query, total_results, provider.name)
+        result = SearchResult(
             query=query,
             results=limited_results,
-            total_results=len(live_results),
+            total_results=total_results,
             provider_name=provider.name,
         )
+        return _conditional_response(request, response, result, etag, SEARCH_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as exc:
-        mapped_exception = _map_provider_exception(exc)
-        mapped_exception.detail["query"] = query
-        mapped_exception.detail["season"] = season
-        mapped_exception.detail["episode"] = episode
-        if mapped_exception.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
-            mapped_exception.detail["provider"] = provider.name
-        raise mapped_exception
+        raise _provider_error(exc, provider, query, season, episode)
+
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _stream_frame(event: str, data: str, stream_format: str) -> str:
+    """Encode one stream frame as an NDJSON line or a Server-Sent Event."""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return f'{{"event":"{event}","data":{data}}}\n'
+
+
+@router.get(
+    "/search/{query}/stream",
+    summary="Stream media results",
+    description=(
+        "Search for media and stream each result as soon as the provider resolves it, "
+        "as NDJSON lines or Server-Sent Events, followed by a summary frame."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in STREAM_MEDIA_TYPES.values()},
+            "description": "Stream of `result` frames followed by one `summary` frame",
+        },
+    },
+)
+async def stream_search_media(
+    request: Request,
+    query: str,
+    season: Optional[int] = Query(None, description="Season number for TV shows"),
+    episode: Optional[int] = Query(None, description="Episode number for TV shows"),
+    limit: int = Query(10, ge=1, le=25, description="Maximum number of results (1-25)"),
+    stream_format: str = Query(
+        "ndjson",
+        alias="format",
+        pattern="^(ndjson|sse)$",
+        description="Stream encoding: `ndjson` or `sse`",
+    ),
+    provider: BaseProvider = Depends(get_provider),
+) -> StreamingResponse:
+    """
+    Stream search results as they resolve.
+
+    Every frame has an event name and a JSON payload:
+    - **result**: one `MediaLink`, in the order the provider resolved it
+    - **summary**: `query`, `sent_results` and `provider_name`, sent last.
+      `sent_results` is the number of `result` frames sent (at most
+      `limit`), not the total match count `/resolve/search/{query}` reports
+      as `total_results`: results are streamed before the search finishes,
+      so the total is never known
+    - **error**: `error` / `message` if the provider fails mid-stream
+
+    NDJSON frames are `{"event": ..., "data": ...}` lines; SSE frames use the
+    `event:` and `data:` fields. Errors before the first result are returned
+    as regular HTTP errors, exactly like `/resolve/search/{query}`.
+    """
+    _format_tv_query(query, season, episode)
+
+    # Dependency teardown (and with it the request's lease) runs before the
+    # body is streamed, so the stream holds its own lease until it ends.
+    stream_lease = AsyncExitStack()
+    registry: Optional[ProviderRegistry] = getattr(request.app.state, "provider_registry", None)
+    if registry is not None:
+        await stream_lease.enter_async_context(registry.lease())
+
+    links = provider.search_iter(query, season=season, episode=episode, limit=limit)
+
+    async def release() -> None:
+        await links.aclose()
+        await stream_lease.aclose()
+
+    # Pull the first result before committing to a 200 so that provider
+    # errors still map to the usual status codes.
+    try:
+        first: Optional[MediaLink] = await links.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except Exception as exc:
+        await release()
+        raise _provider_error(exc, provider, query, season, episode)
+
+    async def frames() -> AsyncIterator[str]:
+        sent = 0
+        try:
+            pending = first
+            while pending is not None and sent < limit:
+                if pending.seeds > 0:
+                    yield _stream_frame("result", pending.model_dump_json(), stream_format)
+                    sent += 1
+                if sent >= limit:
+                    break
+                pending = await links.__anext__()
+        except StopAsyncIteration:
+            pass
+        except Exception as exc:
+            detail = _map_provider_exception(exc).detail
+            PROVIDER_ERRORS.inc(provider.name, detail["error"])
+            yield _stream_frame("error", json.dumps(detail), stream_format)
+            return
+        finally:
+            await release()
+
+        summary = SearchSummary(query=query, sent_results=sent, provider_name=provider.name)
+        yield _stream_frame("summary", summary.model_dump_json(), stream_format)
+
+    return StreamingResponse(
+        frames(),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Covers a response that is abandoned before the body starts.
+        background=BackgroundTask(release),
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResolveResponse,
+    summary="Resolve many media queries at once",
+    description=(
+        "Resolve a list of titles (e.g. a whole season or a watchlist) in one request. "
+        "Items are resolved concurrently and each gets its own result or error."
+    ),
+)
+async def resolve_batch(
+    batch: BatchResolveRequest,
+    provider: BaseProvider = Depends(get_provider),
+) -> BatchResolveResponse:
+    """
+    Resolve every item to its top live result, like `GET /resolve/{query}`.
+
+    - Equivalent items (same canonical query, season and episode) are
+      resolved once
+    - When `BATCH_SEASON_PACK_MIN_EPISODES` or more episodes of one season
+      are requested, they are resolved from a single season search; only
+      episodes it has no live result for are searched individually
+    - At most `BATCH_CONCURRENCY` searches hit the provider at a time
+    - Items still unresolved after `BATCH_DEADLINE_SECONDS` fail with
+      `PROVIDER_TIMEOUT`
+
+    Failures are reported per item with the same `error` codes and status
+    codes as the single-item endpoints; the batch itself returns 200.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def resolve_season(query: str, season: int, episodes: Set[int]) -> Dict[int, MediaLink]:
+        async with semaphore:
+            try:
+                by_episode = await provider.search_season(query, season, sorted(episodes), limit=1)
+            except ProviderNotFoundError:
+                return {}
+        with time_stage(provider.name, "filter_sort"):
+            live_by_episode = {
+                episode: _filter_live_results(links) for episode, links in by_episode.items()
+            }
+        return {episode: live[0] for episode, live in live_by_episode.items() if live}
+
+    async def resolve_one(item: BatchResolveItem) -> MediaLink:
+        formatted_query = _format_tv_query(item.query, item.season, item.episode)
+        canonical = canonicalize(item.query, item.season, item.episode)
+        season_pack = season_packs.get((canonical.text, canonical.season))
+        if season_pack is not None:
+            link = (await season_pack).get(canonical.episode)
+            if link is not None:
+                return link
+        async with semaphore:
+            return await _resolve_top(provider, item.query, item.season, item.episode, formatted_query)
+
+    season_packs: Dict[Tuple[str, Optional[int]], asyncio.Task] = {}
+    if BATCH_SEASON_PACK_MIN_EPISODES > 0:
+        wanted: Dict[Tuple[str, int], Set[int]] = {}
+        for item in batch.items:
+            if (item.season is not None and item.season <= 0) or (item.episode is not None and item.episode <= 0):
+                continue
+            canonical = canonicalize(item.query, item.season, item.episode)
+            if canonical.season is not None and canonical.episode is not None:
+                wanted.setdefault((canonical.text, canonical.season), set()).add(canonical.episode)
+        for (query, season), episodes in wanted.items():
+            if len(episodes) >= BATCH_SEASON_PACK_MIN_EPISODES:
+                season_packs[(query, season)] = asyncio.create_task(resolve_season(query, season, episodes))
+
+    tasks: Dict[Tuple[str, Optional[int], Optional[int]], asyncio.Task] = {}
+    for item in batch.items:
+        key = canonicalize(item.query, item.season, item.episode).key()
+        if key not in tasks:
+            tasks[key] = asyncio.create_task(resolve_one(item))
+
+    try:
+        _, pending = await asyncio.wait(tasks.values(), timeout=BATCH_DEADLINE_SECONDS)
+    finally:
+        # Past the deadline, or because the request itself was cancelled.
+        for task in [*tasks.values(), *season_packs.values()]:
+            if not task.done():
+                task.cancel()
+
+    results = []
+    for item in batch.items:
+        task = tasks[canonicalize(item.query, item.season, item.episode).key()]
+        outcome = BatchResolveResult(query=item.query, season=item.season, episode=item.episode)
+        if task in pending:
+            exc: Exception = ProviderTimeoutError("Batch deadline exceeded before the item resolved")
+        else:
+            exc = task.exception()
+
+        if exc is None:
+            outcome.result = task.result()
+        else:
+            if isinstance(exc, HTTPException):
+                mapped_exception = exc
+            else:
+                mapped_exception = _map_provider_exception(exc)
+                PROVIDER_ERRORS.inc(provider.name, mapped_exception.detail["error"])
+            outcome.error = BatchItemError(
+                status_code=mapped_exception.status_code,
+                error=mapped_exception.detail["error"],
+                message=mapped_exception.detail["message"],
+            )
+        results.append(outcome)
+
+    return fast_response(BatchResolveResponse(results=results, provider_name=provider.name))
 
 
 @router.get(
     "/health/provider",
     summary="Check provider health",
-    description="Verify that the media provider is accessible",
+    description="Report the provider status from the latest background health probe",
 )
 async def check_provider_health(provider: BaseProvider = Depends(get_provider)) -> dict:
-    """Check if the provider is healthy."""
-    is_healthy = await provider.health_check()
+    """
+    Check if the provider is healthy.
 
-    if not is_healthy:
+    When the provider stack includes a ``HealthGatedProvider`` the status
+    comes from its cached background probe (under ``probe``) and no upstream
+    call is made; otherwise the provider is probed directly. Stats that read
+    the persistent cache are collected in a worker thread.
+    """
+    probe = health_snapshot(provider)
+    stats = await asyncio.to_thread(provider.stats)
+    if probe is None:
+        health_status = "healthy" if await provider.health_check() else "unhealthy"
+    else:
+        health_status = probe["status"]
+
+    if health_status == "unhealthy":
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"status": "unhealthy", "provider": provider.name},
+            detail={"status": "unhealthy", "provider": provider.name, "probe": probe},
         )
 
-    return {"status": "healthy", "provider": provider.name}
+    return {"status": health_status, "provider": provider.name, "probe": probe, "stats": stats}
 
 
 @router.get(
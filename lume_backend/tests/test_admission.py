@@ -0,0 +1,139 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from main import create_application
+from models.schemas import MediaLink
+from providers.admission import (
+    AdmissionControlledProvider,
+    AdmissionRejectedError,
+    RateLimitedError,
+    current_client,
+)
+from providers.base import BaseProvider
+from providers.cached_provider import CachedProvider
+from routers.media import client_identity, get_provider
+
+
+class SlowProvider(BaseProvider):
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__("SlowProvider")
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return [MediaLink(title=f"{query} 1080p", url="https://example.com/a", size=1, seeds=5)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _outcomes(results):
+    return sorted(type(result).__name__ for result in results)
+
+
+def test_concurrency_is_capped_and_waiters_are_admitted():
+    inner = SlowProvider(delay=0.02)
+    provider = AdmissionControlledProvider(inner, max_concurrent=2, max_queue=10, max_wait=5, rate=0)
+
+    async def run():
+        return await asyncio.gather(*(provider.search(f"q{i}") for i in range(6)))
+
+    results = asyncio.run(run())
+
+    assert len(results) == 6
+    assert inner.max_active == 2
+    assert provider.stats()["admission"]["admitted"] == 6
+
+
+def test_full_queue_is_shed_immediately():
+    provider = AdmissionControlledProvider(SlowProvider(delay=0.1), max_concurrent=1, max_queue=1, max_wait=5, rate=0)
+
+    async def run():
+        return await asyncio.gather(*(provider.search(f"q{i}") for i in range(4)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert _outcomes(results) == ["AdmissionRejectedError", "AdmissionRejectedError", "list", "list"]
+    rejected = [result for result in results if isinstance(result, AdmissionRejectedError)]
+    assert rejected[0].retry_after == 5
+    assert provider.stats()["admission"]["rejected"]["queue_full"] == 2
+
+
+def test_waiters_time_out_after_max_wait():
+    provider = AdmissionControlledProvider(SlowProvider(delay=0.2), max_concurrent=1, max_queue=5, max_wait=0.05, rate=0)
+
+    async def run():
+        return await asyncio.gather(provider.search("a"), provider.search("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert _outcomes(results) == ["AdmissionRejectedError", "list"]
+    assert provider.stats()["admission"]["rejected"]["queue_timeout"] == 1
+    assert provider.stats()["admission"]["active"] == 0
+
+
+def test_clients_are_rate_limited_independently():
+    now = [0.0]
+    provider = AdmissionControlledProvider(SlowProvider(), rate=1, burst=2, clock=lambda: now[0])
+
+    async def search_as(client, query):
+        current_client.set(client)
+        try:
+            await provider.search(query)
+            return "ok"
+        except RateLimitedError as exc:
+            return exc.retry_after
+
+    async def run():
+        first = [await search_as("alice", f"q{i}") for i in range(3)]
+        other = await search_as("bob", "q")
+        now[0] += 1
+        refilled = await search_as("alice", "q")
+        return first, other, refilled
+
+    assert asyncio.run(run()) == (["ok", "ok", 1], "ok", "ok")
+
+
+def test_cache_hits_bypass_admission_and_sheds_map_to_503():
+    inner = SlowProvider()
+    provider = CachedProvider(AdmissionControlledProvider(inner, rate=1, burst=1))
+
+    async def attributed_provider():
+        current_client.set("203.0.113.9")
+        yield provider
+
+    app = create_application()
+    app.dependency_overrides[get_provider] = attributed_provider
+    client = TestClient(app)
+
+    first = client.get("/resolve/dune")
+    hits = [client.get("/resolve/dune") for _ in range(5)]
+    shed = client.get("/resolve/arrival")
+
+    assert first.status_code == 200
+    assert all(hit.status_code == 200 for hit in hits)
+    assert inner.calls == 1
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert shed.json()["detail"]["error"] == "RATE_LIMITED"
+
+
+def test_router_attributes_requests_to_forwarded_client(monkeypatch):
+    class FakeRequest:
+        def __init__(self, headers, host):
+            self.headers = headers
+            self.client = type("Client", (), {"host": host})()
+
+    assert client_identity(FakeRequest({}, "10.0.0.1")) == "10.0.0.1"
+    monkeypatch.setattr("routers.media.ADMISSION_CLIENT_HEADER", "X-Forwarded-For")
+    assert client_identity(FakeRequest({"X-Forwarded-For": "198.51.100.7, 10.0.0.1"}, "10.0.0.1")) == "198.51.100.7"
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from providers.async_p2p_provider import AsyncP2PProvider
+from providers import executor
+from providers.base import ProviderConnectionError
+from providers.registry import build_provider
+
+HASH = "a" * 40
+
+
+class FakeIndex(ThreadingHTTPServer):
+    """Local stand-in for the index's JSON API; records connections and load."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeIndexHandler)
+        self.rows = [
+            {"id": "1", "name": "Dune 2021 dead", "size": "100", "seeders": "0", "info_hash": "b" * 40},
+            {"id": "2", "name": "Dune 2021 1080p", "size": "300", "seeders": "50", "info_hash": HASH},
+            {"id": "3", "name": "Dune 2021 720p", "size": "200", "seeders": "20", "info_hash": ""},
+        ]
+        self.details = {"3": {"id": "3", "name": "Dune 2021 720p", "info_hash": "c" * 40}}
+        self.delay = 0.0
+        self.padding = 0
+        self.status = 200
+        self.connections = 0
+        self.active = 0
+        self.peak_active = 0
+        self.paths = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeIndexHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        index = self.server
+        with index._lock:
+            index.active += 1
+            index.peak_active = max(index.peak_active, index.active)
+        try:
+            url = urlparse(self.path)
+            index.paths.append(url.path)
+            time.sleep(index.delay)
+            if url.path == "/q.php":
+                rows = index.rows or [{"id": "0", "name": "No results returned", "info_hash": "0" * 40}]
+                payload = rows + [{"id": "9", "name": "x" * index.padding, "seeders": "0"}] * bool(index.padding)
+            else:
+                payload = index.details.get(parse_qs(url.query)["id"][0], {})
+            body = json.dumps(payload).encode()
+            self.send_response(index.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with index._lock:
+                index.active -= 1
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def index():
+    server = FakeIndex()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _search(provider, *args, **kwargs):
+    async def run():
+        try:
+            return await provider.search(*args, **kwargs)
+        finally:
+            await provider.close()
+
+    return asyncio.run(run())
+
+
+def test_results_are_ranked_with_local_and_looked_up_magnets(index):
+    provider = AsyncP2PProvider(base_url=index.url)
+
+    results = _search(provider, "Dune 2021", limit=5)
+
+    assert [link.title for link in results] == ["Dune 2021 1080p", "Dune 2021 720p"]
+    assert str(results[0].url).startswith(f"magnet:?xt=urn:btih:{HASH}")
+    assert str(results[1].url).startswith(f"magnet:?xt=urn:btih:{'c' * 40}")
+    assert index.paths.count("/t.php") == 1
+    assert provider.stats()["magnets"] == {"synthesized": 1, "downloaded": 1}
+
+
+def test_requests_reuse_kept_alive_connections(index):
+    provider = AsyncP2PProvider(base_url=index.url)
+
+    async def run():
+        for _ in range(5):
+            await provider.search("Dune 2021", limit=1)
+        await provider.close()
+
+    asyncio.run(run())
+
+    assert provider.requests == 5
+    assert index.connections == 1
+
+
+def test_open_connections_are_capped(index):
+    index.delay = 0.05
+    provider = AsyncP2PProvider(base_url=index.url, max_connections=2)
+
+    async def run():
+        await asyncio.gather(*(provider.search(f"Dune {n}", limit=1) for n in range(6)))
+        await provider.close()
+
+    asyncio.run(run())
+
+    assert index.peak_active == 2
+    assert index.connections == 2
+
+
+def test_oversized_responses_are_rejected(index):
+    index.padding = 4096
+    provider = AsyncP2PProvider(base_url=index.url, max_response_bytes=1024)
+
+    with pytest.raises(ProviderConnectionError):
+        _search(provider, "Dune 2021", limit=5)
+    assert provider.stats()["http"]["oversized"] == 1
+
+
+def test_index_errors_and_empty_results(index):
+    assert _search(AsyncP2PProvider(base_url=index.url), "Dune 2021", limit=5)
+
+    index.rows = []
+    assert _search(AsyncP2PProvider(base_url=index.url), "Nothing", limit=5) == []
+
+    index.status = 500
+    with pytest.raises(ProviderConnectionError):
+        _search(AsyncP2PProvider(base_url=index.url), "Dune 2021", limit=5)
+
+
+def test_health_check_queries_the_index(index):
+    provider = AsyncP2PProvider(base_url=index.url)
+
+    async def run():
+        healthy = await provider.health_check()
+        await provider.close()
+        return healthy
+
+    assert asyncio.run(run()) is True
+    assert index.paths == ["/q.php"]
+
+
+def test_registry_builds_the_async_backend():
+    provider = build_provider("p2p-async", cache=False, circuit_breaker=False, health_gate=False, admission=False)
+
+    assert isinstance(provider, AsyncP2PProvider)
+    assert provider.name == "AsyncP2PProvider"
+    asyncio.run(provider.close())
+
+
+def test_no_thread_pool_is_created_or_exported():
+    before = set(executor._EXECUTORS)
+
+    provider = AsyncP2PProvider()
+
+    assert provider.executor is None
+    assert set(executor._EXECUTORS) == before
+    assert "executor" not in provider.stats()
+    asyncio.run(provider.close())
@@ -0,0 +1,195 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderNotFoundError
+from providers.mock_provider import MockProvider
+from routers.media import get_provider
+
+
+class TrackingProvider(BaseProvider):
+    def __init__(self, delay: float = 0.0, slow_queries=()) -> None:
+        super().__init__("TrackingProvider")
+        self.delay = delay
+        self.slow_queries = set(slow_queries)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls.append((query, season, episode))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(5 if query in self.slow_queries else self.delay)
+        finally:
+            self.active -= 1
+        if query == "missing":
+            raise ProviderNotFoundError(f"No results found for: {query}")
+        return [MediaLink(title=f"{query} {season}x{episode}", url="https://example.com/a", size=1, seeds=5)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _client_for(provider):
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    return TestClient(app)
+
+
+def test_batch_resolves_items_in_request_order():
+    client = _client_for(MockProvider())
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "The Boys", "season": 4, "episode": 2},
+        {"query": "inception"},
+        {"query": "The Boys", "season": 4, "episode": 1},
+    ]})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["provider_name"] == "MockProvider"
+    assert [item["result"]["title"] for item in payload["results"]] == [
+        "The Boys S04E02 1080p WEB-DL",
+        "Inception (2010) 1080p BluRay",
+        "The Boys S04E01 1080p WEB-DL",
+    ]
+    assert all(item["error"] is None for item in payload["results"])
+
+
+def test_batch_reports_per_item_errors_with_single_item_codes():
+    client = _client_for(TrackingProvider())
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "found"},
+        {"query": "missing"},
+        {"query": "bad", "season": 0, "episode": 1},
+    ]})
+
+    assert response.status_code == 200
+    found, missing, bad = response.json()["results"]
+    assert found["result"]["title"] == "found NonexNone"
+    assert missing["result"] is None
+    assert missing["error"]["status_code"] == 404
+    assert missing["error"]["error"] == "NOT_FOUND"
+    assert bad["error"]["status_code"] == 422
+    assert bad["error"]["error"] == "INVALID_SEASON"
+
+
+def test_batch_shares_work_between_identical_items():
+    provider = TrackingProvider()
+    client = _client_for(provider)
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "The Boys", "season": 4, "episode": 1},
+        {"query": "the boys ", "season": 4, "episode": 1},
+        {"query": "The Boys", "season": 4, "episode": 2},
+    ]})
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 3
+    assert len(provider.calls) == 2
+
+
+def test_batch_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr("routers.media.BATCH_CONCURRENCY", 3)
+    monkeypatch.setattr("routers.media.BATCH_SEASON_PACK_MIN_EPISODES", 0)
+    provider = TrackingProvider(delay=0.02)
+    client = _client_for(provider)
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "show", "season": 1, "episode": episode} for episode in range(1, 11)
+    ]})
+
+    assert response.status_code == 200
+    assert len(provider.calls) == 10
+    assert provider.max_active == 3
+
+
+def test_batch_deadline_times_out_slow_items(monkeypatch):
+    monkeypatch.setattr("routers.media.BATCH_DEADLINE_SECONDS", 0.2)
+    client = _client_for(TrackingProvider(slow_queries={"slow"}))
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "fast"},
+        {"query": "slow"},
+    ]})
+
+    fast, slow = response.json()["results"]
+    assert fast["result"] is not None
+    assert slow["error"]["status_code"] == 504
+    assert slow["error"]["error"] == "PROVIDER_TIMEOUT"
+
+
+def test_batch_size_is_validated():
+    client = _client_for(TrackingProvider())
+
+    assert client.post("/resolve/batch", json={"items": []}).status_code == 422
+    too_many = {"items": [{"query": f"q{i}"} for i in range(51)]}
+    assert client.post("/resolve/batch", json=too_many).status_code == 422
+
+
+def test_cancelled_batch_cancels_its_item_tasks():
+    from models.schemas import BatchResolveRequest
+    from routers.media import resolve_batch
+
+    provider = TrackingProvider(slow_queries={"a", "b"})
+    batch = BatchResolveRequest(items=[{"query": "a"}, {"query": "b"}])
+
+    async def scenario():
+        try:
+            await asyncio.wait_for(resolve_batch(batch, provider=provider), timeout=0.1)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(0.01)
+        return provider.active
+
+    assert asyncio.run(scenario()) == 0
+
+
+class SeasonProvider(TrackingProvider):
+    """Season searches return tagged releases for episodes 1-3 only."""
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        if episode is None and season is not None:
+            self.calls.append((query, season, episode))
+            return [
+                MediaLink(title=f"{query} S0{season}E0{number} 1080p", url="https://example.com/s", size=1, seeds=9)
+                for number in (1, 2, 3)
+            ]
+        return await super().search(query, season=season, episode=episode, limit=limit)
+
+
+def test_batch_resolves_a_season_with_one_search_and_fills_gaps():
+    provider = SeasonProvider()
+    client = _client_for(provider)
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "Show", "season": 1, "episode": episode} for episode in (1, 2, 3, 4)
+    ]})
+
+    results = response.json()["results"]
+    assert [item["result"]["title"] for item in results] == [
+        "show S01E01 1080p",
+        "show S01E02 1080p",
+        "show S01E03 1080p",
+        "Show 1x4",
+    ]
+    # The season search runs on the canonical query.
+    assert provider.calls == [("show", 1, None), ("Show", 1, 4)]
+
+
+def test_batch_falls_back_per_episode_when_season_search_finds_nothing():
+    provider = TrackingProvider()
+    client = _client_for(provider)
+
+    response = client.post("/resolve/batch", json={"items": [
+        {"query": "missing", "season": 1, "episode": episode} for episode in (1, 2, 3)
+    ]})
+
+    assert all(item["error"]["error"] == "NOT_FOUND" for item in response.json()["results"])
+    assert provider.calls[0] == ("missing", 1, None)
+    assert sorted(provider.calls[1:]) == [("missing", 1, 1), ("missing", 1, 2), ("missing", 1, 3)]
@@ -0,0 +1,37 @@
+import json
+
+from benchmarks import startup
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2583 |       4477 |       providers.base
+import time:     19086 |      80555 |   providers.registry
+import time:     19131 |    1274056 | main
+"""
+
+
+def test_importtime_output_is_parsed_per_module():
+    modules = startup.parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert modules["main"] == (19131, 1274056)
+    assert modules["providers.base"] == (2583, 4477)
+    assert "imported package" not in modules
+
+
+def test_cold_start_is_measured_and_recorded(tmp_path):
+    baseline_path = tmp_path / "startup.json"
+
+    assert startup.main(["--runs", "1", "--baseline", str(baseline_path)]) == 0
+
+    saved = json.loads(baseline_path.read_text())
+    assert saved["first_response"]["median_ms"] > 0
+    assert saved["import:main"]["median_ms"] > saved["import:providers.registry"]["median_ms"]
+
+
+def test_mock_deployments_do_not_import_the_p2p_stack():
+    profile = startup.import_profile("main")
+
+    assert "providers.registry" in profile
+    assert "providers.p2p_provider" not in profile
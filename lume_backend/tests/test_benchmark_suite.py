@@ -0,0 +1,59 @@
+import json
+
+from benchmarks import suite
+
+
+def test_regressions_beyond_threshold_are_flagged():
+    baseline = {
+        "fast": {"median_us": 10.0, "peak_alloc_kib": 1.0},
+        "steady": {"median_us": 10.0, "peak_alloc_kib": 1.0},
+    }
+    results = {
+        "fast": {"median_us": 13.0, "p95_us": 15.0, "peak_alloc_kib": 1.0},
+        "steady": {"median_us": 11.0, "p95_us": 12.0, "peak_alloc_kib": 1.1},
+        "new_case": {"median_us": 99.0, "p95_us": 99.0, "peak_alloc_kib": 9.0},
+    }
+
+    regressions = suite._compare(results, baseline, threshold=0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("fast: median_us")
+
+
+def test_suite_runs_offline_and_saves_baseline(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    argv = ["--filter", "filter_live", "--iterations", "5", "--warmup", "1", "--baseline", str(baseline_path)]
+
+    assert suite.main(argv + ["--save-baseline"]) == 0
+    saved = json.loads(baseline_path.read_text())
+    assert set(saved) == {"filter_live_results"}
+    assert saved["filter_live_results"]["median_us"] > 0
+
+    # Shrink the stored baseline so the next run looks like a regression.
+    saved["filter_live_results"]["median_us"] = 1e-6
+    baseline_path.write_text(json.dumps(saved))
+    assert suite.main(argv) == 1
+
+
+def test_asgi_cases_run_in_process(tmp_path):
+    argv = ["--filter", "asgi_resolve", "--iterations", "3", "--warmup", "1", "--baseline", str(tmp_path / "b.json")]
+
+    assert suite.main(argv) == 0
+
+
+def test_first_run_records_baseline_instead_of_failing(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    argv = ["--filter", "filter_live", "--iterations", "3", "--warmup", "1", "--baseline", str(baseline_path)]
+
+    assert suite.main(argv) == 0
+    assert "filter_live_results" in json.loads(baseline_path.read_text())
+
+
+def test_p2p_case_restores_the_index_it_patched(tmp_path):
+    import providers.p2p_provider as p2p_module
+
+    original = p2p_module.PirateBayAPI
+    argv = ["--filter", "p2p", "--iterations", "3", "--warmup", "1", "--baseline", str(tmp_path / "b.json")]
+
+    assert suite.main(argv) == 0
+    assert p2p_module.PirateBayAPI is original
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderNotFoundError, ProviderTimeoutError
+from providers.cached_provider import CachedProvider
+from routers.media import get_provider
+
+
+class CountingProvider(BaseProvider):
+    def __init__(self, delay: float = 0.0, error: Exception = None) -> None:
+        super().__init__("CountingProvider")
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [MediaLink(title=f"{query} 1080p", url="https://example.com/a", size=1, seeds=10)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_repeated_search_is_served_from_cache():
+    inner = CountingProvider()
+    provider = CachedProvider(inner)
+
+    async def run():
+        await provider.search("The Boys", season=4, episode=1, limit=1)
+        return await provider.search("the boys ", season=4, episode=1, limit=1)
+
+    results = asyncio.run(run())
+
+    assert inner.calls == 1
+    assert results[0].title == "The Boys 1080p"
+    assert provider.stats()["cache"]["hits"] == 1
+    assert provider.stats()["cache"]["misses"] == 1
+
+
+def test_concurrent_identical_misses_share_one_upstream_call():
+    inner = CountingProvider(delay=0.05)
+    provider = CachedProvider(inner)
+
+    async def run():
+        return await asyncio.gather(*(provider.search("inception", limit=1) for _ in range(50)))
+
+    results = asyncio.run(run())
+
+    assert inner.calls == 1
+    assert len(results) == 50
+    stats = provider.stats()["cache"]
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 49
+
+
+def test_concurrent_streams_and_search_share_one_upstream_call():
+    inner = CountingProvider(delay=0.05)
+    provider = CachedProvider(inner)
+
+    async def stream():
+        return [link.title async for link in provider.search_iter("inception")]
+
+    async def run_all():
+        return await asyncio.gather(
+            stream(), stream(), stream(), provider.search("inception"), provider.search("Inception ")
+        )
+
+    results = asyncio.run(run_all())
+
+    assert inner.calls == 1
+    assert results[0] == results[1] == results[2] == ["inception 1080p"]
+    assert [[link.title for link in links] for links in results[3:]] == [["inception 1080p"]] * 2
+    stats = provider.stats()["cache"]
+    assert stats["misses"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    inner = CountingProvider()
+    provider = CachedProvider(inner, ttl=10, clock=clock)
+
+    asyncio.run(provider.search("inception"))
+    clock.now = 11
+    asyncio.run(provider.search("inception"))
+
+    assert inner.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    inner = CountingProvider()
+    provider = CachedProvider(inner, max_entries=2)
+
+    async def run():
+        await provider.search("a")
+        await provider.search("b")
+        await provider.search("a")
+        await provider.search("c")
+        await provider.search("a")
+        await provider.search("b")
+
+    asyncio.run(run())
+
+    assert inner.calls == 4
+    assert provider.stats()["cache"]["evictions"] == 2
+
+
+def test_not_found_is_negatively_cached():
+    clock = FakeClock()
+    inner = CountingProvider(error=ProviderNotFoundError("nothing"))
+    provider = CachedProvider(inner, negative_ttl=5, clock=clock)
+
+    for _ in range(3):
+        with pytest.raises(ProviderNotFoundError):
+            asyncio.run(provider.search("missing"))
+    assert inner.calls == 1
+    assert provider.stats()["cache"]["negative_hits"] == 2
+
+    clock.now = 6
+    with pytest.raises(ProviderNotFoundError):
+        asyncio.run(provider.search("missing"))
+    assert inner.calls == 2
+
+
+def test_other_provider_errors_are_not_cached():
+    inner = CountingProvider(error=ProviderTimeoutError("slow"))
+    provider = CachedProvider(inner)
+
+    for _ in range(2):
+        with pytest.raises(ProviderTimeoutError):
+            asyncio.run(provider.search("inception"))
+
+    assert inner.calls == 2
+
+
+def test_health_endpoint_exposes_cache_counters():
+    provider = CachedProvider(CountingProvider())
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    client = TestClient(app)
+
+    client.get("/resolve/inception")
+    client.get("/resolve/inception")
+    response = client.get("/resolve/health/provider")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["provider"] == "CountingProvider"
+    assert payload["stats"]["cache"]["hits"] == 1
+    assert payload["stats"]["cache"]["misses"] == 1
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import (
+    BaseProvider,
+    ProviderConnectionError,
+    ProviderNotFoundError,
+    ProviderTimeoutError,
+)
+from providers.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerProvider
+from routers.media import get_provider
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedProvider(BaseProvider):
+    """Fails with ``error`` while set, otherwise answers after ``delay``."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__("ScriptedProvider")
+        self.delay = delay
+        self.error = None
+        self.calls = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [MediaLink(title=query, url="https://example.com/a", size=1, seeds=1)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _breaker(clock, **overrides):
+    options = dict(window_size=10, min_calls=4, failure_rate=0.5, open_seconds=30, probes=2, clock=clock)
+    options.update(overrides)
+    return CircuitBreaker("ScriptedProvider", **options)
+
+
+def test_breaker_opens_after_sustained_failures_and_fails_fast():
+    clock = FakeClock()
+    inner = ScriptedProvider()
+    inner.error = ProviderConnectionError("down")
+    provider = CircuitBreakerProvider(inner, _breaker(clock))
+
+    for _ in range(4):
+        with pytest.raises(ProviderConnectionError):
+            asyncio.run(provider.search("q"))
+    assert provider.breaker.state == OPEN
+
+    with pytest.raises(ProviderConnectionError, match="circuit is open"):
+        asyncio.run(provider.search("q"))
+    assert inner.calls == 4
+    assert provider.breaker.rejected == 1
+
+
+def test_half_open_probes_close_the_breaker():
+    clock = FakeClock()
+    inner = ScriptedProvider()
+    inner.error = ProviderTimeoutError("slow")
+    provider = CircuitBreakerProvider(inner, _breaker(clock))
+    for _ in range(4):
+        with pytest.raises(ProviderTimeoutError):
+            asyncio.run(provider.search("q"))
+
+    clock.now = 31
+    assert provider.breaker.state == HALF_OPEN
+    inner.error = None
+    asyncio.run(provider.search("q"))
+    assert provider.breaker.state == HALF_OPEN
+    asyncio.run(provider.search("q"))
+    assert provider.breaker.state == CLOSED
+
+
+def test_half_open_failure_reopens_and_limits_probes():
+    clock = FakeClock()
+    breaker = _breaker(clock, probes=1)
+    for _ in range(4):
+        breaker.record_failure(0.1)
+    clock.now = 31
+
+    breaker.before_call()
+    with pytest.raises(ProviderConnectionError, match="probe limit"):
+        breaker.before_call()
+
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+
+def test_not_found_counts_as_success():
+    clock = FakeClock()
+    inner = ScriptedProvider()
+    inner.error = ProviderNotFoundError("none")
+    provider = CircuitBreakerProvider(inner, _breaker(clock))
+
+    for _ in range(6):
+        with pytest.raises(ProviderNotFoundError):
+            asyncio.run(provider.search("q"))
+
+    assert provider.breaker.state == CLOSED
+
+
+def test_timeout_adapts_to_observed_p99():
+    breaker = _breaker(FakeClock(), min_timeout=0.5, max_timeout=15, timeout_multiplier=2)
+    assert breaker.timeout() == 15
+
+    for latency in (0.2, 0.3, 0.4, 1.0):
+        breaker.record_success(latency)
+
+    assert breaker.timeout() == pytest.approx(2.0)
+
+    for _ in range(10):
+        breaker.record_success(0.1)
+    assert breaker.timeout() == pytest.approx(0.5)
+
+
+def test_slow_search_is_cut_at_adaptive_timeout():
+    inner = ScriptedProvider(delay=0.01)
+    provider = CircuitBreakerProvider(inner, _breaker(FakeClock(), min_timeout=0.05, timeout_multiplier=2))
+    for _ in range(4):
+        asyncio.run(provider.search("q"))
+
+    inner.delay = 1.0
+    with pytest.raises(ProviderTimeoutError, match="adaptive timeout"):
+        asyncio.run(provider.search("q"))
+
+
+def test_breaker_state_is_visible_on_health_endpoint():
+    provider = CircuitBreakerProvider(ScriptedProvider())
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    client = TestClient(app)
+
+    client.get("/resolve/inception")
+    response = client.get("/resolve/health/provider")
+
+    breaker = response.json()["stats"]["circuit_breaker"]
+    assert breaker["state"] == "closed"
+    assert breaker["calls"] == 1
+    assert breaker["timeout_seconds"] > 0
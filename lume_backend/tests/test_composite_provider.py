@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+from models.schemas import MediaLink
+from providers.base import (
+    BaseProvider,
+    ProviderConnectionError,
+    ProviderNotFoundError,
+    ProviderTimeoutError,
+)
+from providers.cached_provider import CachedProvider
+from providers.composite_provider import CompositeProvider, dedupe_key
+from providers.registry import build_provider
+
+
+def _link(title, url, seeds):
+    return MediaLink(title=title, url=url, size=1, seeds=seeds)
+
+
+class StaticProvider(BaseProvider):
+    def __init__(self, name, results=None, delay=0.0, error=None, delays=None) -> None:
+        super().__init__(name)
+        self.results = results or []
+        self.delay = delay
+        self.delays = list(delays or [])
+        self.error = error
+        self.calls = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        await asyncio.sleep(self.delays.pop(0) if self.delays else self.delay)
+        if self.error is not None:
+            raise self.error
+        return list(self.results)
+
+    async def health_check(self) -> bool:
+        return self.error is None
+
+
+def test_results_are_merged_deduplicated_and_ranked():
+    first = StaticProvider("first", [
+        _link("A", "https://cdn.example.com/a/", 10),
+        _link("B", "https://cdn.example.com/b", 50),
+    ])
+    second = StaticProvider("second", [
+        _link("A better", "https://CDN.example.com/a", 30),
+        _link("C", "https://cdn.example.com/c", 20),
+    ])
+    provider = CompositeProvider([first, second], min_seeds=1000)
+
+    results = asyncio.run(provider.search("query"))
+
+    assert [link.title for link in results] == ["B", "A better", "C"]
+
+
+def test_magnets_are_deduplicated_by_info_hash():
+    magnet_a = _link("x", "https://example.com/dl?xt=urn:btih:ABCDEF&dn=x", 1)
+    magnet_b = _link("y", "https://mirror.example.org/get?xt=urn:btih:abcdef", 2)
+
+    assert dedupe_key(magnet_a) == dedupe_key(magnet_b) == "btih:abcdef"
+
+
+def test_failing_child_degrades_instead_of_failing():
+    healthy = StaticProvider("healthy", [_link("A", "https://example.com/a", 10)])
+    timeout = StaticProvider("timeout", error=ProviderTimeoutError("slow"))
+    down = StaticProvider("down", error=ProviderConnectionError("down"))
+    provider = CompositeProvider([healthy, timeout, down], min_seeds=1000)
+
+    results = asyncio.run(provider.search("query"))
+
+    assert [link.title for link in results] == ["A"]
+    failures = provider.stats()["composite"]["child_failures"]
+    assert failures == {"healthy": 0, "timeout": 1, "down": 1}
+
+
+def test_error_is_raised_when_every_child_fails():
+    not_found = CompositeProvider([
+        StaticProvider("a", error=ProviderNotFoundError("none")),
+        StaticProvider("b", error=ProviderNotFoundError("none")),
+    ])
+    with pytest.raises(ProviderNotFoundError):
+        asyncio.run(not_found.search("query"))
+
+    down = CompositeProvider([
+        StaticProvider("a", error=ProviderNotFoundError("none")),
+        StaticProvider("b", error=ProviderConnectionError("down")),
+    ])
+    with pytest.raises(ProviderConnectionError):
+        asyncio.run(down.search("query"))
+
+
+def test_returns_early_once_enough_quality_results_arrive():
+    fast = StaticProvider("fast", [_link("A", "https://example.com/a", 100)])
+    slow = StaticProvider("slow", [_link("B", "https://example.com/b", 500)], delay=5)
+    provider = CompositeProvider([fast, slow], min_seeds=50)
+
+    started = time.perf_counter()
+    results = asyncio.run(provider.search("query", limit=1))
+
+    assert time.perf_counter() - started < 1
+    assert [link.title for link in results] == ["A"]
+    assert provider.stats()["composite"]["early_returns"] == 1
+
+
+def test_deadline_drops_slow_children():
+    fast = StaticProvider("fast", [_link("A", "https://example.com/a", 1)])
+    slow = StaticProvider("slow", [_link("B", "https://example.com/b", 500)], delay=5)
+    provider = CompositeProvider([fast, slow], deadline=0.2, min_seeds=50)
+
+    results = asyncio.run(provider.search("query", limit=5))
+
+    assert [link.title for link in results] == ["A"]
+    assert provider.stats()["composite"]["deadline_hits"] == 1
+
+
+def test_deadline_without_results_raises_timeout():
+    slow = StaticProvider("slow", [_link("B", "https://example.com/b", 500)], delay=5)
+    provider = CompositeProvider([slow], deadline=0.1)
+
+    with pytest.raises(ProviderTimeoutError):
+        asyncio.run(provider.search("query"))
+
+
+def test_slow_child_gets_hedged_request():
+    # First attempt stalls, the hedged second attempt answers quickly.
+    child = StaticProvider("flaky", [_link("A", "https://example.com/a", 10)], delays=[5, 0.01])
+    provider = CompositeProvider([child], hedge_delay=0.05, min_seeds=1000)
+
+    started = time.perf_counter()
+    results = asyncio.run(provider.search("query"))
+
+    assert time.perf_counter() - started < 1
+    assert [link.title for link in results] == ["A"]
+    assert child.calls == 2
+    assert provider.stats()["composite"]["hedged_requests"] == 1
+
+
+def test_registry_builds_composite_from_backend_list():
+    provider = build_provider("mock, random", health_gate=False, admission=False)
+
+    assert isinstance(provider, CachedProvider)
+    assert isinstance(provider.provider, CompositeProvider)
+    assert [child.name for child in provider.provider.providers] == ["MockProvider", "RandomMockProvider"]
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from providers.base import ProviderConnectionError
+from providers.executor import BlockingExecutor
+from providers.p2p_provider import P2PProvider
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition never became true"
+        time.sleep(0.01)
+
+
+def test_executor_rejects_calls_beyond_workers_and_queue():
+    executor = BlockingExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        with pytest.raises(ProviderConnectionError):
+            await executor.run(lambda: "rejected")
+        assert time.perf_counter() - started < 0.1
+
+        release.set()
+        return await running, await queued
+
+    try:
+        assert asyncio.run(scenario()) == (True, "queued")
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["running"] == 0 and stats["queued"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_timed_out_call_is_abandoned_and_keeps_its_slot_until_it_returns():
+    executor = BlockingExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(executor.run(release.wait), timeout=0.05)
+        # The thread is still blocked, so the only slot is still taken.
+        with pytest.raises(ProviderConnectionError):
+            await executor.run(lambda: None)
+
+    try:
+        asyncio.run(scenario())
+        assert executor.stats()["abandoned_running"] == 1
+        assert executor.stats()["abandoned_total"] == 1
+
+        release.set()
+        _wait_for(lambda: executor.stats()["abandoned_running"] == 0)
+        assert executor.stats()["running"] == 0
+        assert asyncio.run(executor.run(lambda: "free again")) == "free again"
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_cancelled_queued_call_never_runs_and_is_not_abandoned():
+    executor = BlockingExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(executor.run(lambda: ran.append(True)), timeout=0.05)
+        release.set()
+        await blocker
+
+    try:
+        asyncio.run(scenario())
+        assert ran == []
+        assert executor.stats()["abandoned_total"] == 0
+        assert executor.stats()["queued"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_p2p_provider_fails_fast_when_its_executor_is_saturated(monkeypatch):
+    release = threading.Event()
+
+    class BlockingPirateBayAPI:
+        @staticmethod
+        def Search(_query):
+            release.wait()
+            return [SimpleNamespace(id=1, name="live", size=1, seeds=10)]
+
+        @staticmethod
+        def Download(item_id):
+            return f"https://example.com/{item_id}"
+
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", BlockingPirateBayAPI)
+    provider = P2PProvider(executor=BlockingExecutor("p2p-test", max_workers=1, max_queue=0))
+
+    async def scenario():
+        first = asyncio.ensure_future(provider.search("query", limit=1))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ProviderConnectionError):
+            await provider.search("query", limit=1)
+        release.set()
+        return await first
+
+    try:
+        results = asyncio.run(scenario())
+        assert [link.title for link in results] == ["live"]
+        assert provider.stats()["executor"]["rejected"] == 1
+    finally:
+        release.set()
+        asyncio.run(provider.close())
+
+
+def test_executor_load_is_exported_as_gauges():
+    from core.metrics import REGISTRY
+
+    executor = BlockingExecutor("gauge-test", max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        calls = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        rendered = REGISTRY.render()
+        release.set()
+        await asyncio.gather(*calls)
+        return rendered
+
+    try:
+        rendered = asyncio.run(scenario())
+        assert 'lume_executor_running_calls{executor="gauge-test"} 1' in rendered
+        assert 'lume_executor_queued_calls{executor="gauge-test"} 1' in rendered
+        assert 'lume_executor_capacity{executor="gauge-test"} 3' in rendered
+    finally:
+        release.set()
+        executor.shutdown()
+    assert 'lume_executor_running_calls{executor="gauge-test"}' not in REGISTRY.render()
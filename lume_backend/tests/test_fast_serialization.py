@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+
+from core.serialization import PydanticJSONResponse
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderNotFoundError
+from routers.media import get_provider
+
+
+class AwkwardTitlesProvider(BaseProvider):
+    """Results with non-ASCII, quotes, escapes and missing sizes."""
+
+    def __init__(self) -> None:
+        super().__init__("AwkwardTitlesProvider")
+        self.links = [
+            MediaLink(title='Amélie "Le Fabuleux" 日本語 \\ \t tab', url="https://example.com/a?x=1&y=é", size=None, seeds=9),
+            MediaLink(title="Emoji 🎬 / slash", url="https://EXAMPLE.com/b", size=0, seeds=3),
+            MediaLink(title="Dead", url="https://example.com/c", size=10, seeds=0),
+        ]
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        if query == "missing":
+            raise ProviderNotFoundError("none")
+        return list(self.links)
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _responses(monkeypatch, method, path, **kwargs):
+    provider = AwkwardTitlesProvider()
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    client = TestClient(app)
+
+    bodies = {}
+    for enabled in (False, True):
+        monkeypatch.setattr("core.serialization.FAST_SERIALIZATION", enabled)
+        response = getattr(client, method)(path, **kwargs)
+        bodies[enabled] = response
+    return bodies[False], bodies[True]
+
+
+def test_resolve_wire_format_is_byte_compatible(monkeypatch):
+    rendered = []
+    original_render = PydanticJSONResponse.render
+
+    def spy(self, content):
+        rendered.append(type(content).__name__)
+        return original_render(self, content)
+
+    monkeypatch.setattr(PydanticJSONResponse, "render", spy)
+    default, fast = _responses(monkeypatch, "get", "/resolve/amelie")
+
+    assert rendered == ["MediaLink"]
+    assert fast.status_code == default.status_code == 200
+    assert fast.content == default.content
+    assert fast.headers["content-type"] == default.headers["content-type"]
+    assert fast.headers["content-length"] == default.headers["content-length"]
+
+
+def test_search_wire_format_is_byte_compatible(monkeypatch):
+    default, fast = _responses(monkeypatch, "get", "/resolve/search/amelie", params={"limit": 25})
+
+    assert fast.content == default.content
+    assert fast.json()["total_results"] == 2
+
+
+def test_batch_wire_format_is_byte_compatible(monkeypatch):
+    body = {"items": [{"query": "amelie", "season": 1, "episode": 2}, {"query": "missing"}]}
+    default, fast = _responses(monkeypatch, "post", "/resolve/batch", json=body)
+
+    assert fast.content == default.content
+    assert fast.json()["results"][1]["error"]["error"] == "NOT_FOUND"
+
+
+def test_errors_are_unchanged_in_fast_mode(monkeypatch):
+    default, fast = _responses(monkeypatch, "get", "/resolve/missing")
+
+    assert fast.status_code == default.status_code == 404
+    assert fast.content == default.content
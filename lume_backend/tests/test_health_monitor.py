@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider
+from providers.cached_provider import CachedProvider
+from providers.health import HealthGatedProvider, HealthMonitor, ProviderDownError
+from providers.persistent_cache import PersistentCache
+from providers.worker_state import WorkerState
+from routers.media import get_provider
+
+
+class ProbedProvider(BaseProvider):
+    """Answers searches; ``healthy`` controls the health check outcome."""
+
+    def __init__(self) -> None:
+        super().__init__("ProbedProvider")
+        self.healthy = True
+        self.health_checks = 0
+        self.searches = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.searches += 1
+        return [MediaLink(title=query, url="https://example.com/a", size=1, seeds=5)]
+
+    async def health_check(self) -> bool:
+        self.health_checks += 1
+        return self.healthy
+
+
+def test_monitor_probes_on_interval_and_stops_promptly():
+    provider = ProbedProvider()
+    monitor = HealthMonitor(provider, interval=0.05)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.18)
+        started = time.perf_counter()
+        await asyncio.wait_for(monitor.stop(), timeout=1)
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 0.5
+    probes = monitor.probes
+    assert probes >= 3
+    assert monitor.snapshot()["status"] == "healthy"
+    assert monitor.snapshot()["checked_at"] is not None
+    assert provider.health_checks == probes
+
+
+def test_monitor_stop_is_not_lost_when_probe_finishes_in_same_tick():
+    # Health checks that complete immediately used to swallow the stop
+    # cancellation inside wait_for, so the loop kept probing forever.
+    provider = ProbedProvider()
+    monitor = HealthMonitor(provider, interval=0)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(monitor.stop(), timeout=1)
+        probes = monitor.probes
+        await asyncio.sleep(0.05)
+        return probes
+
+    probes = asyncio.run(scenario())
+    assert monitor.probes == probes
+
+
+def test_monitor_marks_provider_down_after_threshold_and_recovers():
+    provider = ProbedProvider()
+    provider.healthy = False
+    monitor = HealthMonitor(provider, failure_threshold=2)
+
+    asyncio.run(monitor.probe())
+    assert monitor.ready and monitor.status == "unknown"
+    asyncio.run(monitor.probe())
+    assert not monitor.ready
+    assert monitor.snapshot()["consecutive_failures"] == 2
+
+    provider.healthy = True
+    asyncio.run(monitor.probe())
+    assert monitor.ready and monitor.status == "healthy"
+
+
+def test_gate_fails_fast_but_cache_hits_are_still_served():
+    upstream = ProbedProvider()
+    gated = HealthGatedProvider(upstream, HealthMonitor(upstream, interval=30, failure_threshold=1))
+    provider = CachedProvider(gated)
+
+    asyncio.run(provider.search("cached"))
+    upstream.healthy = False
+    asyncio.run(gated.monitor.probe())
+
+    assert [link.title for link in asyncio.run(provider.search("cached"))] == ["cached"]
+    with pytest.raises(ProviderDownError):
+        asyncio.run(provider.search("uncached"))
+    assert upstream.searches == 1
+
+
+def test_endpoints_serve_cached_status_and_retry_after():
+    upstream = ProbedProvider()
+    gated = HealthGatedProvider(upstream, HealthMonitor(upstream, interval=30, failure_threshold=1))
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: gated
+    client = TestClient(app)
+
+    asyncio.run(gated.monitor.probe())
+    response = client.get("/resolve/health/provider")
+    assert response.status_code == 200
+    assert response.json()["probe"]["status"] == "healthy"
+    assert upstream.health_checks == 1
+
+    upstream.healthy = False
+    asyncio.run(gated.monitor.probe())
+    assert client.get("/resolve/health/provider").status_code == 503
+    assert upstream.health_checks == 2
+
+    response = client.get("/resolve/inception")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "30"
+    assert response.json()["detail"]["error"] == "PROVIDER_UNAVAILABLE"
+    assert upstream.searches == 0
+
+
+def test_liveness_endpoint_reports_last_probe():
+    with TestClient(main.app) as client:
+        payload = client.get("/health").json()
+
+    assert payload["status"] == "healthy"
+    assert payload["provider"]["status"] in ("unknown", "healthy")
+
+
+def test_liveness_endpoint_reads_only_the_probe(monkeypatch):
+    def stats():
+        raise AssertionError("/health must not collect provider stats")
+
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(main.app.state.provider_registry.provider, "stats", stats)
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    assert "status" in response.json()["provider"]
+
+
+def test_provider_health_hides_file_paths_and_worker_identity(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    upstream = ProbedProvider()
+    provider = CachedProvider(
+        HealthGatedProvider(upstream, HealthMonitor(upstream, interval=30)),
+        persistent=PersistentCache(path),
+        coordinator=WorkerState(path, owner="lume-host:4242"),
+    )
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+
+    payload = TestClient(app).get("/resolve/health/provider").json()
+
+    assert payload["stats"]["persistent_cache"]["entries"] == 0
+    assert payload["stats"]["worker_coordination"]["active_leases"] == 0
+    body = json.dumps(payload)
+    assert path not in body
+    assert "lume-host" not in body
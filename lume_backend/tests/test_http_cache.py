@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+
+from core.http_cache import etag_matches
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider
+from routers.media import get_provider
+
+
+class MutableProvider(BaseProvider):
+    def __init__(self) -> None:
+        super().__init__("MutableProvider")
+        self.seeds = 10
+        self.calls = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        return [
+            MediaLink(title="A", url="https://example.com/a", size=1, seeds=self.seeds),
+            MediaLink(title="B", url="https://example.com/b", size=2, seeds=1),
+        ]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _client(provider):
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    return TestClient(app)
+
+
+def test_resolve_sets_stable_etag_and_cache_control():
+    client = _client(MutableProvider())
+
+    first = client.get("/resolve/a")
+    second = client.get("/resolve/a")
+
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["etag"].startswith('"')
+    assert first.headers["cache-control"] == "public, max-age=300, stale-while-revalidate=600"
+
+
+def test_matching_if_none_match_returns_empty_304():
+    client = _client(MutableProvider())
+    etag = client.get("/resolve/search/a").headers["etag"]
+
+    response = client.get("/resolve/search/a", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=60, stale-while-revalidate=300"
+
+
+def test_etag_changes_with_the_result_set():
+    provider = MutableProvider()
+    client = _client(provider)
+    etag = client.get("/resolve/a").headers["etag"]
+
+    provider.seeds = 11
+    response = client.get("/resolve/a", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["seeds"] == 11
+
+
+def test_search_etag_covers_the_echoed_query_and_page():
+    client = _client(MutableProvider())
+
+    assert client.get("/resolve/search/a").headers["etag"] != client.get("/resolve/search/A").headers["etag"]
+    assert (
+        client.get("/resolve/search/a", params={"limit": 1}).headers["etag"]
+        != client.get("/resolve/search/a", params={"limit": 2}).headers["etag"]
+    )
+
+
+def test_fast_serialization_gets_the_same_headers(monkeypatch):
+    client = _client(MutableProvider())
+    default = client.get("/resolve/search/a")
+    monkeypatch.setattr("core.serialization.FAST_SERIALIZATION", True)
+    fast = client.get("/resolve/search/a")
+
+    assert fast.headers["etag"] == default.headers["etag"]
+    assert fast.headers["cache-control"] == default.headers["cache-control"]
+    assert client.get("/resolve/search/a", headers={"If-None-Match": fast.headers["etag"]}).status_code == 304
+
+
+def test_errors_are_not_cacheable():
+    response = _client(MutableProvider()).get("/resolve/a", params={"season": 0})
+
+    assert response.status_code == 422
+    assert "etag" not in response.headers
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"x", W/"y"', '"y"')
+    assert etag_matches("*", '"y"')
+    assert not etag_matches('"x"', '"y"')
+    assert not etag_matches(None, '"y"')
@@ -1,6 +1,8 @@
 import asyncio
+import sys
 from types import SimpleNamespace
 
+import pytest
 from fastapi.testclient import TestClient
 
 from main import create_application
@@ -116,6 +118,23 @@ def test_p2p_provider_filters_dead_results_and_respects_limit(monkeypatch):
     assert all(item.seeds > 0 for item in results)
 
 
+def test_pirate_bay_client_is_imported_on_first_use(monkeypatch):
+    import providers.p2p_provider as p2p_module
+
+    client = SimpleNamespace(Search=lambda _query: [], Download=lambda _item_id: None)
+    monkeypatch.setattr(p2p_module, "PirateBayAPI", p2p_module._NOT_LOADED)
+    monkeypatch.setitem(sys.modules, "PirateBayAPI", SimpleNamespace(PirateBayAPI=client))
+
+    assert p2p_module._index_client() is client
+    assert p2p_module.PirateBayAPI is client
+
+    monkeypatch.setattr(p2p_module, "PirateBayAPI", p2p_module._NOT_LOADED)
+    monkeypatch.setitem(sys.modules, "PirateBayAPI", None)  # makes the import fail
+
+    assert p2p_module._index_client() is None
+    assert asyncio.run(P2PProvider().health_check()) is False
+
+
 def test_p2p_provider_timeout_raises_provider_timeout(monkeypatch):
     def slow_search(_query):
         import time
@@ -140,3 +159,196 @@ def test_p2p_provider_timeout_raises_provider_timeout(monkeypatch):
         assert False, "expected ProviderTimeoutError"
     except ProviderTimeoutError:
         assert True
+
+
+def test_p2p_provider_sends_the_callers_spelling_upstream(monkeypatch):
+    queries = []
+    client = SimpleNamespace(Search=lambda query: queries.append(query) or [], Download=lambda _item_id: None)
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", client)
+    provider = P2PProvider()
+
+    asyncio.run(provider.search("S.H.I.E.L.D.  Agents", limit=1))
+    asyncio.run(provider.search("The Boys S04E01", season=4, limit=1))
+
+    assert queries == ["S.H.I.E.L.D. Agents", "The Boys S04E01"]
+
+
+class LatencyPirateBayAPI:
+    """Fake index whose ``Download`` sleeps for a per-item latency."""
+
+    latencies = {}
+
+    @classmethod
+    def Search(cls, _query):
+        return [
+            SimpleNamespace(id=item_id, name=f"live-{item_id}", size=item_id, seeds=100 - item_id)
+            for item_id in cls.latencies
+        ]
+
+    @classmethod
+    def Download(cls, item_id):
+        import time
+
+        time.sleep(cls.latencies[item_id])
+        return f"https://example.com/{item_id}"
+
+
+def test_p2p_provider_resolves_magnets_concurrently(monkeypatch):
+    import time
+
+    latencies = {item_id: 0.2 for item_id in range(1, 11)}
+    latencies[5] = 0.4
+    monkeypatch.setattr(LatencyPirateBayAPI, "latencies", latencies)
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", LatencyPirateBayAPI)
+    provider = P2PProvider(max_concurrency=10)
+
+    started = time.perf_counter()
+    results = asyncio.run(provider.search("query", limit=10))
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 10
+    assert [item.seeds for item in results] == sorted((item.seeds for item in results), reverse=True)
+    # Sequential resolution would take the sum of latencies (2.2 s); fan-out
+    # is bounded by the slowest single call.
+    assert elapsed < 1.0
+
+
+def test_p2p_provider_drops_magnets_past_search_deadline(monkeypatch):
+    import time
+
+    monkeypatch.setattr(LatencyPirateBayAPI, "latencies", {1: 0.05, 2: 3.0, 3: 0.05})
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", LatencyPirateBayAPI)
+    provider = P2PProvider(max_concurrency=3, search_deadline=0.5)
+
+    started = time.perf_counter()
+    results = asyncio.run(provider.search("query", limit=3))
+    elapsed = time.perf_counter() - started
+
+    assert [item.title for item in results] == ["live-1", "live-3"]
+    assert elapsed < 2.0
+
+
+def test_p2p_provider_cancels_magnet_tasks_when_search_is_cancelled(monkeypatch):
+    monkeypatch.setattr(LatencyPirateBayAPI, "latencies", {1: 0.5, 2: 0.5, 3: 0.5, 4: 0.5})
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", LatencyPirateBayAPI)
+    provider = P2PProvider(max_concurrency=1)
+
+    async def scenario():
+        try:
+            await asyncio.wait_for(provider.search("query", limit=4), timeout=0.2)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(0.05)
+        return [
+            task for task in asyncio.all_tasks()
+            if task is not asyncio.current_task() and not task.done()
+        ]
+
+    assert asyncio.run(scenario()) == []
+
+
+class FlakyPirateBayAPI(LatencyPirateBayAPI):
+    """``Download`` fails for items whose latency is ``None``; records each call."""
+
+    downloads = []
+
+    @classmethod
+    def Download(cls, item_id):
+        cls.downloads.append(item_id)
+        if cls.latencies[item_id] is None:
+            raise RuntimeError("tracker timeout")
+        return super().Download(item_id)
+
+
+def _hedged_provider(monkeypatch, latencies, hedge_delay):
+    monkeypatch.setattr(FlakyPirateBayAPI, "latencies", latencies)
+    monkeypatch.setattr(FlakyPirateBayAPI, "downloads", [])
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", FlakyPirateBayAPI)
+    return P2PProvider(hedge_candidates=3, hedge_delay=hedge_delay)
+
+
+def test_hedged_resolve_falls_back_when_top_magnet_fails(monkeypatch):
+    provider = _hedged_provider(monkeypatch, {1: None, 2: 0.01, 3: 0.01}, hedge_delay=10)
+
+    results = asyncio.run(provider.search("query", limit=1))
+
+    assert [item.title for item in results] == ["live-2"]
+    assert FlakyPirateBayAPI.downloads == [1, 2]
+    assert provider.stats()["hedging"]["backup"] == 1
+
+
+def test_hedged_resolve_races_a_slow_top_magnet(monkeypatch):
+    import time
+
+    provider = _hedged_provider(monkeypatch, {1: 1.0, 2: 0.01, 3: 0.01}, hedge_delay=0.1)
+
+    started = time.perf_counter()
+    results = asyncio.run(provider.search("query", limit=1))
+    elapsed = time.perf_counter() - started
+
+    assert [item.title for item in results] == ["live-2"]
+    assert FlakyPirateBayAPI.downloads == [1, 2]
+    assert elapsed < 0.5
+
+
+def test_hedged_resolve_prefers_a_fast_top_magnet(monkeypatch):
+    provider = _hedged_provider(monkeypatch, {1: 0.01, 2: 0.01, 3: 0.01}, hedge_delay=1)
+
+    results = asyncio.run(provider.search("query", limit=1))
+
+    assert [item.title for item in results] == ["live-1"]
+    assert FlakyPirateBayAPI.downloads == [1]
+    assert provider.stats()["hedging"]["primary"] == 1
+
+
+def test_hedged_resolve_returns_nothing_when_every_candidate_fails(monkeypatch):
+    provider = _hedged_provider(monkeypatch, {1: None, 2: None, 3: None, 4: 0.01}, hedge_delay=1)
+
+    results = asyncio.run(provider.search("query", limit=1))
+
+    assert results == []
+    assert FlakyPirateBayAPI.downloads == [1, 2, 3]
+    assert provider.stats()["hedging"]["none"] == 1
+
+
+class HashedPirateBayAPI(FlakyPirateBayAPI):
+    """Search results carry an info-hash for items listed in ``hashes``."""
+
+    hashes = {}
+
+    @classmethod
+    def Search(cls, _query):
+        results = super().Search(_query)
+        for item in results:
+            if item.id in cls.hashes:
+                item.info_hash = cls.hashes[item.id]
+        return results
+
+
+def test_p2p_provider_synthesizes_magnets_from_info_hashes(monkeypatch):
+    monkeypatch.setattr(HashedPirateBayAPI, "latencies", {1: 0.01, 2: 0.01, 3: 0.01})
+    monkeypatch.setattr(HashedPirateBayAPI, "downloads", [])
+    monkeypatch.setattr(HashedPirateBayAPI, "hashes", {1: "A" * 40, 2: "0" * 40})
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", HashedPirateBayAPI)
+    monkeypatch.setattr("providers.magnet.MAGNET_TRACKERS", ("udp://tracker.example:1337/announce",))
+    provider = P2PProvider()
+
+    results = asyncio.run(provider.search("query", limit=3))
+
+    assert [str(item.url).split("&")[0] for item in results] == [
+        "magnet:?xt=urn:btih:" + "a" * 40,
+        "https://example.com/2",
+        "https://example.com/3",
+    ]
+    assert "&dn=live-1&tr=udp%3A%2F%2Ftracker.example%3A1337%2Fannounce" in str(results[0].url)
+    # Item 2's all-zero hash is unusable, so it is downloaded like item 3.
+    assert HashedPirateBayAPI.downloads == [2, 3]
+    assert provider.stats()["magnets"] == {"synthesized": 1, "downloaded": 2}
+
+
+def test_magnet_links_round_trip_through_the_api():
+    link = MediaLink(title="The Boys", url="magnet:?xt=urn:btih:" + "b" * 40 + "&dn=The+Boys", seeds=3)
+
+    assert link.model_dump(mode="json")["url"] == "magnet:?xt=urn:btih:" + "b" * 40 + "&dn=The+Boys"
+    with pytest.raises(ValueError):
+        MediaLink(title="bad", url="ftp://example.com/file", seeds=1)
@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from core.metrics import Counter, Histogram, MetricsRegistry, PROVIDER_STAGE_SECONDS
+from main import create_application
+from providers.base import BaseProvider, ProviderTimeoutError
+from providers.mock_provider import MockProvider
+from providers.p2p_provider import P2PProvider
+from routers.media import get_provider
+
+
+class TimeoutProvider(BaseProvider):
+    def __init__(self) -> None:
+        super().__init__("MetricsTimeoutProvider")
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        raise ProviderTimeoutError("upstream timed out")
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _client_for(provider):
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    return TestClient(app)
+
+
+def _sample(text, prefix):
+    """Value of the first exposition line starting with ``prefix``."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("demo_total", "Demo.", ("code",)))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5, "a")
+    counter.inc("x")
+    counter.inc("x", amount=2)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+    assert 'demo_total{code="x"} 3' in lines
+
+
+def test_metrics_endpoint_reports_routes_stages_and_errors():
+    client = _client_for(MockProvider())
+    before = _sample(
+        client.get("/metrics").text,
+        'lume_http_requests_total{method="GET",route="/resolve/{query}",status="200"}',
+    )
+
+    client.get("/resolve/inception")
+    client.get("/resolve/search/the boys?season=4")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert _sample(
+        text, 'lume_http_requests_total{method="GET",route="/resolve/{query}",status="200"}'
+    ) == before + 1
+    assert 'lume_http_request_duration_seconds_count{method="GET",route="/resolve/search/{query}",status="200"}' in text
+    assert 'lume_provider_stage_duration_seconds_count{provider="MockProvider",stage="search"}' in text
+    assert 'lume_provider_stage_duration_seconds_count{provider="MockProvider",stage="filter_sort"}' in text
+    assert 'lume_response_serialization_seconds_count{route="/resolve/{query}"}' in text
+    assert "lume_threadpool_queue_depth " in text
+    assert "lume_threadpool_capacity " in text
+
+
+def test_provider_errors_are_counted_by_code():
+    client = _client_for(TimeoutProvider())
+
+    assert client.get("/resolve/inception").status_code == 504
+    assert client.get("/resolve/search/inception").status_code == 504
+
+    text = client.get("/metrics").text
+    assert _sample(
+        text, 'lume_provider_errors_total{provider="MetricsTimeoutProvider",error="PROVIDER_TIMEOUT"}'
+    ) == 2
+
+
+def test_p2p_provider_records_search_and_download_stages(monkeypatch):
+    class FakePirateBayAPI:
+        @staticmethod
+        def Search(_query):
+            return [SimpleNamespace(id=i, name=f"live-{i}", size=1, seeds=5) for i in range(3)]
+
+        @staticmethod
+        def Download(item_id):
+            return f"https://example.com/{item_id}"
+
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", FakePirateBayAPI)
+    searches = PROVIDER_STAGE_SECONDS.count("P2PProvider", "search")
+    downloads = PROVIDER_STAGE_SECONDS.count("P2PProvider", "magnet_download")
+
+    asyncio.run(P2PProvider().search("query", limit=3))
+
+    assert PROVIDER_STAGE_SECONDS.count("P2PProvider", "search") == searches + 1
+    assert PROVIDER_STAGE_SECONDS.count("P2PProvider", "magnet_download") == downloads + 3
@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.normalization import normalize_text
+from main import create_application
+from providers.base import ProviderNotFoundError
+from providers.cached_provider import CachedProvider
+from providers.catalog_index import CatalogIndex, generate_catalog, load_catalog
+from providers.mock_provider import MockProvider
+from providers.persistent_cache import PersistentCache
+from routers.media import get_provider
+
+
+def _linear_scan(records, query, season=None, episode=None):
+    ranked = sorted(records, key=lambda record: record["seeds"], reverse=True)
+    matches = []
+    for record in ranked:
+        title = normalize_text(record["title"])
+        if not query or query not in title:
+            continue
+        if season is not None and episode is not None and f"s{season:02d}e{episode:02d}" not in title:
+            continue
+        if season is not None and episode is None and f"s{season:02d}" not in title:
+            continue
+        matches.append(record["url"])
+    return matches
+
+
+@pytest.mark.parametrize(
+    "query,season,episode",
+    [
+        ("silent", None, None),
+        ("ent sig", None, None),
+        ("e", None, None),
+        ("(1999)", None, None),
+        ("1080p nf", None, None),
+        ("dark river s03e04", 3, 4),
+        ("storm s02", 2, None),
+        ("web-dl", None, None),
+        ("nothing like this", None, None),
+        ("   ", None, None),
+    ],
+)
+def test_index_matches_linear_scan(query, season, episode):
+    records = generate_catalog(5000, seed=7)
+    index = CatalogIndex(records)
+    normalized = normalize_text(query)
+
+    found = [index.records[record_id]["url"] for record_id in index.search(normalized, season, episode)]
+
+    assert found == _linear_scan(records, normalized, season, episode)
+
+
+def test_default_catalog_behaviour_is_unchanged():
+    provider = MockProvider()
+
+    episode = asyncio.run(provider.search("The Boys", season=4, episode=1))
+    assert [link.title for link in episode] == ["The Boys S04E01 1080p WEB-DL"]
+
+    season = asyncio.run(provider.search("the boys", season=4))
+    assert [link.seeds for link in season] == [1500, 1400]
+
+    assert len(asyncio.run(provider.search("all"))) == 9
+    with pytest.raises(ProviderNotFoundError):
+        asyncio.run(provider.search("empty"))
+    with pytest.raises(ProviderNotFoundError):
+        asyncio.run(provider.search("Breaking Bad", season=9, episode=1))
+
+
+def test_punctuated_titles_match_their_queries():
+    provider = MockProvider(catalog=[
+        {"title": "Spider-Man (2002) 1080p BluRay", "url": "https://example.com/1", "size": 1, "seeds": 30},
+        {"title": "Mission: Impossible (1996) 720p", "url": "https://example.com/2", "size": 1, "seeds": 20},
+        {"title": "Heat (1995) 1080p WEB-DL", "url": "https://example.com/3", "size": 1, "seeds": 10},
+    ])
+
+    assert [link.seeds for link in asyncio.run(provider.search("Spider-Man"))] == [30]
+    assert [link.seeds for link in asyncio.run(provider.search("Mission: Impossible"))] == [20]
+    assert [link.seeds for link in asyncio.run(provider.search("WEB-DL"))] == [10]
+    assert [link.seeds for link in asyncio.run(provider.search("spider man 2002"))] == [30]
+
+
+def test_punctuation_only_queries_match_nothing():
+    provider = MockProvider()
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+
+    with pytest.raises(ProviderNotFoundError):
+        asyncio.run(provider.search("!!!"))
+    assert TestClient(app).get("/resolve/%21%21%21").status_code == 404
+
+
+def test_results_are_in_seed_order_and_total_counts_every_match():
+    provider = MockProvider(catalog=generate_catalog(2000, seed=3))
+
+    everything = asyncio.run(provider.search("river"))
+    results = asyncio.run(provider.search("river", limit=5))
+
+    live = [link for link in everything if link.seeds > 0]
+    assert len(live) > 5
+    assert [link.seeds for link in everything] == sorted((link.seeds for link in everything), reverse=True)
+    assert results == everything[:5]
+    assert results.total == everything.total == len(live)
+
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    payload = TestClient(app).get("/resolve/search/river", params={"limit": 5}).json()
+    assert len(payload["results"]) == 5
+    assert payload["total_results"] == len(live)
+
+
+def test_links_are_built_only_for_returned_matches():
+    provider = MockProvider(catalog=generate_catalog(2000, seed=3))
+
+    asyncio.run(provider.search("river", limit=3))
+
+    assert sum(link is not None for link in provider._links) == 3
+
+
+def test_match_count_survives_the_caches(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    catalog = generate_catalog(2000, seed=3)
+    live = asyncio.run(MockProvider(catalog=catalog).search("river")).total
+
+    async def run():
+        provider = CachedProvider(MockProvider(catalog=catalog), persistent=PersistentCache(path))
+        first = await provider.search("river", limit=5)
+        second = await provider.search("river", limit=5)
+        await provider.close()
+        restarted = CachedProvider(MockProvider(catalog=catalog), persistent=PersistentCache(path), warm_entries=0)
+        third = await restarted.search("river", limit=5)
+        await restarted.close()
+        return first, second, third
+
+    assert [results.total for results in asyncio.run(run())] == [live, live, live]
+
+
+def test_catalog_loads_from_json_and_json_lines(tmp_path):
+    records = generate_catalog(10, seed=1)
+    array_path = tmp_path / "catalog.json"
+    array_path.write_text(json.dumps(records))
+    lines_path = tmp_path / "catalog.jsonl"
+    lines_path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+
+    assert load_catalog(str(array_path)) == records
+    assert load_catalog(str(lines_path)) == records
@@ -0,0 +1,108 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from core.normalization import CanonicalQuery, canonicalize, normalize_text, search_text
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider
+from providers.cached_provider import CachedProvider
+from providers.mock_provider import MockProvider
+from routers.media import get_provider
+
+
+class TrackingProvider(BaseProvider):
+    def __init__(self) -> None:
+        super().__init__("TrackingProvider")
+        self.calls = []
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls.append((query, season, episode))
+        return [MediaLink(title=f"{query} 1080p", url="https://example.com/a", size=1, seeds=5)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def test_spellings_of_one_title_share_a_key():
+    spellings = ["the boys", "The Boys ", "THE  BOYS", "the.boys", "The_Boys!", "ｔｈｅ ｂｏｙｓ"]
+
+    assert {canonicalize(spelling).key() for spelling in spellings} == {("the boys", None, None)}
+
+
+def test_accents_are_folded():
+    assert normalize_text("Amélie  Poulain") == "amelie poulain"
+    assert normalize_text("Pokémon: Détective Pikachu") == "pokemon detective pikachu"
+    assert canonicalize("AMÉLIE").title == "amelie"
+
+
+def test_year_and_episode_tags_are_extracted():
+    assert canonicalize("Dune (2021)") == CanonicalQuery("dune", 2021, None, None)
+    assert canonicalize("The.Boys.S04E01") == CanonicalQuery("the boys", None, 4, 1)
+    assert canonicalize("the boys s04") == CanonicalQuery("the boys", None, 4, None)
+    assert canonicalize("Show 2019 S01E02").key() == ("show 2019", 1, 2)
+
+
+def test_title_only_numbers_are_kept():
+    assert canonicalize("1917") == CanonicalQuery("1917", None, None, None)
+    assert canonicalize("S04E01") == CanonicalQuery("s04e01", None, None, None)
+
+
+def test_explicit_season_and_episode_win():
+    assert canonicalize("the boys s04e01", season=3, episode=2).key() == ("the boys", 3, 2)
+    assert canonicalize("The Boys", 4, 1).key() == canonicalize("the.boys.s04e01").key()
+
+
+def test_explicit_season_keeps_the_parsed_episode():
+    assert canonicalize("the boys s04e01", season=3).key() == ("the boys", 3, 1)
+    assert canonicalize("the boys s04e01", episode=2).key() == ("the boys", 4, 2)
+    assert canonicalize("Dune (2021)", season=1) == CanonicalQuery("dune", 2021, 1, None)
+
+
+def test_search_text_keeps_the_callers_spelling():
+    assert search_text("  S.H.I.E.L.D.   Agents ") == "S.H.I.E.L.D. Agents"
+    assert search_text("The Boys S04E01") == "The Boys"
+    assert search_text("The.Boys.s04") == "The.Boys"
+    assert search_text("S04E01") == "S04E01"
+    assert search_text("Dune (2021)") == "Dune (2021)"
+
+
+def test_cache_shares_entries_across_spellings():
+    inner = TrackingProvider()
+    provider = CachedProvider(inner)
+
+    async def run():
+        for spelling in ("The Boys", "the.boys", "THE  BOYS "):
+            await provider.search(spelling, season=4, episode=1, limit=1)
+        await provider.search("the boys s04e01", limit=1)
+
+    asyncio.run(run())
+
+    assert len(inner.calls) == 1
+    assert provider.stats()["cache"]["hits"] == 3
+
+
+def test_batch_dedupes_equivalent_items():
+    provider = TrackingProvider()
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+
+    response = TestClient(app).post("/resolve/batch", json={"items": [
+        {"query": "The Boys", "season": 4, "episode": 1},
+        {"query": "the.boys", "season": 4, "episode": 1},
+        {"query": "THE BOYS S04E01"},
+    ]})
+
+    assert response.status_code == 200
+    assert len(provider.calls) == 1
+
+
+def test_mock_provider_matches_normalized_queries():
+    provider = MockProvider()
+
+    dotted = asyncio.run(provider.search("The.Boys", season=4, episode=1))
+    tagged = asyncio.run(provider.search("the boys S04E01"))
+    movie = asyncio.run(provider.search("Inception 2010"))
+
+    assert [link.title for link in dotted] == [link.title for link in tagged] == ["The Boys S04E01 1080p WEB-DL"]
+    assert movie[0].title == "Inception (2010) 1080p BluRay"
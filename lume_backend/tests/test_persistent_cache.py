@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import pytest
+
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderNotFoundError
+from providers.cached_provider import CachedProvider
+from providers.persistent_cache import PersistentCache
+from providers.registry import build_provider
+
+
+class CountingProvider(BaseProvider):
+    def __init__(self, missing: bool = False) -> None:
+        super().__init__("CountingProvider")
+        self.calls = 0
+        self.missing = missing
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        if self.missing:
+            raise ProviderNotFoundError(f"No results for {query}")
+        return [MediaLink(title=f"{query} 1080p", url="https://example.com/a", size=1, seeds=10)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _link(index: int) -> MediaLink:
+    return MediaLink(title=f"Title {index}", url=f"https://example.com/{index}", size=index, seeds=index)
+
+
+def test_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def first_process():
+        provider = CachedProvider(CountingProvider(), persistent=PersistentCache(path))
+        await provider.search("Dune", limit=1)
+        await provider.close()
+
+    async def second_process():
+        inner = CountingProvider()
+        provider = CachedProvider(inner, persistent=PersistentCache(path), warm_entries=0)
+        results = await provider.search("dune ", limit=1)
+        stats = provider.stats()["persistent_cache"]
+        await provider.close()
+        return inner.calls, results, stats
+
+    asyncio.run(first_process())
+    calls, results, stats = asyncio.run(second_process())
+
+    assert calls == 0
+    assert results[0].title == "Dune 1080p"
+    assert stats["promoted"] == 1
+
+
+def test_not_found_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def run(inner):
+        provider = CachedProvider(inner, persistent=PersistentCache(path), warm_entries=0)
+        try:
+            with pytest.raises(ProviderNotFoundError, match="No results for nothing"):
+                await provider.search("nothing")
+        finally:
+            await provider.close()
+
+    asyncio.run(run(CountingProvider(missing=True)))
+    second = CountingProvider()
+    asyncio.run(run(second))
+
+    assert second.calls == 0
+
+
+def test_startup_warms_memory_with_most_recent_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    clock = FakeClock(time.time())
+    store = PersistentCache(path, clock=clock)
+    for index in range(5):
+        clock.now += 1
+        store.put((f"show {index}", None, None, 1), 3600, links=[_link(index)])
+    store.close()
+
+    inner = CountingProvider()
+    provider = CachedProvider(inner, persistent=PersistentCache(path), warm_entries=2)
+
+    async def run():
+        await provider.startup()
+        newest = await provider.search("show 4", limit=1)
+        persistent_misses = provider.stats()["persistent_cache"]["misses"]
+        await provider.close()
+        return newest, persistent_misses
+
+    newest, persistent_misses = asyncio.run(run())
+
+    assert provider.warmed == 2
+    assert newest[0].title == "Title 4"
+    assert persistent_misses == 0
+    assert inner.calls == 0
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    clock = FakeClock()
+    store = PersistentCache(str(tmp_path / "cache.sqlite3"), clock=clock)
+    store.put(("dune", None, None, 1), 60, links=[_link(1)])
+
+    assert store.get(("dune", None, None, 1)).links[0].title == "Title 1"
+    clock.now += 61
+    assert store.get(("dune", None, None, 1)) is None
+    assert store.recent(10) == []
+
+    store.evict()
+    assert len(store) == 0
+
+
+def test_store_is_bounded_by_least_recent_access(tmp_path):
+    clock = FakeClock()
+    store = PersistentCache(str(tmp_path / "cache.sqlite3"), max_entries=3, clock=clock)
+    for index in range(5):
+        clock.now += 1
+        store.put((f"q{index}", None, None, 1), 3600, links=[_link(index)])
+    clock.now += 1
+    store.get(("q0", None, None, 1))
+
+    store.evict()
+
+    assert len(store) == 3
+    assert store.get(("q0", None, None, 1)) is not None
+    assert store.get(("q1", None, None, 1)) is None
+    assert store.get(("q2", None, None, 1)) is None
+    assert store.stats()["evictions"] == 2
+
+
+def test_workers_share_one_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = PersistentCache(path)
+    worker_b = PersistentCache(path)
+
+    worker_a.put(("dune", None, None, 1), 3600, links=[_link(1)])
+    worker_b.put(("arrival", None, None, 1), 3600, not_found="No results for arrival")
+
+    assert worker_b.get(("dune", None, None, 1)).links[0].title == "Title 1"
+    assert worker_a.get(("arrival", None, None, 1)).not_found == "No results for arrival"
+    worker_a.close()
+    worker_b.close()
+
+
+def test_build_provider_attaches_persistent_cache_when_configured(tmp_path):
+    provider = build_provider("mock", health_gate=False, persistent_cache_path=str(tmp_path / "cache.sqlite3"))
+
+    assert isinstance(provider.persistent, PersistentCache)
+    assert "persistent_cache" in provider.stats()
+    assert build_provider("mock", health_gate=False, persistent_cache_path="").persistent is None
@@ -0,0 +1,140 @@
+import asyncio
+
+from core.metrics import PREFETCH_HITS
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderNotFoundError
+from providers.cached_provider import CachedProvider
+from providers.prefetch import PrefetchingProvider
+from providers.registry import build_provider
+
+
+class EpisodeProvider(BaseProvider):
+    """Knows episodes 1-3 of season 1; records each upstream call."""
+
+    def __init__(self, slow_delay: float = 0.0) -> None:
+        super().__init__("EpisodeProvider")
+        self.calls = []
+        self.slow_delay = slow_delay
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls.append((season, episode))
+        await asyncio.sleep(self.slow_delay if query == "slow" else 0)
+        if season != 1 or episode is None or episode > 3:
+            raise ProviderNotFoundError(f"No results for {query}")
+        return [MediaLink(title=f"{query} S01E0{episode}", url="https://example.com/a", size=1, seeds=10)]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _prefetching(inner, **kwargs):
+    return PrefetchingProvider(CachedProvider(inner), **kwargs)
+
+
+async def _drain(provider):
+    for _ in range(100):
+        if not provider._queue.qsize() and not provider._queued:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_next_episodes_are_served_from_cache_after_prefetch():
+    inner = EpisodeProvider()
+    provider = _prefetching(inner, episodes=2, rate=0)
+    hits_before = PREFETCH_HITS.value()
+
+    async def run():
+        await provider.startup()
+        await provider.search("The Boys", season=1, episode=1, limit=1)
+        await _drain(provider)
+        upstream_after_prefetch = len(inner.calls)
+        results = await provider.search("The Boys", season=1, episode=2, limit=1)
+        await provider.close()
+        return upstream_after_prefetch, results
+
+    upstream_after_prefetch, results = asyncio.run(run())
+
+    assert upstream_after_prefetch == 3
+    assert results[0].title == "the boys S01E02"
+    # Episode 2 came from the cache; it in turn queued episodes 3 (cached) and 4.
+    assert inner.calls[:3] == [(1, 1), (1, 2), (1, 3)]
+    stats = provider.stats()["prefetch"]
+    assert stats["hits"] == 1
+    assert stats["completed"] >= 2
+    assert PREFETCH_HITS.value() == hits_before + 1
+
+
+def test_prefetch_waits_for_foreground_searches():
+    inner = EpisodeProvider(slow_delay=0.1)
+    provider = _prefetching(inner, episodes=1, rate=0)
+
+    async def run():
+        await provider.startup()
+        slow = asyncio.ensure_future(provider.search("slow", season=1, episode=3))
+        await asyncio.sleep(0)
+        await provider.search("Dune", season=1, episode=1)
+        await asyncio.sleep(0.05)
+        calls_while_busy = list(inner.calls)
+        await slow
+        await _drain(provider)
+        await provider.close()
+        return calls_while_busy
+
+    calls_while_busy = asyncio.run(run())
+
+    assert calls_while_busy == [(1, 3), (1, 1)]
+    assert inner.calls[2] == (1, 2)
+
+
+def test_pending_prefetches_are_bounded():
+    provider = _prefetching(EpisodeProvider(), episodes=5, max_pending=2)
+
+    async def run():
+        # Without startup() there is no worker, so the queue only fills.
+        await provider.search("Dune", season=1, episode=1)
+
+    asyncio.run(run())
+
+    stats = provider.stats()["prefetch"]
+    assert stats["scheduled"] == 2
+    assert stats["dropped"] == 3
+    assert stats["pending"] == 2
+
+
+def test_prefetch_rate_is_limited():
+    now = [0.0]
+    provider = _prefetching(EpisodeProvider(), episodes=3, rate=1, clock=lambda: now[0])
+
+    async def run():
+        await provider.startup()
+        await provider.search("Dune", season=1, episode=1)
+        await asyncio.sleep(0.05)
+        started = provider.completed + provider.failed
+        await provider.close()
+        return started
+
+    # The fake clock never advances, so only the first prefetch may start.
+    assert asyncio.run(run()) == 1
+
+
+def test_movies_and_failed_searches_do_not_prefetch():
+    inner = EpisodeProvider()
+    provider = _prefetching(inner)
+
+    async def run():
+        for kwargs in ({}, {"season": 1}, {"season": 2, "episode": 1}):
+            try:
+                await provider.search("Dune", **kwargs)
+            except ProviderNotFoundError:
+                pass
+
+    asyncio.run(run())
+
+    assert provider.stats()["prefetch"]["scheduled"] == 0
+
+
+def test_build_provider_adds_prefetch_above_cache():
+    provider = build_provider("mock", health_gate=False, prefetch=True)
+
+    assert isinstance(provider, PrefetchingProvider)
+    assert isinstance(provider.provider, CachedProvider)
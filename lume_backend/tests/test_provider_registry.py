@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import create_application
+from providers.admission import AdmissionControlledProvider
+from providers.base import BaseProvider, ProviderConnectionError
+from providers.cached_provider import CachedProvider
+from providers.circuit_breaker import CircuitBreakerProvider
+from providers.health import HealthGatedProvider
+from providers.mock_provider import MockProvider
+from providers.p2p_provider import P2PProvider
+from providers.registry import ProviderRegistry, build_provider
+
+
+class LifecycleProvider(BaseProvider):
+    def __init__(self) -> None:
+        super().__init__("LifecycleProvider")
+        self.events = []
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        return []
+
+    async def health_check(self) -> bool:
+        return True
+
+    async def startup(self) -> None:
+        self.events.append("startup")
+
+    async def close(self) -> None:
+        self.events.append("close")
+
+
+def test_build_provider_selects_backend_and_cache():
+    cached = build_provider("mock")
+    assert isinstance(cached, CachedProvider)
+    assert isinstance(cached.provider, AdmissionControlledProvider)
+    assert isinstance(cached.provider.provider, HealthGatedProvider)
+    assert isinstance(cached.provider.provider.provider, CircuitBreakerProvider)
+    assert isinstance(cached.provider.provider.provider.provider, MockProvider)
+    assert cached.name == "MockProvider"
+
+    assert isinstance(
+        build_provider("p2p", cache=False, circuit_breaker=False, health_gate=False, admission=False),
+        P2PProvider,
+    )
+
+    with pytest.raises(ValueError):
+        build_provider("nope")
+
+
+def test_lifespan_builds_provider_once(monkeypatch):
+    constructed = []
+    original_init = MockProvider.__init__
+
+    def counting_init(self):
+        constructed.append(self)
+        original_init(self)
+
+    monkeypatch.setattr(MockProvider, "__init__", counting_init)
+
+    with TestClient(create_application()) as client:
+        for _ in range(3):
+            assert client.get("/resolve/inception").status_code == 200
+        registry = client.app.state.provider_registry
+        assert registry.in_flight == 0
+
+    assert len(constructed) == 1
+    assert not registry.accepting
+
+
+def test_registry_warms_and_closes_provider():
+    provider = LifecycleProvider()
+    registry = ProviderRegistry(provider)
+
+    async def run():
+        await registry.start()
+        async with registry.lease() as leased:
+            assert leased is provider
+        await registry.stop()
+
+    asyncio.run(run())
+
+    assert provider.events == ["startup", "close"]
+
+
+def test_stop_drains_in_flight_requests_before_closing():
+    provider = LifecycleProvider()
+    registry = ProviderRegistry(provider, drain_timeout=5)
+
+    async def request():
+        async with registry.lease():
+            await asyncio.sleep(0.1)
+            provider.events.append("request done")
+
+    async def run():
+        await registry.start()
+        in_flight = asyncio.create_task(request())
+        await asyncio.sleep(0)
+        await registry.stop()
+        await in_flight
+
+    asyncio.run(run())
+
+    assert provider.events == ["startup", "request done", "close"]
+
+
+def test_lease_is_rejected_after_shutdown():
+    registry = ProviderRegistry(LifecycleProvider())
+
+    async def run():
+        await registry.start()
+        await registry.stop()
+        async with registry.lease():
+            pass
+
+    with pytest.raises(ProviderConnectionError):
+        asyncio.run(run())
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from main import create_application
+from models.schemas import MediaLink
+from providers.base import BaseProvider, ProviderConnectionError, ProviderTimeoutError
+from providers.cached_provider import CachedProvider
+from providers.mock_provider import MockProvider
+from providers.p2p_provider import P2PProvider
+from routers.media import get_provider
+
+
+class FailingStreamProvider(BaseProvider):
+    """Yields one result, then fails mid-stream."""
+
+    def __init__(self, fail_first: bool = False) -> None:
+        super().__init__("FailingStreamProvider")
+        self.fail_first = fail_first
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        raise AssertionError("streaming must use search_iter")
+
+    async def search_iter(self, query, season=None, episode=None, limit=None):
+        if self.fail_first:
+            raise ProviderTimeoutError("upstream timed out")
+        yield MediaLink(title="First", url="https://example.com/1", size=1, seeds=5)
+        raise ProviderConnectionError("upstream went away")
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def _client_for(provider):
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    return TestClient(app)
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_emits_results_then_summary_as_ndjson():
+    client = _client_for(MockProvider())
+
+    response = client.get("/resolve/search/the boys/stream?season=4")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    frames = _ndjson(response)
+    assert [frame["event"] for frame in frames] == ["result", "result", "summary"]
+    assert frames[0]["data"]["title"] == "The Boys S04E01 1080p WEB-DL"
+    assert frames[-1]["data"] == {
+        "query": "the boys",
+        "sent_results": 2,
+        "provider_name": "MockProvider",
+    }
+
+
+def test_stream_summary_counts_sent_frames_not_matches():
+    client = _client_for(MockProvider())
+
+    frames = _ndjson(client.get("/resolve/search/all/stream?limit=3"))
+    page = client.get("/resolve/search/all?limit=3").json()
+
+    assert [frame["event"] for frame in frames] == ["result"] * 3 + ["summary"]
+    assert frames[-1]["data"]["sent_results"] == 3
+    assert page["total_results"] > 3
+
+
+def test_stream_supports_server_sent_events():
+    client = _client_for(MockProvider())
+
+    response = client.get("/resolve/search/inception/stream?format=sse")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert events[0].startswith("event: result\ndata: ")
+    assert events[-1].startswith("event: summary\ndata: ")
+    assert json.loads(events[-1].split("data: ", 1)[1])["sent_results"] == 1
+
+
+def test_stream_error_before_first_result_maps_to_status_code():
+    client = _client_for(FailingStreamProvider(fail_first=True))
+
+    response = client.get("/resolve/search/inception/stream")
+
+    assert response.status_code == 504
+    assert response.json()["detail"]["error"] == "PROVIDER_TIMEOUT"
+
+
+def test_stream_error_mid_stream_emits_error_frame():
+    client = _client_for(FailingStreamProvider())
+
+    response = client.get("/resolve/search/inception/stream")
+
+    frames = _ndjson(response)
+    assert [frame["event"] for frame in frames] == ["result", "error"]
+    assert frames[-1]["data"]["error"] == "PROVIDER_UNAVAILABLE"
+
+
+def test_stream_not_found_maps_to_404():
+    client = _client_for(MockProvider())
+
+    response = client.get("/resolve/search/empty/stream")
+
+    assert response.status_code == 404
+
+
+def test_p2p_search_iter_yields_in_completion_order(monkeypatch):
+    latencies = {1: 0.3, 2: 0.05, 3: 0.15}
+
+    class FakePirateBayAPI:
+        @staticmethod
+        def Search(_query):
+            return [
+                SimpleNamespace(id=item_id, name=f"live-{item_id}", size=1, seeds=10 - item_id)
+                for item_id in latencies
+            ]
+
+        @staticmethod
+        def Download(item_id):
+            time.sleep(latencies[item_id])
+            return f"https://example.com/{item_id}"
+
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", FakePirateBayAPI)
+    provider = P2PProvider(max_concurrency=3)
+
+    async def collect():
+        arrivals = []
+        started = time.perf_counter()
+        async for link in provider.search_iter("query", limit=3):
+            arrivals.append((link.title, time.perf_counter() - started))
+        return arrivals
+
+    arrivals = asyncio.run(collect())
+
+    assert [title for title, _ in arrivals] == ["live-2", "live-3", "live-1"]
+    assert arrivals[0][1] < 0.25
+
+
+def test_cached_stream_is_replayed_in_seed_order():
+    inner = MockProvider()
+    provider = CachedProvider(inner)
+
+    async def collect():
+        return [link.seeds async for link in provider.search_iter("the boys", season=4)]
+
+    assert asyncio.run(collect()) == [1500, 1400]
+    assert asyncio.run(collect()) == [1500, 1400]
+    assert provider.stats()["cache"]["hits"] == 1
+
+
+def test_stream_holds_registry_lease_until_last_frame():
+    from providers.registry import ProviderRegistry
+
+    observed = []
+
+    class LeaseObservingProvider(BaseProvider):
+        def __init__(self) -> None:
+            super().__init__("LeaseObservingProvider")
+            self.registry = None
+
+        async def search(self, query, season=None, episode=None, limit=None):
+            return []
+
+        async def search_iter(self, query, season=None, episode=None, limit=None):
+            for index in range(3):
+                observed.append(self.registry.in_flight)
+                yield MediaLink(title=f"R{index}", url=f"https://example.com/{index}", size=1, seeds=5)
+                await asyncio.sleep(0.01)
+
+        async def health_check(self) -> bool:
+            return True
+
+    provider = LeaseObservingProvider()
+    with TestClient(create_application()) as client:
+        registry = ProviderRegistry(provider)
+        provider.registry = registry
+        client.portal.call(registry.start)
+        client.app.state.provider_registry = registry
+
+        response = client.get("/resolve/search/anything/stream")
+        assert [frame["event"] for frame in _ndjson(response)] == ["result"] * 3 + ["summary"]
+        assert registry.in_flight == 0
+
+    assert observed and min(observed) >= 1
@@ -0,0 +1,143 @@
+import asyncio
+from types import SimpleNamespace
+
+from models.schemas import MediaLink
+from providers.base import BaseProvider
+from providers.cached_provider import CachedProvider
+from providers.mock_provider import MockProvider
+from providers.registry import build_provider
+from providers.season_pack import episode_tags, partition_by_episode
+
+
+def _link(title: str, seeds: int = 5) -> MediaLink:
+    return MediaLink(title=title, url="https://example.com/a", size=1, seeds=seeds)
+
+
+class SeasonOnlyProvider(BaseProvider):
+    def __init__(self) -> None:
+        super().__init__("SeasonOnlyProvider")
+        self.calls = []
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls.append((season, episode, limit))
+        return [
+            _link("Show S02E01 1080p", seeds=50),
+            _link("Show.S02E02E03.720p", seeds=40),
+            _link("Show S02 Complete", seeds=30),
+            _link("Show S02E01 480p", seeds=20),
+            _link("Show S01E05", seeds=10),
+        ]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def test_episode_tags_cover_common_release_names():
+    assert episode_tags("The.Boys.S04E01.1080p.WEB") == {(4, 1)}
+    assert episode_tags("the boys s4e1") == {(4, 1)}
+    assert episode_tags("Show S04E01E02") == {(4, 1), (4, 2)}
+    assert episode_tags("Show S04E01-E03") == {(4, 1), (4, 2), (4, 3)}
+    assert episode_tags("Show S04 Complete") == set()
+    assert episode_tags("Crisis04e01") == set()
+
+
+def test_partition_keeps_rank_order_and_drops_untagged_results():
+    links = [_link("Show S02E01 1080p"), _link("Show S02 Complete"), _link("Show S02E01 480p"), _link("S01E01")]
+
+    by_episode = partition_by_episode(links, season=2)
+
+    assert list(by_episode) == [1]
+    assert [link.title for link in by_episode[1]] == ["Show S02E01 1080p", "Show S02E01 480p"]
+
+
+def test_search_season_uses_one_search_and_omits_gaps():
+    provider = SeasonOnlyProvider()
+
+    by_episode = asyncio.run(provider.search_season("Show", 2, [1, 2, 3, 4], limit=1))
+
+    assert len(provider.calls) == 1
+    assert provider.calls[0][:2] == (2, None)
+    assert {episode: [link.title for link in links] for episode, links in by_episode.items()} == {
+        1: ["Show S02E01 1080p"],
+        2: ["Show.S02E02E03.720p"],
+        3: ["Show.S02E02E03.720p"],
+    }
+
+
+def test_cached_season_search_answers_later_episode_lookups():
+    inner = SeasonOnlyProvider()
+    provider = CachedProvider(inner)
+
+    async def run():
+        await provider.search_season("Show", 2, [1, 2], limit=1)
+        episode = await provider.search("show", season=2, episode=2, limit=1)
+        again = await provider.search_season("Show", 2, [1, 2], limit=1)
+        return episode, again
+
+    episode, again = asyncio.run(run())
+
+    assert len(inner.calls) == 1
+    assert episode[0].title == "Show.S02E02E03.720p"
+    assert sorted(again) == [1, 2]
+
+
+def test_mock_catalog_season_search_partitions_episodes():
+    by_episode = asyncio.run(MockProvider().search_season("The Boys", 4, [1, 2]))
+
+    assert sorted(by_episode) == [1, 2]
+    assert all(episode_tags(link.title) == {(4, 1)} for link in by_episode[1])
+
+
+class SeasonIndex:
+    """Fake P2P index: three releases per episode of season 2 plus a pack."""
+
+    downloads = []
+
+    @classmethod
+    def Search(cls, _query):
+        items = [SimpleNamespace(id=0, name="Show S02 Complete", size=1, seeds=500)]
+        for episode in range(1, 11):
+            for quality, seeds in (("2160p", 300), ("1080p", 200), ("720p", 100)):
+                items.append(SimpleNamespace(
+                    id=episode * 10 + len(quality), name=f"Show S02E{episode:02d} {quality}", size=1, seeds=seeds
+                ))
+        items.append(SimpleNamespace(id=99, name="Show S02E01E02 1080p", size=1, seeds=250))
+        return items
+
+    @classmethod
+    def Download(cls, item_id):
+        cls.downloads.append(item_id)
+        return f"https://example.com/{item_id}"
+
+
+def test_p2p_season_search_resolves_only_the_wanted_candidates(monkeypatch):
+    monkeypatch.setattr(SeasonIndex, "downloads", [])
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", SeasonIndex)
+    provider = build_provider("p2p", health_gate=False, admission=False)
+
+    async def run():
+        by_episode = await provider.search_season("Show", 2, [1, 2, 3], limit=1)
+        await provider.close()
+        return by_episode
+
+    by_episode = asyncio.run(run())
+
+    assert {episode: [link.title for link in links] for episode, links in by_episode.items()} == {
+        1: ["Show S02E01 2160p"],
+        2: ["Show S02E02 2160p"],
+        3: ["Show S02E03 2160p"],
+    }
+    assert len(SeasonIndex.downloads) == 3
+
+
+def test_p2p_season_search_resolves_multi_episode_releases_once(monkeypatch):
+    monkeypatch.setattr(SeasonIndex, "downloads", [])
+    monkeypatch.setattr("providers.p2p_provider.PirateBayAPI", SeasonIndex)
+    provider = build_provider("p2p", cache=False, circuit_breaker=False, health_gate=False, admission=False)
+
+    by_episode = asyncio.run(provider.search_season("Show", 2, [1, 2], limit=2))
+
+    assert [link.title for link in by_episode[1]] == ["Show S02E01 2160p", "Show S02E01E02 1080p"]
+    assert [link.title for link in by_episode[2]] == ["Show S02E02 2160p", "Show S02E01E02 1080p"]
+    assert sorted(SeasonIndex.downloads) == [15, 25, 99]
+    asyncio.run(provider.close())
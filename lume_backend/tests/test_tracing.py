@@ -0,0 +1,81 @@
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+import core.tracing
+from core.tracing import RequestTrace, span
+from main import create_application
+from providers.cached_provider import CachedProvider
+from providers.mock_provider import MockProvider
+from routers.media import get_provider
+
+
+def _client(provider):
+    app = create_application()
+    app.dependency_overrides[get_provider] = lambda: provider
+    return TestClient(app)
+
+
+def _stages(response):
+    return {entry.split(";")[0].strip() for entry in response.headers["Server-Timing"].split(",")}
+
+
+def test_resolve_reports_each_stage_in_server_timing():
+    client = _client(CachedProvider(MockProvider()))
+
+    miss = client.get("/resolve/The Boys", params={"season": 4, "episode": 1})
+    hit = client.get("/resolve/The Boys", params={"season": 4, "episode": 1})
+
+    assert miss.status_code == 200
+    assert _stages(miss) == {"cache", "search", "filter_sort", "serialization", "total"}
+    assert 'search;dur=' in miss.headers["Server-Timing"]
+    assert 'desc="upstream search"' in miss.headers["Server-Timing"]
+    assert _stages(hit) == {"cache", "filter_sort", "serialization", "total"}
+
+
+def test_request_ids_are_echoed_or_generated():
+    client = _client(MockProvider())
+
+    supplied = client.get("/health", headers={"X-Request-ID": "flutter-42"})
+    generated = client.get("/health", headers={"X-Request-ID": "not valid!"})
+
+    assert supplied.headers["X-Request-ID"] == "flutter-42"
+    assert len(generated.headers["X-Request-ID"]) == 32
+    assert _stages(generated) == {"total"}
+
+
+def test_spans_are_logged_with_the_request_id(monkeypatch, caplog):
+    monkeypatch.setattr(core.tracing, "TRACE_LOG_ENABLED", True)
+    client = _client(MockProvider())
+
+    with caplog.at_level(logging.INFO, logger="lume.trace"):
+        client.get("/resolve/The Boys", params={"season": 4, "episode": 1}, headers={"X-Request-ID": "abc"})
+
+    records = [json.loads(record.getMessage()) for record in caplog.records if record.name == "lume.trace"]
+    assert {record["request_id"] for record in records} == {"abc"}
+    assert {"search", "filter_sort", "serialization"} <= {record.get("span") for record in records}
+    summary = records[-1]
+    assert summary["status"] == 200
+    assert set(summary["stages_ms"]) == {"search", "filter_sort", "serialization"}
+
+
+def test_concurrent_spans_of_one_stage_count_once():
+    trace = RequestTrace("r")
+    trace.started = 0.0
+    trace.record("magnet_download", 1.0, 3.0)
+    trace.record("magnet_download", 1.5, 2.5)
+    trace.record("filter_sort", 3.0, 3.25)
+
+    assert trace.stages() == {"magnet_download": (2.0, 2), "filter_sort": (0.25, 1)}
+    assert trace.server_timing(4.0) == (
+        'magnet_download;dur=2000.0;desc="magnet resolution x2", '
+        'filter_sort;dur=250.0;desc="filtering", total;dur=4000.0'
+    )
+
+
+def test_spans_outside_a_request_are_ignored():
+    with span("search"):
+        pass
+
+    assert core.tracing.current_trace.get() is None
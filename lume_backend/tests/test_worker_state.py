@@ -0,0 +1,182 @@
+import asyncio
+
+from core import server
+from models.schemas import MediaLink
+from providers.base import BaseProvider
+from providers.cached_provider import CachedProvider
+from providers.health import HealthMonitor
+from providers.persistent_cache import PersistentCache
+from providers.registry import build_provider
+from providers.worker_state import WorkerState
+
+
+class SlowProvider(BaseProvider):
+    """Takes ``delay`` seconds per search; counts upstream calls."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__("SlowProvider")
+        self.delay = delay
+        self.calls = 0
+        self.health_checks = 0
+
+    async def search(self, query, season=None, episode=None, limit=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [MediaLink(title=f"{query} 1080p", url="https://example.com/a", size=1, seeds=10)]
+
+    async def health_check(self) -> bool:
+        self.health_checks += 1
+        return True
+
+
+def _worker(path, owner, inner, lease_seconds=5.0):
+    return CachedProvider(
+        inner,
+        persistent=PersistentCache(path),
+        warm_entries=0,
+        coordinator=WorkerState(path, owner=owner),
+        lease_seconds=lease_seconds,
+        lease_poll=0.01,
+    )
+
+
+def test_lease_is_exclusive_until_released_or_expired(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    first, second = WorkerState(path, owner="a"), WorkerState(path, owner="b")
+
+    assert first.claim(("dune", None, None, 1), ttl=5)
+    assert not second.claim(("dune", None, None, 1), ttl=5)
+    first.release(("dune", None, None, 1))
+    assert second.claim(("dune", None, None, 1), ttl=5)
+
+    assert first.claim(("heat", None, None, 1), ttl=-1)
+    assert second.claim(("heat", None, None, 1), ttl=5)
+    assert second.stats()["active_leases"] == 2
+
+
+def test_workers_share_one_upstream_search(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    first_inner, second_inner = SlowProvider(delay=0.1), SlowProvider(delay=0.1)
+    first, second = _worker(path, "a", first_inner), _worker(path, "b", second_inner)
+
+    async def run():
+        leader = asyncio.ensure_future(first.search("Dune", limit=1))
+        await asyncio.sleep(0.02)
+        follower = await second.search("Dune", limit=1)
+        await leader
+        stats = second.stats()["worker_coordination"]
+        await first.close()
+        await second.close()
+        return follower, stats
+
+    follower, stats = asyncio.run(run())
+
+    assert (first_inner.calls, second_inner.calls) == (1, 0)
+    assert follower[0].title == "Dune 1080p"
+    assert stats["peer_hits"] == 1
+    assert stats["contended"] >= 1
+
+
+def test_waiting_worker_goes_upstream_when_the_lease_runs_out(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    WorkerState(path, owner="crashed").claim(("dune", None, None, 1), ttl=60)
+    inner = SlowProvider()
+    provider = _worker(path, "b", inner, lease_seconds=0.05)
+
+    async def run():
+        results = await provider.search("Dune", limit=1)
+        await provider.close()
+        return results
+
+    assert asyncio.run(run())[0].title == "Dune 1080p"
+    assert inner.calls == 1
+    assert provider.peer_timeouts == 1
+
+
+def test_winner_of_the_lease_rechecks_the_cache_first(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    peer_link = MediaLink(title="Dune peer", url="https://example.com/p", size=1, seeds=10)
+
+    class LatePeer(WorkerState):
+        """A peer finishes and releases the key just before our claim."""
+
+        def claim(self, key, ttl):
+            PersistentCache(path).put(key, 60, links=[peer_link])
+            return super().claim(key, ttl)
+
+    inner = SlowProvider()
+    provider = CachedProvider(
+        inner, persistent=PersistentCache(path), warm_entries=0, coordinator=LatePeer(path, owner="b"),
+    )
+
+    async def run():
+        results = await provider.search("Dune", limit=1)
+        await provider.close()
+        return results
+
+    assert asyncio.run(run()) == [peer_link]
+    assert inner.calls == 0
+    assert provider.peer_hits == 1
+    assert WorkerState(path, owner="c").claim(provider.cache_key("Dune", None, None, 1), ttl=5)
+
+
+def test_monitor_adopts_a_fresh_probe_from_another_worker(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    first_inner, second_inner = SlowProvider(), SlowProvider()
+    first = HealthMonitor(first_inner, interval=10, shared=WorkerState(path, owner="a"))
+    second = HealthMonitor(second_inner, interval=10, shared=WorkerState(path, owner="b"))
+
+    async def run():
+        first.start()
+        await asyncio.sleep(0.05)
+        second.start()
+        await asyncio.sleep(0.05)
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(run())
+
+    assert (first_inner.health_checks, second_inner.health_checks) == (1, 0)
+    assert second.adopted == 1
+    assert second.snapshot()["status"] == "healthy"
+
+
+def test_build_provider_shares_state_through_the_persistent_cache_file(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+
+    provider = build_provider("mock", persistent_cache_path=path, admission=False)
+
+    assert isinstance(provider.coordinator, WorkerState)
+    assert provider.provider.monitor.shared is provider.coordinator
+    assert build_provider("mock", persistent_cache_path=path, coordination=False).coordinator is None
+    assert build_provider("mock").coordinator is None
+
+
+def test_production_config_runs_a_worker_per_cpu_without_reload(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 6)
+    monkeypatch.setattr(server, "_installed", lambda module: True)
+
+    config = server.server_config(env="production", workers=0)
+
+    assert config["workers"] == 6
+    assert config["reload"] is False
+    assert config["loop"] == "uvloop"
+    assert config["http"] == "httptools"
+    assert config["backlog"] == server.UVICORN_BACKLOG
+    assert config["timeout_keep_alive"] == server.UVICORN_KEEPALIVE_SECONDS
+    assert server.server_config(env="production", workers=2)["workers"] == 2
+
+
+def test_production_config_falls_back_without_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setattr(server, "_installed", lambda module: False)
+
+    config = server.server_config(env="production", workers=1)
+
+    assert (config["loop"], config["http"]) == ("asyncio", "h11")
+
+
+def test_development_config_reloads_a_single_process():
+    config = server.server_config(env="development")
+
+    assert config["reload"] is True
+    assert "workers" not in config